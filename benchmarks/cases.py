@@ -0,0 +1,83 @@
+"""Resource method calls driven by the benchmark runner, with small and large payloads."""
+import json
+
+import requests
+
+from klaviyo.session import KlaviyoSession
+
+
+class Payload(object):
+    """Inputs of one payload size."""
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): Number of profiles, emails, properties and response records.
+        """
+        self.size = size
+        self.emails = ['user{}@example.com'.format(i) for i in range(size)]
+        self.properties = dict(('property_{}'.format(i), 'value {}'.format(i)) for i in range(size))
+        self.profiles = [{'email': email, 'first_name': 'Fred', 'plan': 'premium'} for email in self.emails]
+        self.response = json.dumps({
+            'data': [{'id': str(i), 'email': email, 'properties': {'plan': 'premium'}} for i, email in enumerate(self.emails)],
+        }).encode('utf-8')
+
+
+PAYLOADS = {
+    'small': Payload(1),
+    'large': Payload(100),
+}
+
+
+class MockSession(KlaviyoSession):
+    """Transport answering every request with a canned response, without touching the network."""
+
+    def __init__(self, body):
+        super(MockSession, self).__init__()
+        self.body = body
+
+    def request(self, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response._content = self.body
+        response.encoding = 'utf-8'
+        return response
+
+
+# (name, callable taking a Klaviyo client and a Payload); every call goes through the client's dynamic wrapper
+CASES = (
+    ('Public.track', lambda client, p: client.Public.track('Placed Order', email=p.emails[0], properties=p.properties)),
+    ('Public.track_post', lambda client, p: client.Public.track(
+        'Placed Order', email=p.emails[0], properties=p.properties, method='post')),
+    ('Public.identify', lambda client, p: client.Public.identify(email=p.emails[0], properties=p.properties)),
+    ('Lists.get_lists', lambda client, p: client.Lists.get_lists()),
+    ('Lists.create_list', lambda client, p: client.Lists.create_list('Presidents')),
+    ('Lists.get_list_by_id', lambda client, p: client.Lists.get_list_by_id('abc123')),
+    ('Lists.update_list_name_by_id', lambda client, p: client.Lists.update_list_name_by_id('abc123', 'Presidents')),
+    ('Lists.delete_list', lambda client, p: client.Lists.delete_list('abc123')),
+    ('Lists.add_subscribers_to_list', lambda client, p: client.Lists.add_subscribers_to_list('abc123', p.profiles)),
+    ('Lists.get_subscribers_from_list', lambda client, p: client.Lists.get_subscribers_from_list('abc123', p.emails)),
+    ('Lists.delete_subscribers_from_list', lambda client, p: client.Lists.delete_subscribers_from_list('abc123', p.emails)),
+    ('Lists.add_members_to_list', lambda client, p: client.Lists.add_members_to_list('abc123', p.profiles)),
+    ('Lists.get_members_from_list', lambda client, p: client.Lists.get_members_from_list('abc123', p.emails)),
+    ('Lists.remove_members_from_list', lambda client, p: client.Lists.remove_members_from_list('abc123', p.emails)),
+    ('Lists.get_list_exclusions', lambda client, p: client.Lists.get_list_exclusions('abc123')),
+    ('Lists.get_all_members', lambda client, p: client.Lists.get_all_members('abc123')),
+    ('Lists.get_members_from_segment', lambda client, p: client.Lists.get_members_from_segment('xyz789', p.emails)),
+    ('Metrics.get_metrics', lambda client, p: client.Metrics.get_metrics()),
+    ('Metrics.get_metrics_timeline', lambda client, p: client.Metrics.get_metrics_timeline()),
+    ('Metrics.get_metric_timeline_by_id', lambda client, p: client.Metrics.get_metric_timeline_by_id('abc123')),
+    ('Metrics.get_metric_export', lambda client, p: client.Metrics.get_metric_export(
+        'abc123', start_date='2021-01-01', end_date='2021-12-31', unit='day')),
+    ('Profiles.get_profile', lambda client, p: client.Profiles.get_profile('abc123')),
+    ('Profiles.update_profile', lambda client, p: client.Profiles.update_profile('abc123', p.properties)),
+    ('Profiles.get_profile_metrics_timeline', lambda client, p: client.Profiles.get_profile_metrics_timeline('abc123')),
+    ('Profiles.get_profile_metrics_timeline_by_id', lambda client, p: client.Profiles.get_profile_metrics_timeline_by_id(
+        'abc123', 'xyz789')),
+    ('Profiles.get_profile_id_by_email', lambda client, p: client.Profiles.get_profile_id_by_email(p.emails[0])),
+    ('Profiles.unset_profile_properties', lambda client, p: client.Profiles.unset_profile_properties(
+        'abc123', list(p.properties))),
+    ('Campaigns.get_campaigns', lambda client, p: client.Campaigns.get_campaigns()),
+    ('Campaigns.get_campaign_recipients', lambda client, p: client.Campaigns.get_campaign_recipients('abc123')),
+    ('DataPrivacy.request_profile_deletion', lambda client, p: client.DataPrivacy.request_profile_deletion(p.emails[0])),
+)
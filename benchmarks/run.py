@@ -0,0 +1,190 @@
+"""Measures the SDK's own per call overhead.
+
+Every case of benchmarks.cases runs against a mocked transport (SDK overhead only) and a local stub
+server (SDK plus HTTP), with small and large payloads. Results are written as json and can be compared
+against a previous run to catch regressions:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from klaviyo import Klaviyo, __version__
+from klaviyo.public import Public
+
+from .cases import CASES, PAYLOADS, MockSession
+from .server import BenchmarkServer
+
+MOCK = 'mock'
+STUB = 'stub'
+TRANSPORTS = (MOCK, STUB, )
+
+DEFAULT_ITERATIONS = 500
+DEFAULT_THRESHOLD = 0.1
+ALLOCATION_ITERATIONS = 20
+WARMUP_ITERATIONS = 10
+
+
+def get_percentile(timings, percentile):
+    timings = sorted(timings)
+    return timings[min(int(len(timings) * percentile / 100.0), len(timings) - 1)]
+
+
+def measure(function, iterations):
+    """Times and profiles the allocations of a call.
+
+    Args:
+        function (callable): Call to measure.
+        iterations (int): Timed calls.
+
+    Returns:
+        (dict): Latencies in microseconds, calls per second and bytes allocated per call.
+    """
+    for _ in range(WARMUP_ITERATIONS):
+        function()
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # tracing restarts for every call, so the peak only covers that call (tracemalloc.reset_peak needs 3.9)
+    allocated = 0
+    for _ in range(ALLOCATION_ITERATIONS):
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        allocated += peak
+
+    return {
+        'iterations': iterations,
+        'mean_us': elapsed / iterations * 1e6,
+        'p50_us': get_percentile(timings, 50) * 1e6,
+        'p95_us': get_percentile(timings, 95) * 1e6,
+        'throughput': iterations / elapsed,
+        'peak_alloc_bytes': allocated // ALLOCATION_ITERATIONS,
+    }
+
+
+def build_cases(payload):
+    """Request building hot paths measured without any transport."""
+    public = Public(public_token='pk_benchmark')
+    params = {
+        'token': 'pk_benchmark',
+        'event': 'Placed Order',
+        'customer_properties': {'$email': payload.emails[0]},
+        'properties': payload.properties,
+    }
+    return (
+        ('build._build_query_string', lambda: public._build_query_string(params, False)),
+        ('build._build_data_string', lambda: public._build_data_string(params)),
+    )
+
+
+def run(transports, iterations, cases=None):
+    """
+    Args:
+        transports (tuple): Transports to benchmark, MOCK and/or STUB.
+        iterations (int): Timed calls per case.
+        cases (list): Names of the cases to run, None runs all of them.
+
+    Returns:
+        (list): One result dict per (case, transport, payload).
+    """
+    results = []
+    for payload_name, payload in sorted(PAYLOADS.items()):
+        for name, function in build_cases(payload):
+            if cases is None or name in cases:
+                results.append(dict(measure(function, iterations), name=name, transport=None, payload=payload_name))
+
+        for transport in transports:
+            server = None
+            if transport == MOCK:
+                client = Klaviyo(public_token='pk_benchmark', private_token='pk_benchmark', session=MockSession(payload.response))
+            else:
+                server = BenchmarkServer(payload.response).__enter__()
+                client = Klaviyo(public_token='pk_benchmark', private_token='pk_benchmark', api_server=server.url)
+
+            try:
+                for name, call in CASES:
+                    if cases is None or name in cases:
+                        measured = measure(lambda: call(client, payload), iterations)
+                        results.append(dict(measured, name=name, transport=transport, payload=payload_name))
+                        print('{:<50} {:<5} {:<6} {:>10.1f} us {:>10.0f} calls/s'.format(
+                            name, transport, payload_name, measured['mean_us'], measured['throughput']), file=sys.stderr)
+            finally:
+                client.close()
+                if server is not None:
+                    server.__exit__(None, None, None)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Finds the cases whose mean latency regressed past a threshold.
+
+    Args:
+        results (list): Results of this run.
+        baseline (list): Results of a previous run.
+        threshold (float): Tolerated slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        (list): (name, transport, payload, ratio) of every regression.
+    """
+    previous = dict(((result['name'], result['transport'], result['payload']), result) for result in baseline)
+    regressions = []
+    for result in results:
+        key = (result['name'], result['transport'], result['payload'])
+        if key in previous:
+            ratio = result['mean_us'] / previous[key]['mean_us']
+            if ratio > 1 + threshold:
+                regressions.append(key + (ratio, ))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--transport', choices=TRANSPORTS, action='append', help='Defaults to every transport.')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--case', action='append', help='Case to run, defaults to every case.')
+    parser.add_argument('--output', help='Json file to write the results to, defaults to stdout.')
+    parser.add_argument('--compare', help='Json results of a previous run to compare against.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Tolerated slowdown ratio.')
+    args = parser.parse_args(argv)
+
+    results = run(tuple(args.transport or TRANSPORTS), args.iterations, args.case)
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': datetime.datetime.utcnow().isoformat(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline)['results'], args.threshold)
+        for name, transport, payload, ratio in regressions:
+            print('REGRESSION {} {} {}: {:.2f}x slower'.format(name, transport, payload, ratio), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
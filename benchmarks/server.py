@@ -0,0 +1,58 @@
+"""Local HTTP server the stub transport benchmarks run against."""
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class BenchmarkServer(ThreadingMixIn, HTTPServer):
+    """Keep-alive HTTP server answering every request with the same json body, recording nothing."""
+    daemon_threads = True
+
+    def __init__(self, body):
+        """
+        Args:
+            body (bytes): Json body of every response.
+        """
+        HTTPServer.__init__(self, ('127.0.0.1', 0), BenchmarkHandler)
+        self.body = body
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/api'.format(self.server_address[1])
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
+
+
+class BenchmarkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.server.body)))
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
@@ -6,15 +6,92 @@ from .metrics import Metrics
 from .profiles import Profiles
 from .public import Public
 from .campaigns import Campaigns
+from .api_helper import KlaviyoAPI
+from .session import KlaviyoSession
 
 
 class Klaviyo(object):
-    def __init__(self, public_token=None, private_token=None):
+    def __init__(
+        self,
+        public_token=None,
+        private_token=None,
+        api_server=KlaviyoAPI.KLAVIYO_API_SERVER,
+        session=None,
+        pool_connections=KlaviyoSession.DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=KlaviyoSession.DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        response_cache=None,
+        hooks=None,
+        tracer=None,
+        codec=None,
+        compression=None,
+        track_once_index=None
+        ):
+        """
+        Args:
+            public_token (str): Public api token used for track and identify.
+            private_token (str): Private api key used for the v1/v2 apis.
+            api_server (str): Base url of the Klaviyo api.
+            session (KlaviyoSession): Connection pool to share; one is created if not provided.
+            pool_connections (int): Number of per-host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Block when the per-host pool is exhausted.
+            keep_alive (bool): Reuse connections between requests.
+            retry_policy (RetryPolicy): Retry policy shared by every resource, None to never retry.
+            rate_limiter (RateLimiter): Rate limiter shared by every resource, None to not limit.
+            response_cache (ResponseCache): GET response cache shared by every resource, None to not cache.
+            hooks (Hooks): Instrumentation hooks shared by every resource, None to not instrument.
+            tracer (Tracer): Opens tracing spans around every call, None to not trace.
+            codec (JSONCodec): Json codec of request and response bodies, defaults to orjson when installed.
+            compression (Compression): Compressed transport settings and byte counters, None to not compress.
+            track_once_index (TrackOnceIndex): Drops duplicate track_once calls locally, None to send every call.
+        """
         self.public_token = public_token
         self.private_token = private_token
+        self.api_server = api_server
+
+        self._owns_session = session is None
+        if session is None:
+            session = KlaviyoSession(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+            )
+        self.session = session
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.hooks = hooks
+        self.tracer = tracer
+        self.codec = codec
+        self.compression = compression
+        self.track_once_index = track_once_index
+        self._wrappers = {}
 
     def __getattr__(self, item):
-        return KlaviyoAPIDynamicWrapper(item, self)
+        if item.startswith('_'):
+            raise AttributeError(item)
+
+        # resources are stateless per call, so one instance per resource is shared by every caller and thread
+        wrapper = self._wrappers.get(item)
+        if wrapper is None:
+            wrapper = self._wrappers[item] = KlaviyoAPIDynamicWrapper(item, self)
+        return wrapper
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the pooled connections shared by every resource."""
+        if self._owns_session:
+            self.session.close()
 
 
 class KlaviyoAPIDynamicWrapper(object):
@@ -27,7 +104,7 @@ class KlaviyoAPIDynamicWrapper(object):
 
     def __getattr__(self, item):
         """Overwrite to make us dynamically call the called class and its method automatically."""
-        return lambda *args, **kwargs: getattr(self.resource_class, item)(*args, **kwargs)
+        return getattr(self.resource_class, item)
 
     @classmethod
     def str_to_class(cls, str, api):
@@ -41,5 +118,17 @@ class KlaviyoAPIDynamicWrapper(object):
         Returns:
             (obj): KlaviyoApi resource.
         """
-        return getattr(sys.modules[__name__], str)(public_token=api.public_token, private_token=api.private_token)
-
+        return getattr(sys.modules[__name__], str)(
+            public_token=api.public_token,
+            private_token=api.private_token,
+            api_server=api.api_server,
+            session=api.session,
+            retry_policy=api.retry_policy,
+            rate_limiter=api.rate_limiter,
+            response_cache=api.response_cache,
+            hooks=api.hooks,
+            tracer=api.tracer,
+            codec=api.codec,
+            compression=api.compression,
+            track_once_index=api.track_once_index,
+        )
@@ -1,18 +1,21 @@
 from abc import ABCMeta
 import base64
 import datetime
-import json
 import time
 
 import requests
 import simplejson
-import copy
 
 try:
    from urllib.parse import urlencode, quote
 except ImportError:
    from urllib import urlencode, quote
 
+from .codec import get_default_codec
+from .compression import Compression
+from .hooks import Hooks, RequestEvent
+from .session import KlaviyoSession
+from .streaming import KlaviyoStreamingResponse
 from .exceptions import (
     KlaviyoAPIException,
     KlaviyoConfigurationException,
@@ -26,9 +29,14 @@ warnings.warn("This SDK is being deprecated on 2024-01-01, please switch to our
 
 
 class KlaviyoAPIResponse(object):
-    def __init__(self, status_code, data):
+    def __init__(self, status_code, data, headers=None, not_modified=False, duplicate=False):
         self.status_code = status_code
         self.data = data
+        self.headers = headers or {}
+        # True when a stale cached response was revalidated by a 304 Not Modified
+        self.not_modified = not_modified
+        # True when a track_once call was dropped by the TrackOnceIndex without a request
+        self.duplicate = duplicate
 
 
 class KlaviyoAPI(object):
@@ -48,10 +56,17 @@ class KlaviyoAPI(object):
 
     PUBLIC_API_RESPONSES = ('0', '1', )
 
+    # errors raised by the transport when a request could not be completed
+    TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout, )
+
     # TYPE OF API METHOD
     PRIVATE = 'private'
     PUBLIC = 'public'
 
+    # path segments followed by an id, replaced by ENDPOINT_ID in endpoint names
+    ID_PARENTS = ('list', 'group', 'segment', 'campaign', 'person', 'metric', )
+    ENDPOINT_ID = '{id}'
+
     # UNIVERSAL KEYS
     METRIC = 'metric'
     METRICS = 'metrics'
@@ -82,15 +97,77 @@ class KlaviyoAPI(object):
         "Content-Type": "application/x-www-form-urlencoded"
     }
 
-    def __init__(self, public_token=None, private_token=None, api_server=KLAVIYO_API_SERVER):
+    def __init__(
+        self,
+        public_token=None,
+        private_token=None,
+        api_server=KLAVIYO_API_SERVER,
+        session=None,
+        pool_connections=KlaviyoSession.DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=KlaviyoSession.DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        response_cache=None,
+        hooks=None,
+        tracer=None,
+        codec=None,
+        compression=None,
+        track_once_index=None
+        ):
         self.public_token = public_token
         self.private_token = private_token
         self.api_server = api_server
 
+        # built once per client; requests and aiohttp copy the headers they are given, so they're never mutated
+        self._base_headers = dict(self.BASE_HEADERS)
+        self._post_headers = dict(self.BASE_HEADERS, **self.POST_HEADERS)
+        if compression is not None:
+            self._base_headers = compression.get_headers(self._base_headers)
+            self._post_headers = compression.get_headers(self._post_headers)
+        self._v1_url = '{}/{}/'.format(api_server, self.V1_API)
+        self._v2_url = '{}/{}/'.format(api_server, self.V2_API)
+        self._public_url = '{}/'.format(api_server)
+
         # if you only need to do one type of request, it's not required to have both private and public.. but we need at least 1 token
         if not self.public_token and not self.private_token:
             raise KlaviyoConfigurationException('You must provide a public or private api token')
 
+        # a session handed in is shared (e.g. by the Klaviyo client) and is closed by its owner
+        self._owns_session = session is None
+        if session is None:
+            session = KlaviyoSession(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keep_alive=keep_alive,
+            )
+        self.session = session
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.hooks = hooks
+        self.codec = codec if codec is not None else get_default_codec()
+        self.compression = compression
+        self.track_once_index = track_once_index
+
+        # a tracer without opentelemetry installed is dropped, so untraced requests pay nothing
+        self.tracer = tracer if tracer is not None and tracer.enabled else None
+        if self.tracer is not None:
+            self.tracer.instrument(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes pooled connections if this resource owns its session."""
+        if self._owns_session:
+            self.session.close()
+
     ######################
     # HELPER FUNCTIONS
     ######################
@@ -136,7 +213,7 @@ class KlaviyoAPI(object):
 
     def _build_query_string(self, params, is_test):
         return urlencode({
-            self.KLAVIYO_DATA_VARIABLE: base64.b64encode(json.dumps(params).encode('utf-8')),
+            self.KLAVIYO_DATA_VARIABLE: base64.b64encode(self.codec.encode(params)),
             'test': 1 if is_test else 0,
         })
 
@@ -149,7 +226,7 @@ class KlaviyoAPI(object):
         Returns:
             (str): Data string to pass into data field of url-encoded form.
         """
-        return "{}={}".format(self.KLAVIYO_DATA_VARIABLE, quote(json.dumps(params)))
+        return "{}={}".format(self.KLAVIYO_DATA_VARIABLE, quote(self.codec.encode(params)))
 
     #####################
     # API HELPER FUNCTIONS
@@ -181,49 +258,37 @@ class KlaviyoAPI(object):
         if method not in (self.HTTP_GET, self.HTTP_POST):
             raise KlaviyoConfigurationException("Invalid HTTP method for public request: must be 'get' of 'post'")
 
-    def _v2_request(self, path, method, data={}):
+    def _v2_request(self, path, method, data=None, stream_key=None):
         """Handles the v2 api requests.
 
         Args:
             path (str): Url we make a request to.
             method (str): HTTP method.
-            data (dict): Query parameters for the api call.
+            data (dict): Query parameters for the api call, never mutated.
+            stream_key (str): Stream the items of this member of the response, see _request.
         Returns:
             (dict or arr): Response from Klaviyo API.
         """
+        body = dict(data) if data else {}
+        body[self.API_KEY] = self.private_token
 
-        url = '{}/{}/{}'.format(
-            self.api_server,
-            self.V2_API,
-            path,
-        )
-        data.update({
-            self.API_KEY: self.private_token
-        })
-        data = json.dumps(data)
-
-        return self._request(method, url, data=data)
+        return self._request(method, self._v2_url + path, data=self.codec.encode(body), stream_key=stream_key)
 
-    def _v1_request(self, path, method, params={}):
+    def _v1_request(self, path, method, params=None, stream_key=None):
         """Handles the v1 api requests.
 
         Args:
             path (str): Url we make a request to.
             method (str): HTTP method.
-            params (dict): Query parameters for the api call.
+            params (dict): Query parameters for the api call, never mutated.
+            stream_key (str): Stream the items of this member of the response, see _request.
         Returns:
             (dict or arr): Response from Klaviyo API.
         """
-        url = '{}/{}/{}'.format(
-            self.api_server,
-            self.V1_API,
-            path,
-        )
-        params.update({
-            self.API_KEY: self.private_token
-        })
+        query = dict(params) if params else {}
+        query[self.API_KEY] = self.private_token
 
-        return self._request(method, url, params)
+        return self._request(method, self._v1_url + path, query, stream_key=stream_key)
 
     def _public_request(self, path, querystring):
         """Track and identify calls, always a get request.
@@ -235,7 +300,7 @@ class KlaviyoAPI(object):
             (str): 1 or 0 (pass/fail).
         """
 
-        url = '{}/{}?{}'.format(self.api_server, path, querystring)
+        url = '{}{}?{}'.format(self._public_url, path, querystring)
         return self._request(self.HTTP_GET, url, request_type=self.PUBLIC)
 
     def _track_identify_request(self, method=HTTP_GET, params=None, resource=None, is_test=False):
@@ -253,7 +318,7 @@ class KlaviyoAPI(object):
         self._is_valid_public_method(method)
 
         if method == self.HTTP_POST:
-            url = "{}/{}".format(self.KLAVIYO_API_SERVER, resource)
+            url = self._public_url + resource
 
             datastring = self._build_data_string(params)
 
@@ -263,36 +328,332 @@ class KlaviyoAPI(object):
             query_string = self._build_query_string(params, is_test)
             return self._public_request(resource, query_string)
 
-    def _request(self, method, url, params=None, data=None, request_type=PRIVATE, headers={}):
+    def _request(self, method, url, params=None, data=None, request_type=PRIVATE, headers=None, stream_key=None):
         """Executes the request being made.
 
         Args:
             method (str): Type of HTTP request.
             url (str): URL to make the request to.
             params (dict or json): Body of the request.
+            stream_key (str): Returns a KlaviyoStreamingResponse yielding the items of this member of the
+                response while it is read, instead of decoding it whole. Streamed responses aren't cached.
         Returns:
             (str, dict): Public returns 1 or 0  (pass/fail).
                         v1/v2 returns (dict, list).
         """
         self._is_valid_request_option(request_type=request_type)
 
-        request_headers = copy.deepcopy(self.BASE_HEADERS)
-        request_headers.update(headers)
+        path = self._get_path(url)
+        endpoint_class = self._get_endpoint_class(url, request_type)
+
+        if stream_key is not None:
+            return self._send(method, url, params, data, headers, endpoint_class, stream_key=stream_key)
+
+        cache_key, cache_ttl = self._get_cache_key(method, path, params, data, request_type)
+        cached = None
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if cached.is_fresh():
+                    return KlaviyoAPIResponse(cached.status_code, cached.data)
+                headers = dict(headers or {}, **cached.get_conditional_headers())
+
+        response = self._send(method, url, params, data, headers, endpoint_class, cached)
+
+        self._update_cache(method, path, cache_key, cache_ttl, response, request_type, cached)
+        return self._normalize_public_response(response, request_type)
+
+    def _send(self, method, url, params, data, headers, endpoint_class, cached=None, stream_key=None):
+        """Sends a request, waiting on the rate limiter and retrying as the retry policy allows.
+
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL to make the request to.
+            params (dict): Query params.
+            data (str): Body of the request.
+            headers (dict): Headers added to the base headers.
+            endpoint_class (str): Endpoint class of the request.
+            cached (CachedResponse): Stale cached response being revalidated.
+            stream_key (str): Member of the response to stream, None to read the response whole.
+        Returns:
+            (KlaviyoAPIResponse): Information about the response.
+        """
+        request_headers = self._get_request_headers(headers)
+        body, request_headers = self._compress_request(method, url, data, request_headers)
+
+        if self.retry_policy is not None:
+            self.retry_policy.start()
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(endpoint_class)
+
+            event = self._emit_pre_request(method, url, data, endpoint_class, attempt)
+            span = self._start_attempt_span(method, url, data, attempt)
+            attempt_headers = request_headers if span is None else self.tracer.inject(request_headers, span)
+            started = time.monotonic()
+            response = None
+            try:
+                response = self.session.request(
+                    method.upper(),
+                    url,
+                    headers=attempt_headers,
+                    params=params,
+                    data=body,
+                    stream=stream_key is not None
+                )
+                self._record_compression(data, body, response, stream_key)
+                self._emit_post_response(event, started, response, stream_key)
+                self._end_attempt_span(span, response, stream_key=stream_key)
+                return self._handle_response(response, cached, stream_key)
+            except (KlaviyoAPIException, ) + self.TRANSPORT_ERRORS as e:
+                if response is None:
+                    self._end_attempt_span(span, exception=e)
+                delay = self._get_retry_delay(method, url, attempt, e)
+                self._emit_failure(event, e, delay)
+                if delay is None:
+                    raise
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _compress_request(self, method, url, data, headers):
+        """Gzips the body of a request when the compression settings allow it.
+
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL of the request.
+            data (bytes or str): Body of the request.
+            headers (dict): Headers of the request, not mutated.
+
+        Returns:
+            (bytes or str, dict): Body and headers to send.
+        """
+        if self.compression is None or not data:
+            return data, headers
+        body, compressed = self.compression.compress(method, self._get_endpoint_name(url), data)
+        if not compressed:
+            return data, headers
+        return body, dict(headers, **{Compression.CONTENT_ENCODING: Compression.GZIP})
+
+    def _record_compression(self, data, body, response, stream_key=None):
+        """Counts the body and wire sizes of an attempt in the compression stats."""
+        if self.compression is None:
+            return
+        stats = self.compression.stats
+        stats.record_request(self._get_body_size(data), self._get_body_size(body))
+        if stream_key is None:
+            size = self._get_response_size(response)
+            stats.record_response(size, self.compression.get_wire_size(response, size))
+
+    def _get_request_headers(self, headers):
+        """Merges request specific headers into the base headers, reusing the prebuilt merges.
+
+        Args:
+            headers (dict or None): Headers added to the base headers.
+
+        Returns:
+            (dict): Headers of the request, not to be mutated.
+        """
+        if not headers:
+            return self._base_headers
+        if headers is self.POST_HEADERS:
+            return self._post_headers
+        return dict(self._base_headers, **headers)
+
+    def _get_path(self, url):
+        """Strips the api server and query string from a url.
+
+        Args:
+            url (str): URL of the request.
+
+        Returns:
+            (str): Path relative to the api server, e.g. 'v2/list/abc123'.
+        """
+        path = url[len(self.api_server):] if url.startswith(self.api_server) else url
+        return path.split('?', 1)[0].strip('/')
+
+    def _get_cache_key(self, method, path, params, data, request_type=PRIVATE):
+        """Finds whether a request can be answered from the response cache.
+
+        Args:
+            method (str): Type of HTTP request.
+            path (str): Path relative to the api server.
+            params (dict): Query params.
+            data (str): Body of the request.
+            request_type (str): the type of method (private/public).
+
+        Returns:
+            (tuple): Cache key and ttl, (None, None) if the request is not cacheable.
+        """
+        if self.response_cache is None or request_type != self.PRIVATE or method.lower() != self.HTTP_GET:
+            return None, None
+
+        ttl = self.response_cache.get_ttl(path)
+        if ttl is None:
+            return None, None
+        return self.response_cache.get_key(path, params, data), ttl
+
+    def _update_cache(self, method, path, cache_key, cache_ttl, response, request_type=PRIVATE, cached=None):
+        """Caches a cacheable response, or invalidates what a successful mutating request changed."""
+        if self.response_cache is None or request_type != self.PRIVATE:
+            return
+
+        if cache_key is not None and response.not_modified:
+            self.response_cache.refresh(cache_key, cached, cache_ttl, response.headers)
+        elif cache_key is not None:
+            self.response_cache.set(cache_key, response.status_code, response.data, cache_ttl, response.headers)
+        elif method.lower() != self.HTTP_GET:
+            self.response_cache.invalidate(path)
+
+    @staticmethod
+    def _normalize_public_response(response, request_type):
+        """Makes the 1 or 0 of a track or identify call text when the codec left it undecoded (RawCodec), so
+        checks on public responses don't depend on the codec.
 
-        response = getattr(requests, method.lower())(
-            url,
-            headers=request_headers,
-            params=params,
-            data=data
+        Args:
+            response (KlaviyoAPIResponse): Response of a request.
+            request_type (str): the type of method (private/public).
+
+        Returns:
+            (KlaviyoAPIResponse): The response.
+        """
+        if request_type == KlaviyoAPI.PUBLIC and isinstance(response.data, bytes):
+            response.data = response.data.decode('utf-8')
+        return response
+
+    def _get_endpoint_class(self, url, request_type=PRIVATE):
+        """Groups requests by api and resource, e.g. for rate limiting.
+
+        Args:
+            url (str): URL of the request.
+            request_type (str): the type of method (private/public).
+
+        Returns:
+            (str): 'public' for track/identify, '<api version>/<resource>' otherwise (e.g. 'v1/metrics').
+        """
+        if request_type == self.PUBLIC:
+            return self.PUBLIC
+        return '/'.join(self._get_path(url).split('/')[:2])
+
+    def _get_endpoint_name(self, url):
+        """Names the endpoint of a request without its ids, e.g. for metrics.
+
+        Args:
+            url (str): URL of the request.
+
+        Returns:
+            (str): Path with ids replaced by ENDPOINT_ID, e.g. 'v2/list/{id}/members'.
+        """
+        segments = self._get_path(url).split('/')
+        for index in range(1, len(segments)):
+            if segments[index - 1] in self.ID_PARENTS:
+                segments[index] = self.ENDPOINT_ID
+        return '/'.join(segments)
+
+    def _emit_pre_request(self, method, url, data, endpoint_class, attempt):
+        """Calls the pre_request hooks of an attempt.
+
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL of the request.
+            data (str): Body of the request.
+            endpoint_class (str): Endpoint class of the request.
+            attempt (int): Number of retries already made.
+
+        Returns:
+            (RequestEvent or None): Event of the attempt, None without hooks.
+        """
+        if self.hooks is None:
+            return None
+
+        event = RequestEvent(
+            self._get_endpoint_name(url),
+            type(self).__name__,
+            endpoint_class,
+            method.upper(),
+            attempt,
+            self._get_body_size(data),
+        )
+        self.hooks.emit(Hooks.PRE_REQUEST, event)
+        return event
+
+    @staticmethod
+    def _get_body_size(data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return len(data or b'')
+
+    def _start_attempt_span(self, method, url, data, attempt):
+        """Opens the tracing span of an attempt.
+
+        Returns:
+            (Span or None): Span of the attempt, None without a tracer.
+        """
+        if self.tracer is None:
+            return None
+        return self.tracer.start_attempt(
+            type(self).__name__,
+            self._get_endpoint_name(url),
+            method.upper(),
+            attempt,
+            self._get_body_size(data),
         )
 
-        return self._handle_response(response)
+    @staticmethod
+    def _get_response_size(response, stream_key=None):
+        if stream_key is None:
+            return len(response.content or b'')
+        # reading a streamed body to measure it would defeat streaming
+        return int(response.headers.get('Content-Length') or 0)
+
+    def _end_attempt_span(self, span, response=None, exception=None, stream_key=None):
+        if span is None:
+            return
+        if response is None:
+            self.tracer.end_attempt(span, exception=exception)
+        else:
+            self.tracer.end_attempt(span, response.status_code, self._get_response_size(response, stream_key))
+
+    def _emit_post_response(self, event, started, response, stream_key=None):
+        if event is None:
+            return
+        event.status_code = response.status_code
+        event.response_bytes = self._get_response_size(response, stream_key)
+        event.latency = time.monotonic() - started
+        self.hooks.emit(Hooks.POST_RESPONSE, event)
+
+    def _emit_failure(self, event, exception, delay):
+        if event is None:
+            return
+        event.exception_type = type(exception).__name__
+        event.retry_delay = delay
+        self.hooks.emit(Hooks.ERROR if delay is None else Hooks.RETRY, event)
+
+    def _get_retry_delay(self, method, url, attempt, exception):
+        """Asks the retry policy whether a failed attempt should be retried.
 
-    def _handle_response(self, response):
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL the request was made to.
+            attempt (int): Number of retries already made.
+            exception (Exception): Error raised by the failed attempt.
+
+        Returns:
+            (float or None): Seconds to wait before retrying, None to give up.
+        """
+        if self.retry_policy is None:
+            return None
+        return self.retry_policy.get_delay(method, url, attempt, exception)
+
+    def _handle_response(self, response, cached=None, stream_key=None):
         """Handles api HTTP response and validates.
 
         Args:
             response (Response): Http response object.
+            cached (CachedResponse): Stale cached response a conditional request was sent for.
+            stream_key (str): Member of the response to stream, None to decode the response whole.
 
         Returns:
             (KlaviyoApiResponse): Information about the response.
@@ -305,7 +666,9 @@ class KlaviyoAPI(object):
 
         """
         status_code = response.status_code
-        if status_code == 403:
+        if status_code == 304 and cached is not None:
+            return KlaviyoAPIResponse(cached.status_code, cached.data, response.headers, not_modified=True)
+        elif status_code == 403:
             raise KlaviyoAuthenticationError(status_code, response)
         elif status_code == 429:
             raise KlaviyoRateLimitException(status_code, response)
@@ -314,8 +677,22 @@ class KlaviyoAPI(object):
         elif status_code != 200 and status_code != 202:
             raise KlaviyoAPIException(status_code, response)
 
+        if stream_key is not None:
+            return self._handle_streaming_response(response, status_code, stream_key)
         return self._handle_successful_response(response, status_code)
 
+    def _handle_streaming_response(self, response, status_code, stream_key):
+        """
+        Args:
+            response (obj): Streamed requests object.
+            status_code (int): HTTP status code.
+            stream_key (str): Member of the response to stream.
+
+        Returns:
+            (KlaviyoStreamingResponse): Response decoded as it is iterated.
+        """
+        return KlaviyoStreamingResponse(status_code, response, stream_key)
+
     def _handle_successful_response(self, response, status_code):
         """Determines how to handle a 20X http response.
 
@@ -327,11 +704,11 @@ class KlaviyoAPI(object):
             (KlaviyoApiResponse): Information about the response.
         """
         try:
-            return KlaviyoAPIResponse(status_code, response.json())
+            return KlaviyoAPIResponse(status_code, self.codec.decode(response.content), response.headers)
         except (simplejson.JSONDecodeError, ValueError) as e:
             # it's kinda bad that we just do this, but need to return if it's a 200
             if response.text == self.EMPTY_RESPONSE or response.text in self.PUBLIC_API_RESPONSES:
-                return KlaviyoAPIResponse(status_code, response.text)
+                return KlaviyoAPIResponse(status_code, response.text, response.headers)
             else:
                 raise KlaviyoAPIException(
                     message='Request did not return json: {}'.format(e),
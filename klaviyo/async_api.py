@@ -0,0 +1,270 @@
+import asyncio
+
+from .async_api_helper import AsyncKlaviyoAPI, AsyncKlaviyoSession
+from .api_helper import KlaviyoAPI, KlaviyoAPIResponse
+from .bulk import AsyncFanOut, imap_unordered_async, run_chunked_async
+from .campaigns import Campaigns
+from .data_privacy import DataPrivacy
+from .lists import Lists
+from .metrics import Metrics
+from .profiles import Profiles
+from .pagination import AsyncPaginator
+from .public import Public
+
+
+class AsyncPublic(AsyncKlaviyoAPI, Public):
+    async def track_once(
+        self,
+        event,
+        email=None,
+        external_id=None,
+        properties=None,
+        customer_properties=None,
+        timestamp=None,
+        ip_address=None,
+        is_test=False,
+        idempotency_key=None
+        ):
+        """Asyncio counterpart of Public.track_once, see there."""
+        key = self._get_track_once_key(event, email, external_id, idempotency_key)
+        if key is not None and self.track_once_index.seen(key):
+            return KlaviyoAPIResponse(self.DUPLICATE_STATUS, self.DUPLICATE_DATA, duplicate=True)
+
+        response = await self.track(event, email=email, external_id=external_id,
+            properties=self._build_track_once_properties(properties), customer_properties=customer_properties,
+            timestamp=timestamp, ip_address=ip_address, is_test=is_test)
+
+        self._record_track_once(key, response)
+        return response
+
+
+class AsyncLists(AsyncKlaviyoAPI, Lists):
+    def iter_list_exclusions(self, list_id, marker=None, prefetch=False):
+        """Asyncio counterpart of Lists.iter_list_exclusions, returns an AsyncPaginator."""
+        return AsyncPaginator(lambda page_marker: self.get_list_exclusions(list_id, page_marker), cursor=marker, prefetch=prefetch)
+
+    def iter_all_members(self, group_id, marker=None, prefetch=False):
+        """Asyncio counterpart of Lists.iter_all_members, returns an AsyncPaginator."""
+        return AsyncPaginator(lambda page_marker: self.get_all_members(group_id, page_marker), cursor=marker, prefetch=prefetch)
+
+    async def add_subscribers_to_list_bulk(
+        self, list_id, profiles, chunk_size=Lists.MAX_BATCH_SIZE, max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Asyncio counterpart of Lists.add_subscribers_to_list_bulk, see there."""
+        return await run_chunked_async(lambda chunk: self.add_subscribers_to_list(list_id, chunk), profiles, chunk_size, max_workers)
+
+    async def delete_subscribers_from_list_bulk(
+        self, list_id, emails, chunk_size=Lists.MAX_BATCH_SIZE, max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Asyncio counterpart of Lists.delete_subscribers_from_list_bulk, see there."""
+        return await run_chunked_async(lambda chunk: self.delete_subscribers_from_list(list_id, chunk), emails, chunk_size, max_workers)
+
+    async def add_members_to_list_bulk(
+        self, list_id, profiles, chunk_size=Lists.MAX_BATCH_SIZE, max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Asyncio counterpart of Lists.add_members_to_list_bulk, see there."""
+        return await run_chunked_async(lambda chunk: self.add_members_to_list(list_id, chunk), profiles, chunk_size, max_workers)
+
+    async def get_members_from_list_bulk(
+        self, list_id, emails, chunk_size=Lists.MAX_BATCH_SIZE, max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Asyncio counterpart of Lists.get_members_from_list_bulk, see there."""
+        return await run_chunked_async(lambda chunk: self.get_members_from_list(list_id, chunk), emails, chunk_size, max_workers)
+
+    async def remove_members_from_list_bulk(
+        self, list_id, emails, chunk_size=Lists.MAX_BATCH_SIZE, max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Asyncio counterpart of Lists.remove_members_from_list_bulk, see there."""
+        return await run_chunked_async(lambda chunk: self.remove_members_from_list(list_id, chunk), emails, chunk_size, max_workers)
+
+
+class AsyncMetrics(AsyncKlaviyoAPI, Metrics):
+    async def get_metric_export_sharded(
+        self,
+        metric_id,
+        start_date,
+        end_date,
+        unit=Metrics.UNIT_DAY,
+        measurement=None,
+        where=None,
+        by=None,
+        count=None,
+        shard_size=None,
+        max_workers=Metrics.DEFAULT_SHARD_WORKERS
+        ):
+        """Asyncio counterpart of Metrics.get_metric_export_sharded, see there."""
+        shards = self._get_export_shards(start_date, end_date, unit, shard_size)
+
+        def fetch(shard):
+            return self._get_metric_export_shard(metric_id, shard, unit, measurement, where, by, count)
+
+        responses = {}
+        async for shard, response, exception in imap_unordered_async(fetch, shards, max_workers):
+            if exception is not None:
+                raise exception
+            responses[shard] = response
+
+        return self._merge_export_responses(shards, responses)
+
+
+class AsyncProfiles(AsyncKlaviyoAPI, Profiles):
+    def iter_profile_timelines(
+        self,
+        profile_ids,
+        metric_id=None,
+        since=None,
+        count=100,
+        sort=KlaviyoAPI.SORT_DESC,
+        max_workers=Profiles.DEFAULT_FAN_OUT_WORKERS,
+        requests_per_second=None
+        ):
+        """Asyncio counterpart of Profiles.iter_profile_timelines, returns an AsyncFanOut."""
+        rate_limiter = self._get_fan_out_rate_limiter(requests_per_second)
+
+        async def fetch_page(profile_id, cursor):
+            if rate_limiter is not None:
+                delay = rate_limiter.reserve(self.V1_API)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            return await self._get_timeline_page(profile_id, metric_id, cursor, count, sort)
+
+        def timeline(profile_id):
+            return AsyncPaginator(
+                lambda cursor: fetch_page(profile_id, cursor),
+                records_key=self.DATA,
+                cursor_key=self.NEXT,
+                cursor=since,
+            )
+
+        return AsyncFanOut(timeline, profile_ids, max_workers)
+
+
+class AsyncCampaigns(AsyncKlaviyoAPI, Campaigns):
+    async def iter_campaigns(self, count=50):
+        """Asyncio counterpart of Campaigns.iter_campaigns, iterated with `async for`."""
+        page = 0
+        seen = 0
+        while True:
+            data = (await self.get_campaigns(page=page, count=count)).data or {}
+            campaigns = data.get(self.DATA) or []
+            for campaign in campaigns:
+                yield campaign
+            seen += len(campaigns)
+            if not campaigns or seen >= data.get(self.TOTAL, 0):
+                return
+            page += 1
+
+    def iter_campaign_recipients(self, campaign_id, offset=None, count=Campaigns.MAX_RECIPIENTS_PAGE_SIZE, prefetch=False):
+        """Asyncio counterpart of Campaigns.iter_campaign_recipients, returns an AsyncPaginator."""
+        return AsyncPaginator(
+            lambda page_offset: self.get_campaign_recipients(campaign_id, count=count, offset=page_offset or ''),
+            records_key=self.DATA,
+            cursor_key=self.NEXT_OFFSET,
+            cursor=offset,
+            prefetch=prefetch,
+        )
+
+
+class AsyncDataPrivacy(AsyncKlaviyoAPI, DataPrivacy):
+    pass
+
+
+class AsyncKlaviyo(object):
+    RESOURCES = {
+        'Public': AsyncPublic,
+        'Lists': AsyncLists,
+        'Metrics': AsyncMetrics,
+        'Profiles': AsyncProfiles,
+        'Campaigns': AsyncCampaigns,
+        'DataPrivacy': AsyncDataPrivacy,
+    }
+
+    def __init__(
+        self,
+        public_token=None,
+        private_token=None,
+        api_server=KlaviyoAPI.KLAVIYO_API_SERVER,
+        session=None,
+        limit=AsyncKlaviyoSession.DEFAULT_LIMIT,
+        limit_per_host=AsyncKlaviyoSession.DEFAULT_LIMIT_PER_HOST,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        response_cache=None,
+        hooks=None,
+        tracer=None,
+        codec=None,
+        compression=None,
+        track_once_index=None
+        ):
+        """Asyncio client; every resource method returns an awaitable.
+
+        Args:
+            public_token (str): Public api token used for track and identify.
+            private_token (str): Private api key used for the v1/v2 apis.
+            api_server (str): Base url of the Klaviyo api.
+            session (AsyncKlaviyoSession): Connection pool to share; one is created if not provided.
+            limit (int): Maximum number of open connections, 0 for no limit.
+            limit_per_host (int): Maximum number of open connections per host, 0 for no limit.
+            keep_alive (bool): Reuse connections between requests.
+            retry_policy (RetryPolicy): Retry policy shared by every resource, None to never retry.
+            rate_limiter (RateLimiter): Rate limiter shared by every resource, None to not limit.
+            response_cache (ResponseCache): GET response cache shared by every resource, None to not cache.
+            hooks (Hooks): Instrumentation hooks shared by every resource, None to not instrument.
+            tracer (Tracer): Opens tracing spans around every call, None to not trace.
+            codec (JSONCodec): Json codec of request and response bodies, defaults to orjson when installed.
+            compression (Compression): Compressed transport settings and byte counters, None to not compress.
+            track_once_index (TrackOnceIndex): Drops duplicate track_once calls locally, None to send every call.
+        """
+        self.public_token = public_token
+        self.private_token = private_token
+        self.api_server = api_server
+
+        self._owns_session = session is None
+        if session is None:
+            session = AsyncKlaviyoSession(limit=limit, limit_per_host=limit_per_host, keep_alive=keep_alive)
+        self.session = session
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self.hooks = hooks
+        self.tracer = tracer
+        self.codec = codec
+        self.compression = compression
+        self.track_once_index = track_once_index
+        self._resources = {}
+
+    def __getattr__(self, item):
+        try:
+            resource_class = self.RESOURCES[item]
+        except KeyError:
+            raise AttributeError(item)
+
+        resource = self._resources.get(item)
+        if resource is None:
+            resource = self._resources[item] = resource_class(
+                public_token=self.public_token,
+                private_token=self.private_token,
+                api_server=self.api_server,
+                session=self.session,
+                retry_policy=self.retry_policy,
+                rate_limiter=self.rate_limiter,
+                response_cache=self.response_cache,
+                hooks=self.hooks,
+                tracer=self.tracer,
+                codec=self.codec,
+                compression=self.compression,
+                track_once_index=self.track_once_index,
+            )
+        return resource
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the pooled connections shared by every resource."""
+        if self._owns_session:
+            await self.session.close()
@@ -0,0 +1,356 @@
+import asyncio
+import time
+
+import aiohttp
+import simplejson
+
+try:
+   from urllib.parse import urlencode
+except ImportError:
+   from urllib import urlencode
+
+from .api_helper import KlaviyoAPI, KlaviyoAPIResponse
+from .exceptions import KlaviyoAPIException
+from .streaming import JSONStreamDecoder, KlaviyoStreamingResponse
+
+
+class KlaviyoAsyncResponse(object):
+    """A fully read aiohttp response exposing the parts of requests.Response the sync helpers rely on."""
+    DEFAULT_ENCODING = 'utf-8'
+
+    def __init__(self, status_code, headers, content, encoding=None, raw=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or self.DEFAULT_ENCODING
+        # the unread aiohttp response of a streamed request
+        self.raw = raw
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, 'replace')
+
+    def json(self):
+        return simplejson.loads(self.text)
+
+
+class AsyncKlaviyoStreamingResponse(object):
+    """Asyncio counterpart of KlaviyoStreamingResponse, iterated with `async for`."""
+    DEFAULT_CHUNK_SIZE = KlaviyoStreamingResponse.DEFAULT_CHUNK_SIZE
+
+    def __init__(self, status_code, response, items_key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            status_code (int): HTTP status code.
+            response (KlaviyoAsyncResponse): Streamed response, holding the unread aiohttp response.
+            items_key (str): Member of the body holding the items.
+            chunk_size (int): Bytes read at a time.
+        """
+        self.status_code = status_code
+        self.headers = response.headers
+        self.chunk_size = chunk_size
+        self._response = response.raw
+        self._decoder = JSONStreamDecoder(items_key, response.encoding)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def fields(self):
+        return self._decoder.fields
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._response.content.iter_chunked(self.chunk_size):
+                for item in self._decoder.feed(chunk):
+                    yield item
+            for item in self._decoder.close():
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._response.release()
+
+
+class AsyncKlaviyoSession(object):
+    """A bounded pool of keep-alive connections for use on a single event loop.
+
+    The aiohttp.ClientSession is built lazily on first use, because it must be created inside a running loop.
+    Requests beyond the connection limits wait for a free connection instead of opening new ones.
+    """
+    DEFAULT_LIMIT = 100
+    DEFAULT_LIMIT_PER_HOST = 0
+    DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+
+    # statuses from which streamed bodies are read whole
+    ERROR_STATUS = 300
+
+    def __init__(
+        self,
+        limit=DEFAULT_LIMIT,
+        limit_per_host=DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+        keep_alive=True
+        ):
+        """
+        Args:
+            limit (int): Maximum number of open connections, 0 for no limit.
+            limit_per_host (int): Maximum number of open connections per host, 0 for no limit.
+            keepalive_timeout (float): Seconds an idle connection is kept open.
+            keep_alive (bool): Reuse connections between requests.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.keep_alive = keep_alive
+
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def session(self):
+        """Returns the pooled aiohttp.ClientSession, building it on first access.
+
+        Returns:
+            (aiohttp.ClientSession): Session over a bounded connector.
+        """
+        if self._session is None or self._session.closed:
+            if self.keep_alive:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                )
+            else:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    force_close=True,
+                )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def request(self, method, url, headers=None, data=None, stream=False):
+        """Sends a request over a pooled connection and reads the whole body.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL to make the request to, query string included.
+            headers (dict): Request headers.
+            data (str): Request body.
+            stream (bool): Leave the body of a successful response unread in the response's `raw`; the
+                connection is held until it is released.
+
+        Returns:
+            (KlaviyoAsyncResponse): Http response object.
+        """
+        if stream:
+            response = await self.session.request(method, url, headers=headers, data=data)
+            if response.status < self.ERROR_STATUS:
+                return KlaviyoAsyncResponse(response.status, response.headers, None, response.charset, raw=response)
+            # error bodies are small and read whole for the exception
+            try:
+                content = await response.read()
+            finally:
+                response.release()
+            return KlaviyoAsyncResponse(response.status, response.headers, content, response.charset)
+
+        async with self.session.request(method, url, headers=headers, data=data) as response:
+            content = await response.read()
+            return KlaviyoAsyncResponse(response.status, response.headers, content, response.charset)
+
+    async def close(self):
+        """Closes every pooled connection. The session is rebuilt if used again."""
+        session, self._session = self._session, None
+        if session is not None:
+            await session.close()
+
+
+class AsyncKlaviyoAPI(KlaviyoAPI):
+    """Asyncio counterpart of KlaviyoAPI.
+
+    Resource methods build their requests exactly as the sync classes do; only _request is a coroutine,
+    so every resource method returns an awaitable.
+    """
+    TRANSPORT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError, )
+
+    def __init__(
+        self,
+        public_token=None,
+        private_token=None,
+        api_server=KlaviyoAPI.KLAVIYO_API_SERVER,
+        session=None,
+        limit=AsyncKlaviyoSession.DEFAULT_LIMIT,
+        limit_per_host=AsyncKlaviyoSession.DEFAULT_LIMIT_PER_HOST,
+        keep_alive=True,
+        retry_policy=None,
+        rate_limiter=None,
+        response_cache=None,
+        hooks=None,
+        tracer=None,
+        codec=None,
+        compression=None,
+        track_once_index=None
+        ):
+        owns_session = session is None
+        if session is None:
+            session = AsyncKlaviyoSession(limit=limit, limit_per_host=limit_per_host, keep_alive=keep_alive)
+
+        super(AsyncKlaviyoAPI, self).__init__(
+            public_token=public_token,
+            private_token=private_token,
+            api_server=api_server,
+            session=session,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            response_cache=response_cache,
+            hooks=hooks,
+            tracer=tracer,
+            codec=codec,
+            compression=compression,
+            track_once_index=track_once_index,
+        )
+        self._owns_session = owns_session
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes pooled connections if this resource owns its session."""
+        if self._owns_session:
+            await self.session.close()
+
+    @staticmethod
+    def _build_url(url, params):
+        """Appends query params to a url the way requests does.
+
+        Args:
+            url (str): URL to make the request to.
+            params (dict): Query params, None values are dropped.
+
+        Returns:
+            (str): URL with the encoded query string.
+        """
+        if not params:
+            return url
+        query_string = urlencode(KlaviyoAPI._filter_params(params), doseq=True)
+        if not query_string:
+            return url
+        return '{}{}{}'.format(url, '&' if '?' in url else '?', query_string)
+
+    async def _request(self, method, url, params=None, data=None, request_type=KlaviyoAPI.PRIVATE, headers=None, stream_key=None):
+        """Executes the request being made.
+
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL to make the request to.
+            params (dict or json): Body of the request.
+            stream_key (str): Returns an AsyncKlaviyoStreamingResponse yielding the items of this member of the
+                response while it is read, instead of decoding it whole. Streamed responses aren't cached.
+        Returns:
+            (str, dict): Public returns 1 or 0  (pass/fail).
+                        v1/v2 returns (dict, list).
+        """
+        self._is_valid_request_option(request_type=request_type)
+
+        path = self._get_path(url)
+        endpoint_class = self._get_endpoint_class(url, request_type)
+
+        if stream_key is not None:
+            return await self._send(method, url, params, data, headers, endpoint_class, stream_key=stream_key)
+
+        cache_key, cache_ttl = self._get_cache_key(method, path, params, data, request_type)
+        cached = None
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if cached.is_fresh():
+                    return KlaviyoAPIResponse(cached.status_code, cached.data)
+                headers = dict(headers or {}, **cached.get_conditional_headers())
+
+        response = await self._send(method, url, params, data, headers, endpoint_class, cached)
+
+        self._update_cache(method, path, cache_key, cache_ttl, response, request_type, cached)
+        return self._normalize_public_response(response, request_type)
+
+    async def _send(self, method, url, params, data, headers, endpoint_class, cached=None, stream_key=None):
+        """Sends a request, waiting on the rate limiter and retrying as the retry policy allows.
+
+        Args:
+            method (str): Type of HTTP request.
+            url (str): URL to make the request to.
+            params (dict): Query params.
+            data (str): Body of the request.
+            headers (dict): Headers added to the base headers.
+            endpoint_class (str): Endpoint class of the request.
+            cached (CachedResponse): Stale cached response being revalidated.
+            stream_key (str): Member of the response to stream, None to read the response whole.
+        Returns:
+            (KlaviyoAPIResponse): Information about the response.
+        """
+        request_headers = self._get_request_headers(headers)
+        body, request_headers = self._compress_request(method, url, data, request_headers)
+
+        request_url = self._build_url(url, params)
+
+        if self.retry_policy is not None:
+            self.retry_policy.start()
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                delay = self.rate_limiter.reserve(endpoint_class)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            event = self._emit_pre_request(method, url, data, endpoint_class, attempt)
+            span = self._start_attempt_span(method, url, data, attempt)
+            attempt_headers = request_headers if span is None else self.tracer.inject(request_headers, span)
+            started = time.monotonic()
+            response = None
+            try:
+                response = await self.session.request(
+                    method.upper(),
+                    request_url,
+                    headers=attempt_headers,
+                    data=body,
+                    stream=stream_key is not None
+                )
+                self._record_compression(data, body, response, stream_key)
+                self._emit_post_response(event, started, response, stream_key)
+                self._end_attempt_span(span, response, stream_key=stream_key)
+                return self._handle_response(response, cached, stream_key)
+            except (KlaviyoAPIException, ) + self.TRANSPORT_ERRORS as e:
+                if response is None:
+                    self._end_attempt_span(span, exception=e)
+                delay = self._get_retry_delay(method, url, attempt, e)
+                self._emit_failure(event, e, delay)
+                if delay is None:
+                    raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _handle_streaming_response(self, response, status_code, stream_key):
+        """
+        Args:
+            response (KlaviyoAsyncResponse): Streamed response.
+            status_code (int): HTTP status code.
+            stream_key (str): Member of the response to stream.
+
+        Returns:
+            (AsyncKlaviyoStreamingResponse): Response decoded as it is iterated.
+        """
+        return AsyncKlaviyoStreamingResponse(status_code, response, stream_key)
@@ -0,0 +1,291 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import csv
+import functools
+import gzip
+import io
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+import time
+
+from .api_helper import KlaviyoAPI
+from .bulk import chunked, imap_unordered
+from .codec import get_default_codec
+from .public import Public
+from .ratelimit import FileRateLimiter
+from .sinks import JSONLSink
+
+
+# Public.track arguments read from input events, other keys are ignored
+TRACK_FIELDS = ('event', 'email', 'external_id', 'properties', 'customer_properties', 'timestamp', 'ip_address', )
+
+# csv columns holding json objects
+JSON_FIELDS = ('properties', 'customer_properties', )
+
+# csv column holding the unix timestamp, sent as an int like in JSONL input
+TIMESTAMP_FIELD = 'timestamp'
+
+# keys added to the events written to the dead-letter file
+ERROR_KEY = '__error__'
+LINE_KEY = '__line__'
+# key of the undecodable input of a dead-lettered line
+RAW_KEY = 'raw'
+
+
+def read_events(path, codec=None, on_error=None):
+    """Streams the events of a JSONL or CSV file, gzip compressed if its name ends with '.gz'.
+
+    CSV files have a header row naming TRACK_FIELDS columns; the properties and customer_properties
+    columns hold json objects, the timestamp column an integer, and empty cells are treated as missing.
+
+    Args:
+        path (str): Input file, '.csv' or '.csv.gz' for CSV, JSONL otherwise.
+        codec (JSONCodec): Decodes json, defaults to orjson when installed.
+        on_error (callable): Called with the line number, the raw line (str, or the row dict of a CSV file)
+            and the error of every line that can't be decoded, which is then skipped. None to raise.
+
+    Returns:
+        (generator): (line number, event dict) tuples.
+
+    Raises:
+        (ValueError): A line can't be decoded and there is no on_error.
+    """
+    codec = codec if codec is not None else get_default_codec()
+    compressed = path.endswith('.gz')
+    name = path[:-len('.gz')] if compressed else path
+
+    with (gzip.open(path, 'rb') if compressed else open(path, 'rb')) as input_file:
+        if name.endswith('.csv'):
+            lines = enumerate(csv.DictReader(io.TextIOWrapper(input_file, 'utf-8', newline='')), 2)
+            decode = functools.partial(_decode_row, codec)
+        else:
+            lines = ((line, content) for line, content in enumerate(input_file, 1) if content.strip())
+            decode = functools.partial(_decode_line, codec)
+
+        for line, raw in lines:
+            try:
+                event = decode(raw)
+            except ValueError as e:
+                if on_error is None:
+                    raise
+                on_error(line, raw.decode('utf-8', 'replace').rstrip('\r\n') if isinstance(raw, bytes) else raw, e)
+                continue
+            yield line, event
+
+
+def _decode_line(codec, content):
+    event = codec.decode(content)
+    if not isinstance(event, dict):
+        raise ValueError('Expected a json object, got {}'.format(type(event).__name__))
+    return event
+
+
+def _decode_row(codec, row):
+    event = dict((key, value) for key, value in row.items() if value)
+    for field in JSON_FIELDS:
+        if field in event:
+            event[field] = codec.decode(event[field])
+    if TIMESTAMP_FIELD in event:
+        event[TIMESTAMP_FIELD] = int(float(event[TIMESTAMP_FIELD]))
+    return event
+
+
+class BackfillProgress(object):
+    """Counters of a running TrackBackfill."""
+
+    def __init__(self):
+        self.read = 0
+        self.sent = 0
+        self.rejected = 0
+        self.started_at = time.time()
+
+    @property
+    def elapsed(self):
+        """(float): Seconds since the backfill started."""
+        return time.time() - self.started_at
+
+    @property
+    def throughput(self):
+        """(float): Events handled per second."""
+        elapsed = self.elapsed
+        return (self.sent + self.rejected) / elapsed if elapsed > 0 else 0.0
+
+
+class _BackfillWorker(object):
+    """State of one backfill process: its own Public resource, connection pool and sender threads."""
+    FAILED_RESPONSES = (0, '0', )
+
+    def __init__(self, public_token, api_server, threads, rate_limiter_path, rates):
+        self.rate_limiter = FileRateLimiter(rate_limiter_path, rates) if rate_limiter_path else None
+        self.public = Public(
+            public_token=public_token,
+            api_server=api_server,
+            pool_maxsize=threads,
+            rate_limiter=self.rate_limiter,
+        )
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+
+    def close(self):
+        """Stops the sender threads, then closes the pooled connections and the shared rate limiter file."""
+        self.executor.shutdown()
+        self.public.close()
+        if self.rate_limiter is not None:
+            self.rate_limiter.close()
+
+    def send_chunk(self, chunk):
+        rejected = [result for result in self.executor.map(self._send, chunk) if result is not None]
+        return len(chunk) - len(rejected), rejected
+
+    def _send(self, item):
+        """
+        Returns:
+            (tuple or None): (line, event, error) if the event was rejected.
+        """
+        line, event = item
+        try:
+            response = self.public.track(
+                method=KlaviyoAPI.HTTP_POST,
+                **dict((field, event[field]) for field in TRACK_FIELDS if field in event)
+            )
+        except Exception as e:
+            return line, event, '{}: {}'.format(type(e).__name__, e)
+        if response.data in self.FAILED_RESPONSES:
+            return line, event, 'Klaviyo rejected the event'
+        return None
+
+
+_worker = None
+
+
+def _send_chunk(worker_args, chunk):
+    """Sends a chunk from a pool process, starting its worker on the first chunk.
+
+    ProcessPoolExecutor only takes an initializer from Python 3.7, so the worker arguments travel with
+    every chunk instead.
+    """
+    global _worker
+    if _worker is None:
+        _worker = _BackfillWorker(*worker_args)
+        # pool processes exit through multiprocessing, which skips atexit handlers but runs its finalizers
+        multiprocessing.util.Finalize(None, _close_worker, exitpriority=0)
+    return _worker.send_chunk(chunk)
+
+
+def _close_worker():
+    """Closes the worker of this process, run when it exits."""
+    global _worker
+    if _worker is not None:
+        _worker.close()
+        _worker = None
+
+
+class TrackBackfill(object):
+    """Sends historical events through Public.track from a process pool.
+
+    The input is streamed and sharded in chunks across `processes` processes. Each process sends POST track
+    requests from `threads` threads over its own pooled connections, so neither encoding nor blocking I/O
+    is bound to one core. With `requests_per_second`, every process shares one token bucket through a
+    FileRateLimiter, keeping the whole pool under a global budget.
+
+    Events Klaviyo rejects, that fail, or that lack an identifier are appended to the dead-letter JSONL file
+    with their `__error__` and input `__line__`; the file can be backfilled again as is once fixed. Lines
+    that can't be decoded are dead-lettered as their `__line__`, `__error__` and `raw` content. Track
+    requests aren't retried, since replaying a POST that may have been recorded would duplicate the event.
+    """
+    DEFAULT_THREADS = 8
+    DEFAULT_CHUNK_SIZE = 500
+    RATE_LIMITER_NAME = 'ratelimit'
+
+    def __init__(
+        self,
+        public_token,
+        dead_letter_path,
+        api_server=KlaviyoAPI.KLAVIYO_API_SERVER,
+        processes=None,
+        threads=DEFAULT_THREADS,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        requests_per_second=None,
+        rate_limiter_path=None,
+        on_progress=None
+        ):
+        """
+        Args:
+            public_token (str): Public api token.
+            dead_letter_path (str): JSONL file rejected events are appended to.
+            api_server (str): Base url of the Klaviyo api.
+            processes (int): Number of processes, defaults to the number of CPUs.
+            threads (int): Concurrent requests per process.
+            chunk_size (int): Events handed to a process at once.
+            requests_per_second (float or None): Global budget of track requests, None to not limit.
+            rate_limiter_path (str): File of the shared token bucket, a temporary file by default; pass the
+                same path to several backfills on a host to share one budget.
+            on_progress (callable): Called with the BackfillProgress after every chunk.
+        """
+        self.public_token = public_token
+        self.dead_letter_path = dead_letter_path
+        self.api_server = api_server
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.chunk_size = chunk_size
+        self.requests_per_second = requests_per_second
+        self.rate_limiter_path = rate_limiter_path
+        self.on_progress = on_progress
+
+    def _read(self, events, progress):
+        for item in events:
+            progress.read += 1
+            yield item
+
+    def run(self, path):
+        """Backfills every event of a JSONL or CSV file, see read_events.
+
+        Args:
+            path (str): Input file.
+
+        Returns:
+            (BackfillProgress): Final counts.
+        """
+        rates = None
+        rate_limiter_path = self.rate_limiter_path
+        temporary_directory = None
+        if self.requests_per_second:
+            rates = {Public.PUBLIC: (self.requests_per_second, self.requests_per_second)}
+            if rate_limiter_path is None:
+                temporary_directory = tempfile.mkdtemp()
+                rate_limiter_path = os.path.join(temporary_directory, self.RATE_LIMITER_NAME)
+        else:
+            rate_limiter_path = None
+
+        progress = BackfillProgress()
+        send_chunk = functools.partial(
+            _send_chunk, (self.public_token, self.api_server, self.threads, rate_limiter_path, rates)
+        )
+        executor = ProcessPoolExecutor(max_workers=self.processes)
+        try:
+            with executor, JSONLSink(self.dead_letter_path) as dead_letters:
+                def reject_line(line, raw, error):
+                    dead_letters.write({LINE_KEY: line, ERROR_KEY: '{}: {}'.format(type(error).__name__, error), RAW_KEY: raw})
+                    progress.read += 1
+                    progress.rejected += 1
+
+                events = read_events(path, on_error=reject_line)
+                chunks = chunked(self._read(events, progress), self.chunk_size)
+                for chunk, result, exception in imap_unordered(send_chunk, chunks, self.processes, executor=executor):
+                    if exception is not None:
+                        rejected = [(line, event, '{}: {}'.format(type(exception).__name__, exception)) for line, event in chunk]
+                    else:
+                        sent, rejected = result
+                        progress.sent += sent
+
+                    for line, event, error in rejected:
+                        dead_letters.write(dict(event, **{ERROR_KEY: error, LINE_KEY: line}))
+                    progress.rejected += len(rejected)
+
+                    if self.on_progress is not None:
+                        self.on_progress(progress)
+                dead_letters.flush()
+        finally:
+            if temporary_directory is not None:
+                shutil.rmtree(temporary_directory, ignore_errors=True)
+        return progress
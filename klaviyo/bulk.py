@@ -0,0 +1,345 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import itertools
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+def chunked(iterable, size):
+    """Lazily splits an iterable into lists of at most `size` items.
+
+    Args:
+        iterable (iterable): Items to split, may be a generator.
+        size (int): Maximum chunk size.
+
+    Returns:
+        (generator): Lists of items.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap_unordered(function, iterable, max_workers, max_pending=None, executor=None):
+    """Calls `function` on every item using a bounded thread pool, yielding in completion order.
+
+    Items are pulled from `iterable` only as workers free up, so a generator over millions of
+    items is never materialized.
+
+    Args:
+        function (callable): Called with each item.
+        iterable (iterable): Items to process.
+        max_workers (int): Number of threads.
+        max_pending (int): Maximum items submitted but not yet yielded, defaults to twice max_workers.
+        executor (Executor): Pool to submit to instead of a new thread pool, e.g. a ProcessPoolExecutor
+            of max_workers processes; not shut down.
+
+    Returns:
+        (generator): (item, result, exception) tuples; exception is None on success.
+    """
+    if executor is not None:
+        for outcome in _imap_unordered(executor, function, iterable, max_pending or max_workers * 2):
+            yield outcome
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for outcome in _imap_unordered(executor, function, iterable, max_pending or max_workers * 2):
+            yield outcome
+
+
+def _imap_unordered(executor, function, iterable, max_pending):
+    iterator = iter(iterable)
+    pending = {}
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < max_pending:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            pending[executor.submit(function, item)] = item
+
+        if not pending:
+            return
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            exception = future.exception()
+            yield item, None if exception is not None else future.result(), exception
+
+
+async def imap_unordered_async(function, iterable, max_workers):
+    """Asyncio counterpart of imap_unordered: awaits `function` on every item with at most `max_workers`
+    calls in flight, yielding in completion order.
+
+    Args:
+        function (callable): Called with an item, returns an awaitable.
+        iterable (iterable): Items to process.
+        max_workers (int): Maximum concurrent calls.
+
+    Returns:
+        (async generator): (item, result, exception) tuples; exception is None on success.
+    """
+    iterator = iter(iterable)
+    pending = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_workers:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(function(item))] = item
+
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                exception = future.exception()
+                yield item, None if exception is not None else future.result(), exception
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class ChunkResult(object):
+    """Response to one chunk of a bulk operation."""
+
+    def __init__(self, index, items, response):
+        """
+        Args:
+            index (int): Position of the chunk in the input.
+            items (list): Items sent in the chunk.
+            response (KlaviyoAPIResponse): Response to the chunk.
+        """
+        self.index = index
+        self.items = items
+        self.response = response
+
+
+class ChunkFailure(object):
+    """Failed chunk of a bulk operation, holding its items so they can be resent."""
+
+    def __init__(self, index, items, exception):
+        """
+        Args:
+            index (int): Position of the chunk in the input.
+            items (list): Items sent in the chunk.
+            exception (Exception): Error raised sending the chunk.
+        """
+        self.index = index
+        self.items = items
+        self.exception = exception
+
+
+class BulkResult(object):
+    """Merged outcome of a bulk operation."""
+
+    def __init__(self):
+        self.results = []
+        self.failures = []
+
+    @property
+    def succeeded(self):
+        """True if every chunk succeeded."""
+        return not self.failures
+
+    @property
+    def data(self):
+        """Concatenation of every successful chunk's response data, in input order."""
+        merged = []
+        for result in sorted(self.results, key=lambda result: result.index):
+            if isinstance(result.response.data, list):
+                merged.extend(result.response.data)
+        return merged
+
+
+def run_chunked(function, iterable, chunk_size, max_workers):
+    """Sends an iterable in chunks concurrently and collects the outcome of every chunk.
+
+    Args:
+        function (callable): Called with each chunk (a list), returns a KlaviyoAPIResponse.
+        iterable (iterable): Items to send, may be a generator.
+        chunk_size (int): Maximum items per request.
+        max_workers (int): Maximum concurrent requests.
+
+    Returns:
+        (BulkResult): Per chunk responses and failures.
+    """
+    bulk_result = BulkResult()
+    chunks = enumerate(chunked(iterable, chunk_size))
+
+    for (index, items), response, exception in imap_unordered(lambda chunk: function(chunk[1]), chunks, max_workers):
+        if exception is None:
+            bulk_result.results.append(ChunkResult(index, items, response))
+        else:
+            bulk_result.failures.append(ChunkFailure(index, items, exception))
+    return bulk_result
+
+
+async def run_chunked_async(function, iterable, chunk_size, max_workers):
+    """Asyncio counterpart of run_chunked.
+
+    Args:
+        function (callable): Called with each chunk (a list), returns an awaitable KlaviyoAPIResponse.
+        iterable (iterable): Items to send, may be a generator.
+        chunk_size (int): Maximum items per request.
+        max_workers (int): Maximum concurrent requests.
+
+    Returns:
+        (BulkResult): Per chunk responses and failures.
+    """
+    bulk_result = BulkResult()
+    chunks = enumerate(chunked(iterable, chunk_size))
+
+    async for (index, items), response, exception in imap_unordered_async(lambda chunk: function(chunk[1]), chunks, max_workers):
+        if exception is None:
+            bulk_result.results.append(ChunkResult(index, items, response))
+        else:
+            bulk_result.failures.append(ChunkFailure(index, items, exception))
+    return bulk_result
+
+
+class FanOut(object):
+    """Runs an iterator function for many keys on a bounded pool of threads, streaming (key, item) tuples
+    in completion order.
+
+    Keys are pulled lazily, so `keys` may be a generator. An error raised for one key is collected in
+    `errors` and the other keys keep going. Closing the iteration early stops the workers.
+    """
+    DEFAULT_MAX_BUFFERED = 1000
+    POLL_INTERVAL = 0.1
+
+    _DONE = object()
+
+    def __init__(self, function, keys, max_workers, max_buffered=DEFAULT_MAX_BUFFERED):
+        """
+        Args:
+            function (callable): Called with a key, returns an iterable of items.
+            keys (iterable): Keys to fan out over.
+            max_workers (int): Number of keys processed concurrently.
+            max_buffered (int): Maximum items produced but not yet consumed.
+        """
+        self.function = function
+        self.keys = iter(keys)
+        self.max_workers = max_workers
+        self.errors = {}
+
+        self._items = queue.Queue(max_buffered)
+        self._keys_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def __iter__(self):
+        workers = []
+        for _ in range(self.max_workers):
+            worker = threading.Thread(target=self._run)
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        running = len(workers)
+        try:
+            while running:
+                item = self._items.get()
+                if item is self._DONE:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            self._stopped.set()
+
+    def _next_key(self):
+        with self._keys_lock:
+            return next(self.keys, self._DONE)
+
+    def _put(self, item):
+        while not self._stopped.is_set():
+            try:
+                self._items.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                key = self._next_key()
+                if key is self._DONE:
+                    return
+                try:
+                    for item in self.function(key):
+                        if not self._put((key, item)):
+                            return
+                except Exception as e:
+                    self.errors[key] = e
+        finally:
+            self._put(self._DONE)
+
+
+class AsyncFanOut(object):
+    """Asyncio counterpart of FanOut, iterated with `async for`: runs an async iterator function for many keys
+    in `max_workers` tasks on the running loop.
+    """
+    DEFAULT_MAX_BUFFERED = FanOut.DEFAULT_MAX_BUFFERED
+
+    _DONE = object()
+
+    def __init__(self, function, keys, max_workers, max_buffered=DEFAULT_MAX_BUFFERED):
+        """
+        Args:
+            function (callable): Called with a key, returns an async iterable of items.
+            keys (iterable): Keys to fan out over.
+            max_workers (int): Number of keys processed concurrently.
+            max_buffered (int): Maximum items produced but not yet consumed.
+        """
+        self.function = function
+        self.keys = iter(keys)
+        self.max_workers = max_workers
+        self.max_buffered = max_buffered
+        self.errors = {}
+
+        self._stopped = False
+
+    async def __aiter__(self):
+        items = asyncio.Queue(self.max_buffered)
+        workers = [asyncio.ensure_future(self._run(items)) for _ in range(self.max_workers)]
+
+        running = len(workers)
+        try:
+            while running:
+                item = await items.get()
+                if item is self._DONE:
+                    running -= 1
+                else:
+                    yield item
+        finally:
+            self._stopped = True
+            for worker in workers:
+                worker.cancel()
+
+    async def _run(self, items):
+        try:
+            # workers share the loop's thread, so the keys need no lock
+            for key in self.keys:
+                try:
+                    async for item in self.function(key):
+                        await items.put((key, item))
+                except Exception as e:
+                    self.errors[key] = e
+        finally:
+            if not self._stopped:
+                await items.put(self._DONE)
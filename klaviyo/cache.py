@@ -0,0 +1,392 @@
+import base64
+import collections
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+
+# returned by CacheBackend.get when a key is missing or expired, since None is a cacheable value
+MISSING = object()
+
+
+class CacheBackend(object):
+    """Key/value store with per-entry expiry.
+
+    Keys are strings and values are json serializable. Implementations must be thread-safe.
+    """
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            Cached value, or MISSING.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        """
+        Args:
+            key (str): Cache key.
+            value: Value to cache.
+            ttl (float or None): Seconds until the entry expires, None never expires.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class LRUCache(CacheBackend):
+    """In-memory cache evicting the least recently used entry when full."""
+    DEFAULT_MAXSIZE = 10000
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        """
+        Args:
+            maxsize (int): Maximum number of entries.
+        """
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache that survives process restarts."""
+
+    def __init__(self, path, table='klaviyo_cache'):
+        """
+        Args:
+            path (str): SQLite database file, created if missing.
+            table (str): Table holding the entries.
+        """
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS {} (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)'.format(table)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value, expires_at FROM {} WHERE key = ?'.format(self.table), (key, )
+            ).fetchone()
+        if row is None:
+            return MISSING
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return MISSING
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO {} (key, value, expires_at) VALUES (?, ?, ?)'.format(self.table),
+                (key, json.dumps(value), expires_at)
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._connection.execute('DELETE FROM {} WHERE key = ?'.format(self.table), (key, ))
+
+    def purge_expired(self):
+        """Deletes every expired entry."""
+        with self._lock:
+            self._connection.execute('DELETE FROM {} WHERE expires_at <= ?'.format(self.table), (time.time(), ))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CacheStats(object):
+    """Counters of a ResponseCache.
+
+    hits: fresh responses served without a request.
+    misses: requests sent without a usable cached response.
+    revalidations: conditional requests sent for a stale response.
+    not_modified: revalidations answered 304, serving the cached body.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class CachedResponse(object):
+    """A cached response and the validators used to revalidate it."""
+    ETAG = 'ETag'
+    LAST_MODIFIED = 'Last-Modified'
+    IF_NONE_MATCH = 'If-None-Match'
+    IF_MODIFIED_SINCE = 'If-Modified-Since'
+
+    # marks a body left undecoded by the codec (RawCodec), stored as base64 since bytes aren't json serializable
+    BYTES = 'bytes'
+
+    def __init__(self, status_code, data, fresh_until, etag=None, last_modified=None):
+        """
+        Args:
+            status_code (int): HTTP status code.
+            data: Decoded response.
+            fresh_until (float): Unix time the response becomes stale.
+            etag (str): ETag validator.
+            last_modified (str): Last-Modified validator.
+        """
+        self.status_code = status_code
+        self.data = data
+        self.fresh_until = fresh_until
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @classmethod
+    def from_value(cls, value):
+        status_code, data, fresh_until, etag, last_modified = value[:5]
+        if len(value) > 5 and value[5] == cls.BYTES:
+            return cls(status_code, base64.b64decode(data), fresh_until, etag, last_modified)
+        return cls(status_code, copy.deepcopy(data), fresh_until, etag, last_modified)
+
+    def to_value(self):
+        """Returns a json serializable value for cache backends."""
+        if isinstance(self.data, bytes):
+            data = base64.b64encode(self.data).decode('ascii')
+            return [self.status_code, data, self.fresh_until, self.etag, self.last_modified, self.BYTES]
+        return [self.status_code, self.data, self.fresh_until, self.etag, self.last_modified]
+
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+
+    def get_conditional_headers(self):
+        """
+        Returns:
+            (dict): Headers turning a GET into a conditional request.
+        """
+        headers = {}
+        if self.etag:
+            headers[self.IF_NONE_MATCH] = self.etag
+        if self.last_modified:
+            headers[self.IF_MODIFIED_SINCE] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """Opt-in cache of private GET responses, consulted by KlaviyoAPI._request.
+
+    Only paths matching one of `ttls` are cached. Once a response is stale, it is revalidated with a
+    conditional request (If-None-Match / If-Modified-Since) if the server sent an ETag or Last-Modified,
+    and a 304 Not Modified answer serves the cached body. Keys are built from the method, path, params and body
+    with the api key removed. Every cached entry belongs to a scope (the first three path segments, e.g.
+    'v2/list/<list id>'); a successful POST, PUT or DELETE bumps the generation of its scope and of its
+    related scopes, which orphans every entry cached under the old generation. Generations live in the
+    backend too, so an external backend shares invalidations between processes.
+    """
+    DEFAULT_TTLS = (
+        (r'^v2/lists$', 300),
+        (r'^v2/list/[^/]+$', 300),
+        (r'^v1/metrics$', 300),
+        (r'^v1/campaigns$', 300),
+        (r'^v1/person/[^/]+$', 60),
+    )
+
+    # mutating a list changes the list of lists (e.g. its name)
+    RELATED_SCOPES = {
+        'v2/list': ('v2/lists', ),
+    }
+
+    # stale responses with a validator are kept this long so they can be revalidated
+    DEFAULT_REVALIDATE_TTL = 24 * 60 * 60
+
+    API_KEY = 'api_key'
+    KEY_PREFIX = 'klaviyo:response:'
+    GENERATION_PREFIX = 'klaviyo:generation:'
+
+    def __init__(self, backend=None, ttls=DEFAULT_TTLS, revalidate_ttl=DEFAULT_REVALIDATE_TTL):
+        """
+        Args:
+            backend (CacheBackend): Where responses are stored, defaults to an in-memory LRUCache.
+            ttls (tuple): (path regex, seconds) pairs; paths matching none of them are not cached.
+            revalidate_ttl (float): Seconds a stale response with an ETag or Last-Modified validator is kept
+                to revalidate it with a conditional request.
+        """
+        self.backend = backend if backend is not None else LRUCache()
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.revalidate_ttl = revalidate_ttl
+        self.stats = CacheStats()
+
+    def get_ttl(self, path):
+        """
+        Args:
+            path (str): Request path relative to the api server, e.g. 'v2/list/abc123'.
+
+        Returns:
+            (float or None): Seconds responses of this path are cached, None if they are not cached.
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    @staticmethod
+    def get_scope(path):
+        return '/'.join(path.split('/')[:3])
+
+    def _get_generation(self, scope):
+        key = self.GENERATION_PREFIX + scope
+        generation = self.backend.get(key)
+        if generation is MISSING:
+            # a fresh token rather than a default, so an evicted generation can never resurrect stale entries
+            generation = uuid.uuid4().hex
+            self.backend.set(key, generation)
+        return generation
+
+    def _strip_api_key(self, values):
+        if isinstance(values, dict):
+            return dict((k, v) for k, v in values.items() if k != self.API_KEY)
+        if isinstance(values, (str, bytes)):
+            try:
+                return self._strip_api_key(json.loads(values))
+            except ValueError:
+                return values
+        return values
+
+    def get_key(self, path, params=None, data=None):
+        """Builds the cache key of a GET request.
+
+        Args:
+            path (str): Request path relative to the api server.
+            params (dict): Query params.
+            data (str): Json body.
+
+        Returns:
+            (str): Cache key, independent of the api key.
+        """
+        request = json.dumps(
+            [path, self._strip_api_key(params), self._strip_api_key(data)],
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha1(request.encode('utf-8')).hexdigest()
+        return '{}{}:{}'.format(self.KEY_PREFIX, digest, self._get_generation(self.get_scope(path)))
+
+    def get(self, key):
+        """Looks a response up; a stale entry is still returned if it can be revalidated.
+
+        Args:
+            key (str): Cache key from get_key.
+
+        Returns:
+            (CachedResponse or None): Cached response, None on a miss.
+        """
+        value = self.backend.get(key)
+        entry = None if value is MISSING else CachedResponse.from_value(value)
+
+        if entry is not None and entry.is_fresh():
+            self.stats.increment('hits')
+        elif entry is not None and entry.has_validators():
+            self.stats.increment('revalidations')
+        else:
+            self.stats.increment('misses')
+            entry = None
+        return entry
+
+    def set(self, key, status_code, data, ttl, headers=None):
+        """
+        Args:
+            key (str): Cache key from get_key.
+            status_code (int): HTTP status code.
+            data: Decoded response.
+            ttl (float): Seconds the response is fresh.
+            headers (dict): Response headers, holding the ETag and Last-Modified validators.
+        """
+        headers = headers or {}
+        entry = CachedResponse(
+            status_code,
+            copy.deepcopy(data),
+            time.time() + ttl,
+            headers.get(CachedResponse.ETAG),
+            headers.get(CachedResponse.LAST_MODIFIED),
+        )
+        # entries that can be revalidated are kept past their freshness, until revalidate_ttl
+        self.backend.set(key, entry.to_value(), ttl + self.revalidate_ttl if entry.has_validators() else ttl)
+
+    def refresh(self, key, entry, ttl, headers=None):
+        """Marks a revalidated (304 Not Modified) entry fresh again.
+
+        Args:
+            key (str): Cache key from get_key.
+            entry (CachedResponse): Entry that was revalidated.
+            ttl (float): Seconds the response is fresh.
+            headers (dict): Headers of the 304 response, which may carry updated validators.
+        """
+        self.stats.increment('not_modified')
+        headers = dict(headers or {})
+        headers.setdefault(CachedResponse.ETAG, entry.etag)
+        headers.setdefault(CachedResponse.LAST_MODIFIED, entry.last_modified)
+        self.set(key, entry.status_code, entry.data, ttl, headers)
+
+    def invalidate(self, path):
+        """Drops every cached response of a path's scope and related scopes.
+
+        Args:
+            path (str): Path of a mutating request.
+        """
+        scope = self.get_scope(path)
+        collection = '/'.join(path.split('/')[:2])
+        for invalidated in (scope, ) + self.RELATED_SCOPES.get(collection, ()):
+            self.backend.set(self.GENERATION_PREFIX + invalidated, uuid.uuid4().hex)
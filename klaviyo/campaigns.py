@@ -1,4 +1,5 @@
 from .api_helper import KlaviyoAPI
+from .pagination import Paginator
 
 
 class Campaigns(KlaviyoAPI):
@@ -7,6 +8,11 @@ class Campaigns(KlaviyoAPI):
     RECIPIENTS = 'recipients'
 
     OFFSET = 'offset'
+    NEXT_OFFSET = 'next_offset'
+    DATA = 'data'
+    TOTAL = 'total'
+
+    MAX_RECIPIENTS_PAGE_SIZE = 5000
 
     def get_campaigns(self, page=0, count=50):
         """Returns a list of all the campaigns you've created.
@@ -30,7 +36,7 @@ class Campaigns(KlaviyoAPI):
 
         return self._v1_request(self.CAMPAIGNS, self.HTTP_GET, params)
 
-    def get_campaign_recipients(self, campaign_id, count=5000, offset='', sort="asc"):
+    def get_campaign_recipients(self, campaign_id, count=5000, offset='', sort="asc", stream=False):
         """Returns summary information about email recipients for the campaign
         specified that includes each recipients email, customer ID, and status.
 
@@ -42,6 +48,7 @@ class Campaigns(KlaviyoAPI):
             offset (str): For pagination, the next_offset from the api response.
             sort (str): Sort order to apply to results, either ascending or descending.
              Valid values are asc or desc. Defaults to asc.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the recipients one by one as the body is read.
         Returns:
             (list): containing the campaign recipients.
 
@@ -53,4 +60,50 @@ class Campaigns(KlaviyoAPI):
             self.OFFSET: offset
         }
 
-        return self._v1_request('{}/{}/{}'.format(self.CAMPAIGN, campaign_id, self.RECIPIENTS), self.HTTP_GET, params)
+        return self._v1_request(
+            '{}/{}/{}'.format(self.CAMPAIGN, campaign_id, self.RECIPIENTS),
+            self.HTTP_GET,
+            params,
+            stream_key=self.DATA if stream else None,
+        )
+
+    def iter_campaigns(self, count=50):
+        """Lazily iterates every campaign, following pages, see get_campaigns.
+
+        Args:
+            count (int): Campaigns per page.
+
+        Returns:
+            (generator): Campaign dicts, most recently created first.
+        """
+        page = 0
+        seen = 0
+        while True:
+            data = self.get_campaigns(page=page, count=count).data or {}
+            campaigns = data.get(self.DATA) or []
+            for campaign in campaigns:
+                yield campaign
+            seen += len(campaigns)
+            if not campaigns or seen >= data.get(self.TOTAL, 0):
+                return
+            page += 1
+
+    def iter_campaign_recipients(self, campaign_id, offset=None, count=MAX_RECIPIENTS_PAGE_SIZE, prefetch=False):
+        """Lazily iterates every recipient of a campaign, following offsets, see get_campaign_recipients.
+
+        Args:
+            campaign_id (str): ID for a campaign.
+            offset (str): Offset to resume from, e.g. the `cursor` of an interrupted iterator.
+            count (int): Recipients per page, at most 5000.
+            prefetch (bool): Fetch the next page while the current one is consumed.
+
+        Returns:
+            (Paginator): Iterator over recipient records; its `cursor` is the offset to resume from.
+        """
+        return Paginator(
+            lambda page_offset: self.get_campaign_recipients(campaign_id, count=count, offset=page_offset or ''),
+            records_key=self.DATA,
+            cursor_key=self.NEXT_OFFSET,
+            cursor=offset,
+            prefetch=prefetch,
+        )
@@ -0,0 +1,90 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec(object):
+    """Encodes request bodies and decodes responses with the standard library json module."""
+
+    def encode(self, value):
+        """
+        Args:
+            value: Json serializable value.
+
+        Returns:
+            (bytes): Utf-8 encoded json.
+        """
+        return json.dumps(value).encode('utf-8')
+
+    def decode(self, content):
+        """
+        Args:
+            content (bytes or str): Json document.
+
+        Returns:
+            Decoded value.
+
+        Raises:
+            (ValueError): Content isn't json.
+        """
+        return json.loads(content)
+
+    def dumps(self, value):
+        """Same as encode, as a str."""
+        return self.encode(value).decode('utf-8')
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by orjson, several times faster on large member lists, timelines and exports.
+
+    Values orjson can't serialize (e.g. integers over 64 bits) fall back to the json module.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('OrjsonCodec requires orjson: pip install klaviyo[orjson]')
+
+    def encode(self, value):
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super(OrjsonCodec, self).encode(value)
+
+    def decode(self, content):
+        # orjson's decode error subclasses ValueError
+        return orjson.loads(content)
+
+
+class RawCodec(JSONCodec):
+    """Leaves responses undecoded: response data is the raw body bytes, for zero-parse passthrough to storage.
+
+    Request bodies are still encoded with `encoder`. Bodies aren't checked to be json, and helpers that
+    read response data (paginators, exporters, bulk methods) can't be used with it. Public track and identify
+    calls answer '1' or '0' as text.
+    """
+
+    def __init__(self, encoder=None):
+        """
+        Args:
+            encoder (JSONCodec): Codec encoding request bodies, defaults to get_default_codec().
+        """
+        self.encoder = encoder if encoder is not None else get_default_codec()
+
+    def encode(self, value):
+        return self.encoder.encode(value)
+
+    def decode(self, content):
+        return content
+
+
+def get_default_codec():
+    """
+    Returns:
+        (JSONCodec): OrjsonCodec if orjson is installed, JSONCodec otherwise.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    return JSONCodec()
@@ -0,0 +1,144 @@
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+class CompressionStats(object):
+    """Byte counters of a Compression, to compare what was sent and received on the wire with the bodies.
+
+    request_bytes / request_wire_bytes: request bodies before and after compression, per attempt.
+    response_bytes / response_wire_bytes: response bodies after and before decompression. Streamed
+    responses aren't counted, their bodies being read after the request returns.
+    compressed_requests: attempts sent with a gzipped body.
+    """
+
+    def __init__(self):
+        self.request_bytes = 0
+        self.request_wire_bytes = 0
+        self.response_bytes = 0
+        self.response_wire_bytes = 0
+        self.compressed_requests = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, size, wire_size):
+        with self._lock:
+            self.request_bytes += size
+            self.request_wire_bytes += wire_size
+            if wire_size != size:
+                self.compressed_requests += 1
+
+    def record_response(self, size, wire_size):
+        with self._lock:
+            self.response_bytes += size
+            self.response_wire_bytes += wire_size
+
+    @property
+    def request_ratio(self):
+        """(float): Wire bytes per request body byte, 1.0 before any request."""
+        return float(self.request_wire_bytes) / self.request_bytes if self.request_bytes else 1.0
+
+    @property
+    def response_ratio(self):
+        """(float): Wire bytes per response body byte, 1.0 before any response."""
+        return float(self.response_wire_bytes) / self.response_bytes if self.response_bytes else 1.0
+
+
+class Compression(object):
+    """Compressed transport: compressed responses are accepted and large request bodies are gzipped.
+
+    Responses are accepted gzip or deflate encoded, and brotli encoded when brotli (or brotlicffi) is
+    installed; requests and aiohttp decompress them transparently. Request bodies are only gzipped for
+    the endpoints in `request_endpoints`, since the api doesn't accept encoded bodies everywhere.
+    Track and identify bodies are never compressed.
+    """
+    GZIP = 'gzip'
+    ACCEPT_ENCODING = 'Accept-Encoding'
+    CONTENT_ENCODING = 'Content-Encoding'
+    CONTENT_LENGTH = 'Content-Length'
+
+    DEFAULT_MIN_SIZE = 1024
+    DEFAULT_COMPRESSLEVEL = 6
+
+    # methods whose bodies may be gzipped; get bodies only carry a few query fields
+    REQUEST_METHODS = ('POST', 'PUT', 'DELETE', )
+
+    # endpoints, as named by hooks and tracing, taking large json bodies that may be sent gzipped
+    REQUEST_ENDPOINTS = (
+        'v2/list/{id}/members',
+        'v2/list/{id}/subscribe',
+    )
+
+    def __init__(
+        self,
+        min_size=DEFAULT_MIN_SIZE,
+        compresslevel=DEFAULT_COMPRESSLEVEL,
+        request_endpoints=REQUEST_ENDPOINTS,
+        accept_brotli=True
+        ):
+        """
+        Args:
+            min_size (int): Request bodies smaller than this many bytes are sent as is.
+            compresslevel (int): Gzip compression level of request bodies, from 1 (fastest) to 9 (smallest).
+            request_endpoints (tuple): Endpoints whose request bodies may be gzipped, () to never compress them.
+            accept_brotli (bool): Accept brotli encoded responses when brotli is installed.
+        """
+        self.min_size = min_size
+        self.compresslevel = compresslevel
+        self.request_endpoints = frozenset(request_endpoints)
+        self.stats = CompressionStats()
+
+        encodings = ['gzip', 'deflate']
+        if accept_brotli and brotli is not None:
+            encodings.append('br')
+        self.accept_encoding = ', '.join(encodings)
+
+    def get_headers(self, headers):
+        """
+        Args:
+            headers (dict): Headers of a request.
+
+        Returns:
+            (dict): Copy of the headers accepting compressed responses.
+        """
+        return dict(headers, **{self.ACCEPT_ENCODING: self.accept_encoding})
+
+    def compress(self, method, endpoint, data):
+        """Gzips a request body if its endpoint accepts it and it is large enough to be worth it.
+
+        Args:
+            method (str): HTTP method.
+            endpoint (str): Endpoint of the request, e.g. 'v2/list/{id}/members'.
+            data (bytes or str): Body of the request.
+
+        Returns:
+            (bytes or str, bool): Body to send, and whether it was compressed.
+        """
+        if (method.upper() not in self.REQUEST_METHODS or endpoint not in self.request_endpoints
+                or not isinstance(data, bytes) or len(data) < self.min_size):
+            return data, False
+        return gzip.compress(data, self.compresslevel), True
+
+    @classmethod
+    def get_wire_size(cls, response, size):
+        """
+        Args:
+            response (Response): Fully read response.
+            size (int): Size of the decoded body.
+
+        Returns:
+            (int): Size of the body as received.
+        """
+        if not response.headers.get(cls.CONTENT_ENCODING):
+            return size
+        # urllib3 counts the bytes read off the socket, aiohttp only exposes the Content-Length
+        tell = getattr(getattr(response, 'raw', None), 'tell', None)
+        if tell is not None:
+            return tell()
+        return int(response.headers.get(cls.CONTENT_LENGTH) or size)
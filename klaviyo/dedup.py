@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+
+from .cache import LRUCache, MISSING
+
+
+class DedupStats(object):
+    """Counters of a TrackOnceIndex.
+
+    hits: calls dropped as duplicates, without a request.
+    persistent_hits: hits found in the persistent cache after missing the in-memory index.
+    misses: calls with a new key, sent to Klaviyo.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    @property
+    def hit_ratio(self):
+        """(float): Share of the calls dropped as duplicates, 0.0 before any call."""
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+
+class TrackOnceIndex(object):
+    """Local index of the track_once events already sent, so duplicates are dropped without network I/O.
+
+    Keys are kept in a bounded LRU for `ttl` seconds. An optional persistent cache (e.g. SQLiteCache) is
+    consulted on memory misses, so the index survives restarts and can be shared by the processes of a host.
+    A key is only recorded once Klaviyo accepted the event; failed or rejected calls are sent again.
+    """
+    DEFAULT_MAXSIZE = 100000
+    DEFAULT_TTL = 24 * 60 * 60
+
+    KEY_PREFIX = 'track_once:'
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, persistent_cache=None):
+        """
+        Args:
+            maxsize (int): Maximum number of keys kept in memory.
+            ttl (float or None): Seconds a sent event is known, None to keep it until evicted.
+            persistent_cache (CacheBackend): Second level index, e.g. SQLiteCache.
+        """
+        self.ttl = ttl
+        self.persistent_cache = persistent_cache
+        self.stats = DedupStats()
+
+        self._cache = LRUCache(maxsize)
+
+    @staticmethod
+    def get_key(public_token, event, email=None, external_id=None, idempotency_key=None):
+        """Builds the key of a track_once call.
+
+        Without an idempotency key, the key is derived from the event name and the profile identifiers,
+        which is what Klaviyo deduplicates track_once events on.
+
+        Args:
+            public_token (str): Public api token, keys are scoped per account.
+            event (str): Event name.
+            email (str or None): Email address, compared case-insensitively.
+            external_id (str or None): External id for customer.
+            idempotency_key (str or None): Key supplied by the caller, used instead of the event and profile.
+
+        Returns:
+            (str): Hashed key; emails aren't stored in the index.
+        """
+        if idempotency_key is not None:
+            parts = [public_token, str(idempotency_key)]
+        else:
+            parts = [public_token, event, email.strip().lower() if email else None, str(external_id) if external_id else None]
+        return hashlib.sha1(json.dumps(parts).encode('utf-8')).hexdigest()
+
+    def seen(self, key):
+        """Checks whether an event was already sent, counting a hit or a miss.
+
+        Args:
+            key (str): Key of the call, see get_key.
+
+        Returns:
+            (bool): True if the call is a duplicate.
+        """
+        if self._cache.get(key) is not MISSING:
+            self.stats.increment('hits')
+            return True
+
+        if self.persistent_cache is not None and self.persistent_cache.get(self.KEY_PREFIX + key) is not MISSING:
+            self.stats.increment('hits')
+            self.stats.increment('persistent_hits')
+            self._cache.set(key, True, self.ttl)
+            return True
+
+        self.stats.increment('misses')
+        return False
+
+    def add(self, key):
+        """Records an event as sent.
+
+        Args:
+            key (str): Key of the call, see get_key.
+        """
+        self._cache.set(key, True, self.ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(self.KEY_PREFIX + key, True, self.ttl)
+
+    def discard(self, key):
+        """Forgets an event, so it is sent again.
+
+        Args:
+            key (str): Key of the call, see get_key.
+        """
+        self._cache.delete(key)
+        if self.persistent_cache is not None:
+            self.persistent_cache.delete(self.KEY_PREFIX + key)
@@ -46,3 +46,6 @@ class KlaviyoRateLimitException(KlaviyoAPIException):
 class KlaviyoServerError(KlaviyoAPIException):
     pass
 
+
+class KlaviyoQueueFullException(KlaviyoException):
+    pass
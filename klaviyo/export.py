@@ -0,0 +1,275 @@
+import json
+import os
+
+from .bulk import imap_unordered
+from .exceptions import KlaviyoException
+from .sinks import JSONLSink
+
+
+class Checkpoint(object):
+    """Json state persisted atomically to a local file."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Checkpoint file.
+        """
+        self.path = path
+
+    def load(self):
+        """Reads the saved state.
+
+        Returns:
+            (dict or None): Saved state, None if nothing was saved yet.
+        """
+        try:
+            with open(self.path) as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (IOError, OSError):
+            return None
+
+    def save(self, state):
+        """Replaces the saved state; a crash leaves either the old or the new state.
+
+        Args:
+            state (dict): Json serializable state.
+        """
+        temporary_path = '{}.tmp'.format(self.path)
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        """Deletes the saved state."""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class MetricTimelineExporter(object):
+    """Streams every event of one metric, or of all metrics, into a sink, oldest first.
+
+    The cursor and the sink position are checkpointed after each page. When restarted with the same
+    checkpoint, the sink is truncated back to the last checkpoint and the export continues from the saved
+    cursor, so the output has no duplicates or gaps. Once caught up, running it again exports only new events.
+    """
+    DATA = 'data'
+    NEXT = 'next'
+    ID = 'id'
+
+    def __init__(self, metrics, sink, checkpoint_path, metric_id=None, since=None, count=None):
+        """
+        Args:
+            metrics (Metrics): Resource used to fetch timeline pages.
+            sink (Sink): Where events are written.
+            checkpoint_path (str): File the export progress is saved to.
+            metric_id (str or None): Metric to export, None exports every metric.
+            since (int): Unix timestamp to start from when there is no checkpoint yet.
+            count (int): Events per page, defaults to Metrics.TIMELINE_BATCH_SIZE.
+        """
+        self.metrics = metrics
+        self.sink = sink
+        self.checkpoint = Checkpoint(checkpoint_path)
+        self.metric_id = metric_id
+        self.since = since
+        self.count = count or metrics.TIMELINE_BATCH_SIZE
+        self.exported = 0
+
+    def _fetch_page(self, since):
+        if self.metric_id is None:
+            return self.metrics.get_metrics_timeline(since=since, count=self.count, sort=self.metrics.SORT_ASC)
+        return self.metrics.get_metric_timeline_by_id(self.metric_id, since=since, count=self.count, sort=self.metrics.SORT_ASC)
+
+    def _restore(self):
+        """Loads the checkpoint and rewinds the sink to it.
+
+        Returns:
+            (tuple): Cursor to fetch next and the id of the last event already written from that page.
+        """
+        state = self.checkpoint.load()
+        if state is None:
+            return self.since, None
+
+        if state.get('metric_id') != self.metric_id:
+            raise KlaviyoException('Checkpoint {} belongs to metric {}'.format(self.checkpoint.path, state.get('metric_id')))
+
+        self.sink.truncate(state['position'])
+        self.exported = state['exported']
+        return state['since'], state['last_event_id']
+
+    def run(self, max_pages=None):
+        """Exports pages until caught up (or until max_pages pages were fetched).
+
+        Args:
+            max_pages (int or None): Maximum pages to fetch in this run.
+
+        Returns:
+            (int): Total events exported, including previous runs sharing the checkpoint.
+        """
+        since, skip_through = self._restore()
+        pages = 0
+
+        while max_pages is None or pages < max_pages:
+            data = self._fetch_page(since).data
+            pages += 1
+
+            events = data.get(self.DATA) or []
+            if skip_through is not None:
+                ids = [event.get(self.ID) for event in events]
+                if skip_through in ids:
+                    events = events[ids.index(skip_through) + 1:]
+
+            for event in events:
+                self.sink.write(event)
+            self.exported += len(events)
+            self.sink.flush()
+
+            next_since = data.get(self.NEXT)
+            if next_since:
+                since, skip_through = next_since, None
+            elif events:
+                # caught up: keep the cursor of this page and skip what was written when it is fetched again
+                skip_through = events[-1].get(self.ID)
+
+            self.checkpoint.save({
+                'metric_id': self.metric_id,
+                'since': since,
+                'last_event_id': skip_through,
+                'position': self.sink.position(),
+                'exported': self.exported,
+            })
+
+            if not next_since:
+                break
+
+        return self.exported
+
+
+class CampaignRecipientExporter(object):
+    """Exports the recipients of many campaigns concurrently, one output file and checkpoint per campaign.
+
+    Each campaign's recipients are paged through by offset, the next page being fetched while the current
+    one is written. Its next offset and sink position are checkpointed after each page is written, so an
+    interrupted export resumes at the first page it hadn't finished, without refetching earlier pages or
+    duplicating rows. A finished campaign is checkpointed as done and skipped by later runs, since the recipients of a
+    sent campaign don't change.
+    """
+    ID = 'id'
+    STATUS = 'status'
+    DEFAULT_STATUSES = ('sent', )
+    DEFAULT_MAX_WORKERS = 4
+    DEFAULT_FILENAME = '{campaign_id}.jsonl'
+    CHECKPOINT_FILENAME = '{campaign_id}.checkpoint'
+
+    # columns of a recipient, for columnar sinks such as CSVSink
+    RECIPIENT_COLUMNS = ('email', 'customer_id', 'status', )
+
+    def __init__(
+        self,
+        campaigns,
+        directory,
+        sink_factory=JSONLSink,
+        filename=DEFAULT_FILENAME,
+        max_workers=DEFAULT_MAX_WORKERS,
+        count=None,
+        prefetch=True
+        ):
+        """
+        Args:
+            campaigns (Campaigns): Resource used to list campaigns and fetch recipient pages.
+            directory (str): Directory of the output files and checkpoints.
+            sink_factory (callable): Called with an output path, returns the Sink of one campaign.
+            filename (str): Name of the output files, formatted with campaign_id.
+            max_workers (int): Number of campaigns exported concurrently.
+            count (int): Recipients per page, defaults to Campaigns.MAX_RECIPIENTS_PAGE_SIZE.
+            prefetch (bool): Fetch the next page of a campaign while the current one is written.
+        """
+        self.campaigns = campaigns
+        self.directory = directory
+        self.sink_factory = sink_factory
+        self.filename = filename
+        self.max_workers = max_workers
+        self.count = count or campaigns.MAX_RECIPIENTS_PAGE_SIZE
+        self.prefetch = prefetch
+
+    def get_campaign_ids(self, statuses=DEFAULT_STATUSES):
+        """Lazily lists the campaigns to export, see Campaigns.iter_campaigns.
+
+        Args:
+            statuses (tuple): Only campaigns with one of these statuses are listed.
+
+        Returns:
+            (generator): Campaign ids.
+        """
+        for campaign in self.campaigns.iter_campaigns():
+            if campaign.get(self.STATUS) in statuses:
+                yield campaign[self.ID]
+
+    def run(self, campaign_ids=None):
+        """Exports every campaign, continuing interrupted exports and skipping finished ones.
+
+        Args:
+            campaign_ids (iterable or None): Campaigns to export, may be a generator; None exports every sent campaign.
+
+        Returns:
+            (tuple): dict of campaign id to the number of recipients exported, including previous runs, and
+                dict of campaign id to the exception that interrupted its export.
+        """
+        if campaign_ids is None:
+            campaign_ids = self.get_campaign_ids()
+
+        exported = {}
+        errors = {}
+        for campaign_id, count, exception in imap_unordered(self.export_campaign, campaign_ids, self.max_workers):
+            if exception is None:
+                exported[campaign_id] = count
+            else:
+                errors[campaign_id] = exception
+        return exported, errors
+
+    def export_campaign(self, campaign_id):
+        """Exports the recipients of one campaign, resuming from its checkpoint.
+
+        Args:
+            campaign_id (str): ID for a campaign.
+
+        Returns:
+            (int): Recipients exported, including previous runs.
+        """
+        checkpoint = Checkpoint(os.path.join(self.directory, self.CHECKPOINT_FILENAME.format(campaign_id=campaign_id)))
+        state = checkpoint.load() or {'offset': None, 'position': None, 'exported': 0, 'done': False}
+        if state['done']:
+            return state['exported']
+
+        with self.sink_factory(os.path.join(self.directory, self.filename.format(campaign_id=campaign_id))) as sink:
+            if state['position'] is not None:
+                sink.truncate(state['position'])
+
+            recipients = self.campaigns.iter_campaign_recipients(
+                campaign_id,
+                offset=state['offset'],
+                count=self.count,
+                prefetch=self.prefetch,
+            )
+            exported = state['exported']
+            for page in recipients.iter_pages():
+                for recipient in page:
+                    sink.write(recipient)
+                exported += len(page)
+                sink.flush()
+                self._save(checkpoint, recipients.next_cursor, sink, exported, done=not recipients.next_cursor)
+
+            self._save(checkpoint, None, sink, exported, done=True)
+        return exported
+
+    @staticmethod
+    def _save(checkpoint, offset, sink, exported, done=False):
+        checkpoint.save({
+            'offset': offset,
+            'position': sink.position(),
+            'exported': exported,
+            'done': done,
+        })
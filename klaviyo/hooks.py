@@ -0,0 +1,166 @@
+import collections
+import threading
+
+
+class RequestEvent(object):
+    """What instrumentation hooks see of a request attempt.
+
+    Events never hold the url's query string, params, bodies or headers, so the api key can't leak
+    through them; failures are described by `exception_type` only.
+    """
+
+    def __init__(self, endpoint, resource, endpoint_class, method, attempt, request_bytes):
+        """
+        Args:
+            endpoint (str): Path with ids replaced by '{id}', e.g. 'v2/list/{id}/members'.
+            resource (str): Name of the resource class that made the request, e.g. 'Lists'.
+            endpoint_class (str): Endpoint class of the request, e.g. 'v2/list'.
+            method (str): HTTP method.
+            attempt (int): Number of retries made before this attempt.
+            request_bytes (int): Size of the request body.
+        """
+        self.endpoint = endpoint
+        self.resource = resource
+        self.endpoint_class = endpoint_class
+        self.method = method
+        self.attempt = attempt
+        self.request_bytes = request_bytes
+        self.status_code = None
+        self.response_bytes = None
+        self.latency = None
+        self.exception_type = None
+        self.retry_delay = None
+
+
+class Hooks(object):
+    """Callbacks called around every request attempt.
+
+    pre_request: before an attempt is sent.
+    post_response: once a response arrived, whatever its status, with status_code, response_bytes and latency set.
+    retry: after a failed attempt that will be retried, with exception_type and retry_delay set.
+    error: after a failed attempt that won't be retried, with exception_type set.
+
+    Callbacks are called on the thread (or event loop) making the request, with a RequestEvent.
+    Exceptions they raise propagate to the caller.
+    """
+    PRE_REQUEST = 'pre_request'
+    POST_RESPONSE = 'post_response'
+    RETRY = 'retry'
+    ERROR = 'error'
+
+    EVENTS = (PRE_REQUEST, POST_RESPONSE, RETRY, ERROR, )
+
+    def __init__(self):
+        self._callbacks = dict((event, []) for event in self.EVENTS)
+
+    def register(self, event, callback):
+        """
+        Args:
+            event (str): One of EVENTS.
+            callback (callable): Called with a RequestEvent.
+
+        Raises:
+            (ValueError): Unknown event.
+        """
+        if event not in self._callbacks:
+            raise ValueError('Unknown hook event {}, must be one of: {}'.format(event, list(self.EVENTS)))
+        self._callbacks[event].append(callback)
+
+    def unregister(self, event, callback):
+        self._callbacks[event].remove(callback)
+
+    def emit(self, event, request_event):
+        for callback in self._callbacks[event]:
+            callback(request_event)
+
+
+class EndpointStats(object):
+    """Counters and recent latencies of one endpoint."""
+
+    def __init__(self, max_samples):
+        self.count = 0
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latencies = collections.deque(maxlen=max_samples)
+
+    def get_percentile(self, percentile):
+        """
+        Args:
+            percentile (float): Between 0 and 100.
+
+        Returns:
+            (float or None): Nearest-rank percentile of the recent latencies, None without samples.
+        """
+        if not self.latencies:
+            return None
+        latencies = sorted(self.latencies)
+        rank = max(int(round(percentile / 100.0 * len(latencies))) - 1, 0)
+        return latencies[min(rank, len(latencies) - 1)]
+
+
+class RequestMetrics(object):
+    """In-process aggregate of request hooks, per (method, endpoint).
+
+    Counts responses and errors, sums payload sizes and keeps the last `max_samples` latencies of
+    every endpoint for p50/p95/p99. Call `snapshot()` from an exporter to scrape it.
+    """
+    DEFAULT_MAX_SAMPLES = 1024
+    PERCENTILES = (50, 95, 99, )
+
+    def __init__(self, hooks=None, max_samples=DEFAULT_MAX_SAMPLES):
+        """
+        Args:
+            hooks (Hooks): Hooks to register on, one is created if not provided.
+            max_samples (int): Latencies kept per endpoint.
+        """
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.max_samples = max_samples
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+        self.hooks.register(Hooks.POST_RESPONSE, self._on_response)
+        self.hooks.register(Hooks.ERROR, self._on_error)
+
+    def _get_stats(self, event):
+        key = (event.method, event.endpoint)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = EndpointStats(self.max_samples)
+        return stats
+
+    def _on_response(self, event):
+        with self._lock:
+            stats = self._get_stats(event)
+            stats.count += 1
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.latencies.append(event.latency)
+
+    def _on_error(self, event):
+        with self._lock:
+            self._get_stats(event).errors += 1
+
+    def snapshot(self):
+        """
+        Returns:
+            (dict): (method, endpoint) to a dict of count, errors, request_bytes, response_bytes, p50, p95 and
+                p99 (seconds, None without responses).
+        """
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._endpoints.items():
+                values = {
+                    'count': stats.count,
+                    'errors': stats.errors,
+                    'request_bytes': stats.request_bytes,
+                    'response_bytes': stats.response_bytes,
+                }
+                for percentile in self.PERCENTILES:
+                    values['p{}'.format(percentile)] = stats.get_percentile(percentile)
+                snapshot[key] = values
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
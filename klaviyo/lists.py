@@ -1,4 +1,6 @@
 from .api_helper import KlaviyoAPI
+from .bulk import run_chunked
+from .pagination import Paginator
 
 
 class Lists(KlaviyoAPI):
@@ -9,6 +11,11 @@ class Lists(KlaviyoAPI):
     MEMBERS = 'members'
     ALL = 'all'
     LIST_NAME = 'list_name'
+    RECORDS = 'records'
+
+    # largest number of profiles or emails sent per request by the bulk methods
+    MAX_BATCH_SIZE = 100
+    DEFAULT_BULK_WORKERS = 4
 
     def get_lists(self):
         """Returns a list of Klaviyo lists.
@@ -195,7 +202,7 @@ class Lists(KlaviyoAPI):
 
         return self._v2_request('{}/{}/{}'.format(self.LIST, list_id, self.MEMBERS), self.HTTP_DELETE, params)
 
-    def get_list_exclusions(self, list_id, marker=None):
+    def get_list_exclusions(self, list_id, marker=None, stream=False):
         """Get all of the emails that have been excluded from a list along with the exclusion reason and exclusion time.
 
         https://www.klaviyo.com/docs/api/v2/lists#get-exclusions-all
@@ -203,15 +210,21 @@ class Lists(KlaviyoAPI):
         Args:
             list_id (str): The list id.
             marker (int): Pagination mechanism offset.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the exclusions one by one as the body is read.
 
         Returns:
             (list) of dicts containing an excluded email.
         """
         params = self._build_marker_param(marker)
 
-        return self._v2_request('{}/{}/exclusions/{}'.format(self.LIST, list_id, self.ALL), self.HTTP_GET, params)
+        return self._v2_request(
+            '{}/{}/exclusions/{}'.format(self.LIST, list_id, self.ALL),
+            self.HTTP_GET,
+            params,
+            stream_key=self.RECORDS if stream else None,
+        )
 
-    def get_all_members(self, group_id, marker=None):
+    def get_all_members(self, group_id, marker=None, stream=False):
         """Get all of the emails in a given list or segment.
 
         https://www.klaviyo.com/docs/api/v2/lists#get-members-all
@@ -219,13 +232,45 @@ class Lists(KlaviyoAPI):
         Args:
             group_id (str): The list id or the segment id.
             marker (int): Pagination mechanism offset.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the members one by one as the body is read.
 
         Returns:
             (list) of records containing profile IDs and emails and potentially a marker.
         """
         params = self._build_marker_param(marker)
 
-        return self._v2_request('group/{}/{}/{}'.format(group_id, self.MEMBERS, self.ALL), self.HTTP_GET, params)
+        return self._v2_request(
+            'group/{}/{}/{}'.format(group_id, self.MEMBERS, self.ALL),
+            self.HTTP_GET,
+            params,
+            stream_key=self.RECORDS if stream else None,
+        )
+
+    def iter_list_exclusions(self, list_id, marker=None, prefetch=False):
+        """Lazily iterates every exclusion of a list, following markers, see get_list_exclusions.
+
+        Args:
+            list_id (str): The list id.
+            marker (int): Marker to resume from, e.g. the `cursor` of an interrupted iterator.
+            prefetch (bool): Fetch the next page while the current one is consumed.
+
+        Returns:
+            (Paginator): Iterator over excluded email records; its `cursor` is the marker to resume from.
+        """
+        return Paginator(lambda page_marker: self.get_list_exclusions(list_id, page_marker), cursor=marker, prefetch=prefetch)
+
+    def iter_all_members(self, group_id, marker=None, prefetch=False):
+        """Lazily iterates every member of a list or segment, following markers, see get_all_members.
+
+        Args:
+            group_id (str): The list id or the segment id.
+            marker (int): Marker to resume from, e.g. the `cursor` of an interrupted iterator.
+            prefetch (bool): Fetch the next page while the current one is consumed.
+
+        Returns:
+            (Paginator): Iterator over member records; its `cursor` is the marker to resume from.
+        """
+        return Paginator(lambda page_marker: self.get_all_members(group_id, page_marker), cursor=marker, prefetch=prefetch)
 
     def get_members_from_segment(self, segment_id, emails):
         """Checks if one or more emails are in a given segment.
@@ -248,3 +293,73 @@ class Lists(KlaviyoAPI):
         }
 
         return self._v1_request('{}/{}/{}'.format(self.SEGMENT, segment_id, self.MEMBERS), self.HTTP_GET, params)
+
+    def add_subscribers_to_list_bulk(self, list_id, profiles, chunk_size=MAX_BATCH_SIZE, max_workers=DEFAULT_BULK_WORKERS):
+        """Subscribes any number of profiles to a list, see add_subscribers_to_list.
+
+        Args:
+            list_id (str): The list id.
+            profiles (iterable of dict): Profiles to subscribe, may be a generator.
+            chunk_size (int): Maximum profiles per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (BulkResult): Per chunk responses and failures.
+        """
+        return run_chunked(lambda chunk: self.add_subscribers_to_list(list_id, chunk), profiles, chunk_size, max_workers)
+
+    def delete_subscribers_from_list_bulk(self, list_id, emails, chunk_size=MAX_BATCH_SIZE, max_workers=DEFAULT_BULK_WORKERS):
+        """Unsubscribes any number of emails from a list, see delete_subscribers_from_list.
+
+        Args:
+            list_id (str): The list id.
+            emails (iterable of str): Email addresses, may be a generator.
+            chunk_size (int): Maximum emails per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (BulkResult): Per chunk responses and failures.
+        """
+        return run_chunked(lambda chunk: self.delete_subscribers_from_list(list_id, chunk), emails, chunk_size, max_workers)
+
+    def add_members_to_list_bulk(self, list_id, profiles, chunk_size=MAX_BATCH_SIZE, max_workers=DEFAULT_BULK_WORKERS):
+        """Adds any number of profiles to a list, see add_members_to_list.
+
+        Args:
+            list_id (str): The list id.
+            profiles (iterable of dict): Profiles to add, may be a generator.
+            chunk_size (int): Maximum profiles per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (BulkResult): Per chunk responses and failures.
+        """
+        return run_chunked(lambda chunk: self.add_members_to_list(list_id, chunk), profiles, chunk_size, max_workers)
+
+    def get_members_from_list_bulk(self, list_id, emails, chunk_size=MAX_BATCH_SIZE, max_workers=DEFAULT_BULK_WORKERS):
+        """Checks whether any number of emails are on a list, see get_members_from_list.
+
+        Args:
+            list_id (str): The list id.
+            emails (iterable of str): Email addresses, may be a generator.
+            chunk_size (int): Maximum emails per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (BulkResult): Per chunk responses and failures, BulkResult.data holds every member found.
+        """
+        return run_chunked(lambda chunk: self.get_members_from_list(list_id, chunk), emails, chunk_size, max_workers)
+
+    def remove_members_from_list_bulk(self, list_id, emails, chunk_size=MAX_BATCH_SIZE, max_workers=DEFAULT_BULK_WORKERS):
+        """Removes any number of emails from a list, see remove_members_from_list.
+
+        Args:
+            list_id (str): Klaviyo list id.
+            emails (iterable of str): Email addresses, may be a generator.
+            chunk_size (int): Maximum emails per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (BulkResult): Per chunk responses and failures.
+        """
+        return run_chunked(lambda chunk: self.remove_members_from_list(list_id, chunk), emails, chunk_size, max_workers)
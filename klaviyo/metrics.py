@@ -1,4 +1,8 @@
-from .api_helper import KlaviyoAPI
+import datetime
+
+from .api_helper import KlaviyoAPI, KlaviyoAPIResponse
+from .bulk import imap_unordered
+from .exceptions import KlaviyoException
 
 
 class Metrics(KlaviyoAPI):
@@ -11,6 +15,25 @@ class Metrics(KlaviyoAPI):
     BY = 'by'
     WHERE = 'where'
 
+    RESULTS = 'results'
+    SEGMENT = 'segment'
+    DATA = 'data'
+    DATE = 'date'
+    VALUES = 'values'
+
+    UNIT_DAY = 'day'
+    UNIT_WEEK = 'week'
+    UNIT_MONTH = 'month'
+    DATE_FORMAT = '%Y-%m-%d'
+
+    # number of units fetched per request by get_metric_export_sharded
+    DEFAULT_SHARD_SIZES = {
+        UNIT_DAY: 7,
+        UNIT_WEEK: 4,
+        UNIT_MONTH: 1,
+    }
+    DEFAULT_SHARD_WORKERS = 4
+
     STARTING_PAGE = 0
     DEFAULT_BATCH_SIZE = 50
     TIMELINE_BATCH_SIZE = DEFAULT_BATCH_SIZE + DEFAULT_BATCH_SIZE
@@ -33,7 +56,7 @@ class Metrics(KlaviyoAPI):
         }
         return self._v1_request(self.METRICS, self.HTTP_GET, params)
     
-    def get_metrics_timeline(self, since=None, count=TIMELINE_BATCH_SIZE, sort=KlaviyoAPI.SORT_DESC):
+    def get_metrics_timeline(self, since=None, count=TIMELINE_BATCH_SIZE, sort=KlaviyoAPI.SORT_DESC, stream=False):
         """"Fetches all of the metrics and its events regardless of the statistic.
 
         https://www.klaviyo.com/docs/api/metrics#metrics-timeline
@@ -42,6 +65,7 @@ class Metrics(KlaviyoAPI):
             since (str or int): Next attribute of the previous api call or unix timestamp.
             count (int): Number of events returned.
             sort (str): Sort order for timeline.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the events one by one as the body is read.
 
         Returns:
             (dict): Metric timeline information.
@@ -55,9 +79,9 @@ class Metrics(KlaviyoAPI):
         params = self._filter_params(params)
         url = '{}/{}'.format(self.METRICS, self.TIMELINE)
 
-        return self._v1_request(url, self.HTTP_GET, params)
+        return self._v1_request(url, self.HTTP_GET, params, stream_key=self.DATA if stream else None)
         
-    def get_metric_timeline_by_id(self, metric_id, since=None, count=TIMELINE_BATCH_SIZE, sort=KlaviyoAPI.SORT_DESC):
+    def get_metric_timeline_by_id(self, metric_id, since=None, count=TIMELINE_BATCH_SIZE, sort=KlaviyoAPI.SORT_DESC, stream=False):
         """"Returns a timeline of events for a specific metric.
 
         https://www.klaviyo.com/docs/api/metrics#metric-timeline
@@ -67,6 +91,7 @@ class Metrics(KlaviyoAPI):
             since (str or int): Next attribute of the previous api call or unix timestamp.
             count (int): Number of events returned.
             sort (str): Sort order for timeline.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the events one by one as the body is read.
 
         Returns:
             (dict): Metric timeline information.
@@ -79,7 +104,7 @@ class Metrics(KlaviyoAPI):
         params = self._filter_params(params)
         url = '{}/{}/{}'.format(self.METRIC, metric_id, self.TIMELINE)
 
-        return self._v1_request(url, self.HTTP_GET, params)
+        return self._v1_request(url, self.HTTP_GET, params, stream_key=self.DATA if stream else None)
 
     def get_metric_export(
         self, 
@@ -123,3 +148,168 @@ class Metrics(KlaviyoAPI):
         url = '{}/{}/{}'.format(self.METRIC, metric_id, self.EXPORT)
 
         return self._v1_request(url, self.HTTP_GET, params)
+
+    def get_metric_export_sharded(
+        self,
+        metric_id,
+        start_date,
+        end_date,
+        unit=UNIT_DAY,
+        measurement=None,
+        where=None,
+        by=None,
+        count=None,
+        shard_size=None,
+        max_workers=DEFAULT_SHARD_WORKERS
+        ):
+        """Exports metric values over a long date range by fetching shards of it concurrently, see get_metric_export.
+
+        The range is split on `unit` boundaries (weeks start on Monday, months on the 1st) and the per shard
+        series are merged back into the shape get_metric_export returns. A date reported by two shards has its
+        values summed, which is exact for counts and totals; unique counts of a period split between shards are not.
+        With `by` and `count`, each shard returns its own top segments, so the merged set of segments can be larger.
+
+        Args:
+            metric_id (str): Metric ID for the statistic.
+            start_date (str or date): First day of the query, YYYY-MM-DD.
+            end_date (str or date): Last day of the query, YYYY-MM-DD.
+            unit (str): Day, week, or month.
+            measurement (json list): Type of metric to fetch.
+            where (json list): Condition to use to filter the set of events.
+            by (str): The name of a property to segment.
+            count (int): The number of segments to return.
+            shard_size (int): Units per shard, see DEFAULT_SHARD_SIZES.
+            max_workers (int): Maximum concurrent requests.
+        Return:
+            (KlaviyoAPIResponse) Merged metric information.
+        Raises:
+            (KlaviyoException): Unsupported unit, start_date after end_date or shard_size under 1.
+        """
+        shards = self._get_export_shards(start_date, end_date, unit, shard_size)
+
+        def fetch(shard):
+            return self._get_metric_export_shard(metric_id, shard, unit, measurement, where, by, count)
+
+        responses = {}
+        for shard, response, exception in imap_unordered(fetch, shards, max_workers):
+            if exception is not None:
+                raise exception
+            responses[shard] = response
+
+        return self._merge_export_responses(shards, responses)
+
+    def _get_export_shards(self, start_date, end_date, unit, shard_size):
+        """
+        Returns:
+            (list): Inclusive (first day, last day) shards of the export range.
+
+        Raises:
+            (KlaviyoException): Unsupported unit, empty range or shard size under 1.
+        """
+        if unit not in self.DEFAULT_SHARD_SIZES:
+            raise KlaviyoException('Unit must be one of {}, not {!r}'.format(', '.join(sorted(self.DEFAULT_SHARD_SIZES)), unit))
+        if shard_size is not None and shard_size < 1:
+            raise KlaviyoException('Shard size must be at least 1, not {!r}'.format(shard_size))
+
+        start_date = self._parse_date(start_date)
+        end_date = self._parse_date(end_date)
+        if start_date > end_date:
+            raise KlaviyoException('Start date {} is after end date {}'.format(start_date, end_date))
+
+        return self._split_export_range(start_date, end_date, unit, shard_size or self.DEFAULT_SHARD_SIZES[unit])
+
+    def _get_metric_export_shard(self, metric_id, shard, unit, measurement, where, by, count):
+        return self.get_metric_export(
+            metric_id,
+            start_date=shard[0].strftime(self.DATE_FORMAT),
+            end_date=shard[1].strftime(self.DATE_FORMAT),
+            unit=unit,
+            measurement=measurement,
+            where=where,
+            by=by,
+            count=count,
+        )
+
+    def _merge_export_responses(self, shards, responses):
+        """
+        Args:
+            shards (list): Shards of the export range, in order.
+            responses (dict): KlaviyoAPIResponse per shard.
+
+        Returns:
+            (KlaviyoAPIResponse): Merged metric information.
+        """
+        ordered = [responses[shard] for shard in shards]
+        return KlaviyoAPIResponse(ordered[-1].status_code, self._merge_exports([response.data for response in ordered]))
+
+    @classmethod
+    def _parse_date(cls, value):
+        if isinstance(value, datetime.datetime):
+            return value.date()
+        if isinstance(value, datetime.date):
+            return value
+        return datetime.datetime.strptime(value[:10], cls.DATE_FORMAT).date()
+
+    @classmethod
+    def _next_boundary(cls, day, unit, shard_size):
+        """Returns the first day of the shard after the one starting at or containing `day`."""
+        if unit == cls.UNIT_MONTH:
+            month = day.month - 1 + shard_size
+            return datetime.date(day.year + month // 12, month % 12 + 1, 1)
+        if unit == cls.UNIT_WEEK:
+            return day - datetime.timedelta(days=day.weekday()) + datetime.timedelta(weeks=shard_size)
+        return day + datetime.timedelta(days=shard_size)
+
+    @classmethod
+    def _split_export_range(cls, start_date, end_date, unit, shard_size):
+        """Splits an inclusive date range into inclusive shards aligned on unit boundaries.
+
+        Args:
+            start_date (date): First day of the range.
+            end_date (date): Last day of the range.
+            unit (str): Day, week, or month.
+            shard_size (int): Units per shard.
+
+        Returns:
+            (list): (first day, last day) tuples.
+        """
+        shards = []
+        shard_start = start_date
+        while shard_start <= end_date:
+            shard_end = min(end_date, cls._next_boundary(shard_start, unit, shard_size) - datetime.timedelta(days=1))
+            shards.append((shard_start, shard_end))
+            shard_start = shard_end + datetime.timedelta(days=1)
+        return shards
+
+    @classmethod
+    def _merge_exports(cls, exports):
+        """Merges metric exports of consecutive date ranges.
+
+        Args:
+            exports (list of dict): Export data ordered by date range.
+
+        Returns:
+            (dict): Export data covering every range.
+        """
+        merged = dict(exports[0])
+        merged[cls.END_DATE] = exports[-1].get(cls.END_DATE)
+
+        segments = {}
+        for export in exports:
+            for result in export.get(cls.RESULTS) or []:
+                series = segments.setdefault(result.get(cls.SEGMENT), {})
+                for point in result.get(cls.DATA) or []:
+                    values = series.get(point[cls.DATE])
+                    if values is None:
+                        series[point[cls.DATE]] = list(point[cls.VALUES])
+                    else:
+                        series[point[cls.DATE]] = [a + b for a, b in zip(values, point[cls.VALUES])]
+
+        merged[cls.RESULTS] = [
+            {
+                cls.SEGMENT: segment,
+                cls.DATA: [{cls.DATE: date, cls.VALUES: series[date]} for date in sorted(series)],
+            }
+            for segment, series in segments.items()
+        ]
+        return merged
@@ -0,0 +1,586 @@
+import bisect
+import collections
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .api_helper import KlaviyoAPI
+from .codec import get_default_codec
+from .exceptions import (
+    KlaviyoAuthenticationError,
+    KlaviyoException,
+    KlaviyoQueueFullException,
+    KlaviyoRateLimitException,
+    KlaviyoServerError,
+)
+from .export import Checkpoint
+from .tracker import QueuedEvent
+
+
+class OutboxRecord(QueuedEvent):
+    """A track or identify call persisted in an Outbox."""
+
+    def __init__(self, seq, resource, params, is_test=False):
+        """
+        Args:
+            seq (int): Position of the record in the outbox, starting at 1.
+            resource (str): 'track' or 'identify'.
+            params (dict): Payload params for the request.
+            is_test (bool): Should this be a test request.
+        """
+        super(OutboxRecord, self).__init__(resource, params, is_test)
+        self.seq = seq
+
+
+class Outbox(object):
+    """Append-only, segment-rotated write-ahead log of track and identify calls.
+
+    Records are appended with one unbuffered write each, so they survive a crash of the process as soon as
+    `append` returns; `fsync` decides when they are also forced to disk, to survive a crash of the machine.
+    Readers take records in order and acknowledge them once delivered. The highest contiguous acknowledged
+    record is checkpointed, and records after it are read again when the outbox is reopened, so delivery
+    is at-least-once. Segments whose records are all acknowledged are deleted (compaction), and appends
+    fail once the segments left would exceed `max_bytes`.
+
+    Each record is a header of its sequence number, payload length and payload crc32, followed by the
+    json payload. A torn record at the end of the log, left by a crash mid-write, is truncated on open.
+    """
+    FSYNC_ALWAYS = 'always'
+    FSYNC_INTERVAL = 'interval'
+    FSYNC_NEVER = 'never'
+    FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER, )
+
+    DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024
+    DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+    DEFAULT_FSYNC_INTERVAL = 1.0
+
+    HEADER = struct.Struct('>QII')
+    SEGMENT_SUFFIX = '.log'
+    SEGMENT_NAME = '{:020d}' + SEGMENT_SUFFIX
+    CHECKPOINT_NAME = 'acked.json'
+
+    RESOURCE = 'resource'
+    PARAMS = 'params'
+    IS_TEST = 'is_test'
+
+    def __init__(
+        self,
+        directory,
+        segment_size=DEFAULT_SEGMENT_SIZE,
+        max_bytes=DEFAULT_MAX_BYTES,
+        fsync=FSYNC_INTERVAL,
+        fsync_interval=DEFAULT_FSYNC_INTERVAL,
+        codec=None
+        ):
+        """
+        Args:
+            directory (str): Directory of the segments and checkpoint, created if missing.
+            segment_size (int): Bytes after which appends go to a new segment.
+            max_bytes (int): Maximum bytes of segments kept on disk, a few times segment_size since the segment
+                being written is only deleted once it is full and acknowledged.
+            fsync (str): 'always' fsyncs every append, 'interval' at most every fsync_interval seconds,
+                'never' leaves it to the OS.
+            fsync_interval (float): Seconds between fsyncs with the 'interval' policy.
+            codec (JSONCodec): Encodes and decodes payloads, defaults to orjson when installed.
+
+        Raises:
+            (KlaviyoException): Invalid fsync policy.
+        """
+        if fsync not in self.FSYNC_POLICIES:
+            raise KlaviyoException('Invalid fsync policy, must be one of: {}'.format(list(self.FSYNC_POLICIES)))
+
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.codec = codec if codec is not None else get_default_codec()
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._checkpoint = Checkpoint(os.path.join(directory, self.CHECKPOINT_NAME))
+        self._closed = False
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._recover()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _segment_path(self, first_seq):
+        return os.path.join(self.directory, self.SEGMENT_NAME.format(first_seq))
+
+    def _recover(self):
+        """Loads the checkpoint, drops acknowledged segments and truncates a torn last record."""
+        state = self._checkpoint.load() or {}
+        self._acked_through = state.get('acked', 0)
+        self._acked = set()
+        self._retries = collections.deque()
+        self._reader = None
+        self._read_segment = None
+
+        self._segments = sorted(
+            int(name[:-len(self.SEGMENT_SUFFIX)]) for name in os.listdir(self.directory) if name.endswith(self.SEGMENT_SUFFIX)
+        )
+        self._next_seq = self._acked_through + 1
+        if self._segments:
+            self._next_seq = max(self._next_seq, self._scan(self._segments[-1]))
+        self._size = sum(os.path.getsize(self._segment_path(first_seq)) for first_seq in self._segments)
+        self._compact()
+
+        if not self._segments:
+            self._segments.append(self._next_seq)
+        self._writer = open(self._segment_path(self._segments[-1]), 'ab', buffering=0)
+        self._last_fsync = time.time()
+        self._open_reader(self._segments[0])
+
+    def _scan(self, first_seq):
+        """Validates every record of a segment, truncating it at the first torn record.
+
+        Returns:
+            (int): Sequence number following the last valid record.
+        """
+        next_seq = first_seq
+        path = self._segment_path(first_seq)
+        with open(path, 'r+b') as segment:
+            position = 0
+            while True:
+                record = self._read_from(segment)
+                if record is None:
+                    break
+                next_seq = record[0] + 1
+                position = segment.tell()
+            segment.truncate(position)
+        return next_seq
+
+    def _read_from(self, segment):
+        """Reads the record at the current position of a segment file.
+
+        Returns:
+            (tuple or None): seq and payload bytes, None at the end of the segment or at a torn record.
+        """
+        header = segment.read(self.HEADER.size)
+        if len(header) < self.HEADER.size:
+            return None
+        seq, length, checksum = self.HEADER.unpack(header)
+        payload = segment.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return None
+        return seq, payload
+
+    def append(self, resource, params, is_test=False):
+        """Persists a track or identify call before anything is sent.
+
+        Args:
+            resource (str): 'track' or 'identify'.
+            params (dict): Payload params for the request.
+            is_test (bool): Should this be a test request.
+
+        Returns:
+            (int): Sequence number of the record.
+
+        Raises:
+            (KlaviyoException): The outbox is closed.
+            (KlaviyoQueueFullException): The outbox holds max_bytes of records not yet acknowledged.
+        """
+        payload = self.codec.encode({self.RESOURCE: resource, self.PARAMS: params, self.IS_TEST: is_test})
+        with self._lock:
+            if self._closed:
+                raise KlaviyoException('Outbox is closed')
+            record = self.HEADER.pack(self._next_seq, len(payload), zlib.crc32(payload)) + payload
+            if self._size + len(record) > self.max_bytes:
+                raise KlaviyoQueueFullException('Outbox is full')
+
+            if self._writer.tell() + len(record) > self.segment_size and self._writer.tell() > 0:
+                self._rotate()
+            self._writer.write(record)
+            self._size += len(record)
+            seq = self._next_seq
+            self._next_seq += 1
+
+            if self.fsync == self.FSYNC_ALWAYS or (
+                    self.fsync == self.FSYNC_INTERVAL and time.time() - self._last_fsync >= self.fsync_interval):
+                self._sync()
+            self._not_empty.notify()
+        return seq
+
+    def _rotate(self):
+        if self.fsync != self.FSYNC_NEVER:
+            self._sync()
+        self._writer.close()
+        self._segments.append(self._next_seq)
+        self._writer = open(self._segment_path(self._next_seq), 'ab', buffering=0)
+        if self.fsync != self.FSYNC_NEVER:
+            self._sync_directory()
+
+    def _sync(self):
+        os.fsync(self._writer.fileno())
+        self._last_fsync = time.time()
+
+    def _sync_directory(self):
+        # makes the creation of a segment durable; not supported on every platform
+        try:
+            descriptor = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+    def sync(self):
+        """Forces every appended record to disk."""
+        with self._lock:
+            if not self._closed:
+                self._sync()
+
+    def _open_reader(self, first_seq):
+        if self._reader is not None:
+            self._reader.close()
+        self._reader = open(self._segment_path(first_seq), 'rb')
+        self._read_segment = first_seq
+
+    def _read_next(self):
+        """Reads the next record not yet acknowledged through the checkpoint, moving across segments.
+
+        Returns:
+            (OutboxRecord or None): None when every appended record was read.
+        """
+        while True:
+            record = self._read_from(self._reader)
+            if record is None:
+                index = bisect.bisect_right(self._segments, self._read_segment)
+                if index >= len(self._segments):
+                    return None
+                self._open_reader(self._segments[index])
+                continue
+
+            seq, payload = record
+            if seq <= self._acked_through:
+                continue
+            value = self.codec.decode(payload)
+            return OutboxRecord(seq, value[self.RESOURCE], value[self.PARAMS], value[self.IS_TEST])
+
+    def read(self, max_records, timeout=None):
+        """Takes the next records to deliver, records handed back with requeue first.
+
+        Args:
+            max_records (int): Maximum number of records.
+            timeout (float or None): Seconds to wait for a record, None waits until one is appended or the
+                outbox is closed.
+
+        Returns:
+            (list): OutboxRecords, empty if none arrived in time.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while True:
+                if self._closed:
+                    return []
+                records = []
+                while self._retries and len(records) < max_records:
+                    records.append(self._retries.popleft())
+                while len(records) < max_records:
+                    record = self._read_next()
+                    if record is None:
+                        break
+                    records.append(record)
+                if records:
+                    return records
+
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._not_empty.wait(remaining)
+
+    def requeue(self, records):
+        """Hands back records that couldn't be delivered, to be read again before newer ones.
+
+        Args:
+            records (list): OutboxRecords returned by read.
+        """
+        with self._lock:
+            self._retries.extendleft(reversed(records))
+            self._not_empty.notify()
+
+    def ack(self, seqs):
+        """Marks records as delivered; they won't be read again, even after a restart.
+
+        The checkpoint is saved and fully acknowledged segments are deleted once the acknowledged records
+        are contiguous from the start of the log.
+
+        Args:
+            seqs (iterable): Sequence numbers of delivered records.
+        """
+        with self._lock:
+            self._acked.update(seqs)
+            acked_through = self._acked_through
+            while acked_through + 1 in self._acked:
+                acked_through += 1
+                self._acked.remove(acked_through)
+            if acked_through == self._acked_through:
+                return
+
+            self._acked_through = acked_through
+            self._checkpoint.save({'acked': acked_through})
+            self._compact()
+            if not self._pending():
+                self._idle.notify_all()
+
+    def _compact(self):
+        """Deletes the segments before the one being read whose records are all acknowledged."""
+        while len(self._segments) > 1 and self._segments[1] - 1 <= self._acked_through:
+            if self._read_segment is not None and self._segments[0] >= self._read_segment:
+                break
+            first_seq = self._segments.pop(0)
+            path = self._segment_path(first_seq)
+            self._size -= os.path.getsize(path)
+            os.remove(path)
+
+    def _pending(self):
+        return self._next_seq - 1 - self._acked_through - len(self._acked)
+
+    @property
+    def pending(self):
+        """Number of records appended and not yet acknowledged."""
+        with self._lock:
+            return self._pending()
+
+    @property
+    def size(self):
+        """Bytes of segments on disk."""
+        with self._lock:
+            return self._size
+
+    def wait_idle(self, timeout=None):
+        """Waits until every appended record is acknowledged.
+
+        Args:
+            timeout (float or None): Maximum seconds to wait, None waits forever.
+
+        Returns:
+            (bool): True if every record was acknowledged in time.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while self._pending():
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+            return True
+
+    def close(self):
+        """Forces appended records to disk and closes the log; unacknowledged records are read again when reopened."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self.fsync != self.FSYNC_NEVER:
+                self._sync()
+            self._writer.close()
+            self._reader.close()
+            self._not_empty.notify_all()
+            self._idle.notify_all()
+
+
+class OutboxTracker(object):
+    """Durable track and identify calls: events are appended to an Outbox on the caller's thread, then
+    delivered by background workers and acknowledged.
+
+    Events rejected by Klaviyo, or failing with a client error, are acknowledged and reported to on_failure,
+    since sending them again can't succeed. Server errors, rate limits, authentication and transport errors
+    leave the events in the outbox: they are retried after retry_delay seconds, and replayed after a restart
+    if the process stops first.
+    """
+    DEFAULT_MAX_BATCH_SIZE = 100
+    DEFAULT_WORKERS = 2
+    DEFAULT_RETRY_DELAY = 1.0
+    POLL_INTERVAL = 0.1
+
+    FAILED_RESPONSES = (0, '0', )
+    RETRYABLE_ERRORS = (KlaviyoServerError, KlaviyoRateLimitException, KlaviyoAuthenticationError, )
+
+    def __init__(
+        self,
+        public,
+        outbox,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        workers=DEFAULT_WORKERS,
+        retry_delay=DEFAULT_RETRY_DELAY,
+        method=KlaviyoAPI.HTTP_POST,
+        on_success=None,
+        on_failure=None
+        ):
+        """
+        Args:
+            public (Public): Resource used to send events.
+            outbox (Outbox): Where events are persisted; not closed by the tracker.
+            max_batch_size (int): Maximum number of events a worker reads from the outbox at once.
+            workers (int): Number of background sender threads.
+            retry_delay (float): Seconds a worker waits after a batch with retryable failures.
+            method (str): 'post' or 'get' request for track and identify.
+            on_success (callable): Called with (record, response) for every event sent.
+            on_failure (callable): Called with (record, exception) for every event given up on, and for
+                every failed attempt that will be retried.
+        """
+        self.public = public
+        self.outbox = outbox
+        self.max_batch_size = max_batch_size
+        self.retry_delay = retry_delay
+        self.method = method
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.retryable_errors = self.RETRYABLE_ERRORS + public.TRANSPORT_ERRORS
+
+        self._stopped = threading.Event()
+        self._workers = []
+        for index in range(workers):
+            worker = threading.Thread(target=self._run, name='klaviyo-outbox-{}'.format(index))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def track(
+        self,
+        event,
+        email=None,
+        external_id=None,
+        properties=None,
+        customer_properties=None,
+        timestamp=None,
+        ip_address=None,
+        is_test=False
+        ):
+        """Persists a track call to be sent, see Public.track.
+
+        The event is timestamped now if no timestamp is given, so a delayed delivery does not shift it.
+
+        Returns:
+            (int): Sequence number of the event in the outbox.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided or the outbox is closed.
+            (KlaviyoQueueFullException): The outbox is full.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        params = self.public._build_track_params(
+            event,
+            email=email,
+            external_id=external_id,
+            properties=properties,
+            customer_properties=customer_properties,
+            timestamp=timestamp,
+            ip_address=ip_address,
+        )
+        return self.outbox.append(self.public.TRACK, params, is_test)
+
+    def identify(self, email=None, external_id=None, properties=None, is_test=False):
+        """Persists an identify call to be sent, see Public.identify.
+
+        Returns:
+            (int): Sequence number of the event in the outbox.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided or the outbox is closed.
+            (KlaviyoQueueFullException): The outbox is full.
+        """
+        params = self.public._build_identify_params(email=email, external_id=external_id, properties=properties)
+        return self.outbox.append(self.public.IDENTIFY, params, is_test)
+
+    def flush(self, timeout=None):
+        """Waits until every event in the outbox is acknowledged.
+
+        Args:
+            timeout (float or None): Maximum seconds to wait, None waits forever.
+
+        Returns:
+            (bool): True if the outbox was drained in time.
+        """
+        return self.outbox.wait_idle(timeout)
+
+    def close(self, timeout=None):
+        """Waits for the outbox to drain, then stops the workers. Events left are kept in the outbox.
+
+        Args:
+            timeout (float or None): Maximum seconds to wait for the drain, None waits forever.
+
+        Returns:
+            (bool): True if every event was acknowledged in time.
+        """
+        drained = self.flush(timeout)
+        self._stopped.set()
+        for worker in self._workers:
+            worker.join()
+        return drained
+
+    def _run(self):
+        while not self._stopped.is_set():
+            records = self.outbox.read(self.max_batch_size, timeout=self.POLL_INTERVAL)
+            if not records:
+                continue
+
+            delivered = []
+            failed = []
+            for record in records:
+                if self._send(record):
+                    delivered.append(record.seq)
+                else:
+                    failed.append(record)
+
+            self.outbox.ack(delivered)
+            if failed:
+                self.outbox.requeue(failed)
+                self._stopped.wait(self.retry_delay)
+
+    def _send(self, record):
+        """
+        Returns:
+            (bool): True if the record is done with, False if it should be sent again.
+        """
+        try:
+            response = self.public._track_identify_request(
+                method=self.method,
+                params=record.params,
+                resource=record.resource,
+                is_test=record.is_test,
+            )
+        except self.retryable_errors as e:
+            self._notify(self.on_failure, record, e)
+            return False
+        except Exception as e:
+            self._notify(self.on_failure, record, e)
+            return True
+
+        if response.data in self.FAILED_RESPONSES:
+            self._notify(self.on_failure, record, KlaviyoException('Klaviyo rejected the event'))
+        else:
+            self._notify(self.on_success, record, response)
+        return True
+
+    @staticmethod
+    def _notify(callback, record, result):
+        if callback is None:
+            return
+        try:
+            callback(record, result)
+        except Exception:
+            # a broken callback must not kill a worker thread
+            pass
@@ -0,0 +1,129 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Paginator(object):
+    """Lazily iterates the records of a cursor paginated endpoint, one page in memory at a time.
+
+    `cursor` is the cursor of the page currently being yielded, so an interrupted iteration can be
+    resumed by passing it back as the starting cursor; at most that one page is yielded again.
+    """
+    RECORDS = 'records'
+    MARKER = 'marker'
+
+    def __init__(self, fetch_page, records_key=RECORDS, cursor_key=MARKER, cursor=None, prefetch=False):
+        """
+        Args:
+            fetch_page (callable): Called with a cursor (None for the first page), returns a KlaviyoAPIResponse.
+            records_key (str): Key of the list of records in the response data.
+            cursor_key (str): Key of the next page cursor in the response data.
+            cursor (str or int): Cursor to start from.
+            prefetch (bool): Fetch the next page in a background thread while the current one is consumed.
+        """
+        self.fetch_page = fetch_page
+        self.records_key = records_key
+        self.cursor_key = cursor_key
+        self.cursor = cursor
+        self.next_cursor = None
+        self.prefetch = prefetch
+        self.exhausted = False
+        self.pages = 0
+
+    def __iter__(self):
+        for records in self.iter_pages():
+            for record in records:
+                yield record
+
+    def iter_pages(self):
+        """Lazily iterates the pages instead of the records.
+
+        While a page is consumed, `cursor` is its cursor and `next_cursor` the cursor of the page after it,
+        None on the last page.
+
+        Returns:
+            (generator): Lists of records.
+        """
+        if self.prefetch:
+            return self._iter_prefetched()
+        return self._iter()
+
+    def _parse(self, response):
+        data = response.data or {}
+        return data.get(self.records_key) or [], data.get(self.cursor_key)
+
+    def _iter(self):
+        cursor = self.cursor
+        while True:
+            records, next_cursor = self._parse(self.fetch_page(cursor))
+            yield self._start_page(cursor, records, next_cursor)
+            if not next_cursor or not records:
+                break
+            cursor = next_cursor
+        self.exhausted = True
+
+    def _iter_prefetched(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            cursor = self.cursor
+            future = executor.submit(self.fetch_page, cursor)
+            while True:
+                records, next_cursor = self._parse(future.result())
+                future = None
+                if next_cursor and records:
+                    future = executor.submit(self.fetch_page, next_cursor)
+                yield self._start_page(cursor, records, next_cursor)
+                if future is None:
+                    break
+                cursor = next_cursor
+            self.exhausted = True
+        finally:
+            executor.shutdown(wait=False)
+
+    def _start_page(self, cursor, records, next_cursor):
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.pages += 1
+        return records
+
+
+class AsyncPaginator(Paginator):
+    """Asyncio counterpart of Paginator, iterated with `async for`.
+
+    `fetch_page` returns an awaitable; with `prefetch`, the next page is fetched in a task on the running
+    loop while the current one is consumed.
+    """
+    # iterated with `async for` only
+    __iter__ = None
+
+    async def __aiter__(self):
+        async for records in self.iter_pages():
+            for record in records:
+                yield record
+
+    def iter_pages(self):
+        """Lazily iterates the pages instead of the records, see Paginator.iter_pages.
+
+        Returns:
+            (async generator): Lists of records.
+        """
+        return self._aiter_pages()
+
+    async def _aiter_pages(self):
+        cursor = self.cursor
+        task = None
+        try:
+            while True:
+                response = await (task if task is not None else self.fetch_page(cursor))
+                task = None
+                records, next_cursor = self._parse(response)
+                has_next = bool(next_cursor and records)
+                if has_next and self.prefetch:
+                    task = asyncio.ensure_future(self.fetch_page(next_cursor))
+                yield self._start_page(cursor, records, next_cursor)
+                if not has_next:
+                    break
+                cursor = next_cursor
+            self.exhausted = True
+        finally:
+            if task is not None:
+                task.cancel()
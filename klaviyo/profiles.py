@@ -1,12 +1,18 @@
-import json
 from .api_helper import KlaviyoAPI
+from .bulk import FanOut
 from .exceptions import KlaviyoException
+from .pagination import Paginator
+from .ratelimit import InProcessRateLimiter
 
 class Profiles(KlaviyoAPI):
     PERSON = 'person'
     PEOPLE = 'people'
     SEARCH = 'search'
 
+    DATA = 'data'
+    NEXT = 'next'
+    DEFAULT_FAN_OUT_WORKERS = 8
+
     def get_profile(self, profile_id):
         """Get a profile by its ID.
 
@@ -20,7 +26,7 @@ class Profiles(KlaviyoAPI):
         """
         return self._v1_request('{}/{}'.format(self.PERSON, profile_id), self.HTTP_GET)
 
-    def update_profile(self, profile_id, properties={}):
+    def update_profile(self, profile_id, properties=None):
         """Get a profile by its ID.
 
         https://www.klaviyo.com/docs/api/people#person
@@ -34,7 +40,7 @@ class Profiles(KlaviyoAPI):
         """
         return self._v1_request('{}/{}'.format(self.PERSON, profile_id), self.HTTP_PUT, params=properties)
 
-    def get_profile_metrics_timeline(self, profile_id, since=None, count=100, sort=KlaviyoAPI.SORT_DESC):
+    def get_profile_metrics_timeline(self, profile_id, since=None, count=100, sort=KlaviyoAPI.SORT_DESC, stream=False):
         """Gets a timeline of events on a profile.
 
         https://www.klaviyo.com/docs/api/people#metrics-timeline
@@ -44,6 +50,7 @@ class Profiles(KlaviyoAPI):
             since (unix timestamp int or uuid str): A timestamp or uuid.
             count (int): The batch of records the response should return.
             sort (str): The order in which results should be returned.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the events one by one as the body is read.
 
         Returns:
             (dict): Event data related to a profile.
@@ -62,10 +69,11 @@ class Profiles(KlaviyoAPI):
                 self.TIMELINE
             ),
             self.HTTP_GET,
-            params=filtered_params
+            params=filtered_params,
+            stream_key=self.DATA if stream else None
         )
 
-    def get_profile_metrics_timeline_by_id(self, profile_id, metric_id, since=None, count=100, sort=KlaviyoAPI.SORT_DESC):
+    def get_profile_metrics_timeline_by_id(self, profile_id, metric_id, since=None, count=100, sort=KlaviyoAPI.SORT_DESC, stream=False):
         """Gets a profiles event data for one metric.
 
         https://www.klaviyo.com/docs/api/people#metric-timeline
@@ -76,6 +84,7 @@ class Profiles(KlaviyoAPI):
             since (unix timestamp int or uuid str): A timestamp or uuid.
             count (int): The batch of records the response should return.
             sort (str): The order in which results should be returned.
+            stream (bool): Return a KlaviyoStreamingResponse yielding the events one by one as the body is read.
 
         Returns:
             (dict): information about the specified metric id for the profile.
@@ -95,9 +104,64 @@ class Profiles(KlaviyoAPI):
                 self.TIMELINE
             ),
             self.HTTP_GET,
-            params=filtered_params
+            params=filtered_params,
+            stream_key=self.DATA if stream else None
         )
 
+    def iter_profile_timelines(
+        self,
+        profile_ids,
+        metric_id=None,
+        since=None,
+        count=100,
+        sort=KlaviyoAPI.SORT_DESC,
+        max_workers=DEFAULT_FAN_OUT_WORKERS,
+        requests_per_second=None
+        ):
+        """Pages through the event timelines of many profiles concurrently.
+
+        See get_profile_metrics_timeline and get_profile_metrics_timeline_by_id.
+
+        Args:
+            profile_ids (iterable): Profile ids, may be a generator.
+            metric_id (str or None): Only fetch events of this metric.
+            since (unix timestamp int or uuid str): Where every timeline starts.
+            count (int): The batch of records each request should return.
+            sort (str): The order in which results should be returned.
+            max_workers (int): Number of profiles fetched concurrently.
+            requests_per_second (float or None): Maximum request rate of the whole fan-out.
+
+        Returns:
+            (FanOut): Iterator of (profile_id, event) tuples in completion order; errors per profile id
+                are collected in its `errors` dict.
+        """
+        rate_limiter = self._get_fan_out_rate_limiter(requests_per_second)
+
+        def fetch_page(profile_id, cursor):
+            if rate_limiter is not None:
+                rate_limiter.acquire(self.V1_API)
+            return self._get_timeline_page(profile_id, metric_id, cursor, count, sort)
+
+        def timeline(profile_id):
+            return Paginator(
+                lambda cursor: fetch_page(profile_id, cursor),
+                records_key=self.DATA,
+                cursor_key=self.NEXT,
+                cursor=since,
+            )
+
+        return FanOut(timeline, profile_ids, max_workers)
+
+    def _get_fan_out_rate_limiter(self, requests_per_second):
+        if not requests_per_second:
+            return None
+        return InProcessRateLimiter({self.V1_API: (requests_per_second, requests_per_second)})
+
+    def _get_timeline_page(self, profile_id, metric_id, cursor, count, sort):
+        if metric_id is None:
+            return self.get_profile_metrics_timeline(profile_id, since=cursor, count=count, sort=sort)
+        return self.get_profile_metrics_timeline_by_id(profile_id, metric_id, since=cursor, count=count, sort=sort)
+
     def get_profile_id_by_email(self, email):
         """Gets the profile ID tied to a given email (if one exists).
 
@@ -111,7 +175,7 @@ class Profiles(KlaviyoAPI):
         }
         return self._v2_request('{}/{}'.format(self.PEOPLE, self.SEARCH), self.HTTP_GET, data=data)
 
-    def unset_profile_properties(self, profile_id, properties=[]):
+    def unset_profile_properties(self, profile_id, properties=None):
         """Unset properties on a given profile.
 
             Args:
@@ -122,9 +186,11 @@ class Profiles(KlaviyoAPI):
             Raises:
                 (KlaviyoAPIException): Raised if properties are not a list.
         """
+        if properties is None:
+            properties = []
         if not isinstance(properties, list):
             raise KlaviyoException('Argument "properties" must be a list.')
         params = {
-            '$unset': json.dumps(properties),
+            '$unset': self.codec.dumps(properties),
         }
         return self._v1_request("{}/{}".format(self.PERSON, profile_id), self.HTTP_PUT, params=params)
@@ -1,4 +1,4 @@
-from .api_helper import KlaviyoAPI
+from .api_helper import KlaviyoAPI, KlaviyoAPIResponse
 from .exceptions import KlaviyoException
 
 class Public(KlaviyoAPI):
@@ -7,6 +7,12 @@ class Public(KlaviyoAPI):
     TRACK = 'track'
     TRACK_ONCE_KEY = '__track_once__'
 
+    # track and identify answer 1 once the event is accepted, decoded as json or kept as text
+    ACCEPTED_RESPONSES = (1, '1', )
+    # response of a track_once call dropped as a duplicate
+    DUPLICATE_STATUS = 200
+    DUPLICATE_DATA = 1
+
     TOKEN = 'token'
     ERROR_MESSAGE_ID_AND_EMAIL = 'You must identify a user by email or ID.'
 
@@ -40,30 +46,15 @@ class Public(KlaviyoAPI):
         Returns:
             (str): 1 (pass) or 0 (fail).
         """
-        self._valid_identifiers(email, external_id)
-
-        if properties is None:
-            properties = {}
-        
-        if customer_properties is None:
-            customer_properties = {}
-
-        if email: 
-            customer_properties['email'] = email
-
-        if external_id: 
-            customer_properties['id'] = external_id
-
-        params = {
-            self.TOKEN: self.public_token,
-            'event': event,
-            'properties': properties,
-            'customer_properties': customer_properties,
-            'time': self._normalize_timestamp(timestamp),
-        }
-
-        if ip_address:
-            params['ip'] = ip_address
+        params = self._build_track_params(
+            event,
+            email=email,
+            external_id=external_id,
+            properties=properties,
+            customer_properties=customer_properties,
+            timestamp=timestamp,
+            ip_address=ip_address,
+        )
 
         return self._track_identify_request(method=method, params=params, resource=self.TRACK, is_test=is_test)
 
@@ -76,9 +67,13 @@ class Public(KlaviyoAPI):
         customer_properties=None,
         timestamp=None, 
         ip_address=None, 
-        is_test=False
+        is_test=False,
+        idempotency_key=None
         ):
-        """
+        """Tracks an event Klaviyo records only once per profile.
+
+        With a track_once_index, calls already sent are dropped without a request.
+
         Args:
             event (str): Event name to be tracked.
             email (str or None): Email address.
@@ -88,19 +83,48 @@ class Public(KlaviyoAPI):
             timestamp (unix timestamp): Time the request is happening.
             ip_address (str): Ip address of the customer.
             is_test (bool): Should this be a test request.
+            idempotency_key (str or None): Key of the logical event in the track_once_index, derived from the
+                event name and the identifiers if not provided.
 
         Returns:
-            (str): 1 (pass) or 0 (fail).
+            (str): 1 (pass) or 0 (fail). A dropped duplicate returns 1 with `duplicate` set on the response.
         """
-        if properties is None:
-            properties = {}
+        key = self._get_track_once_key(event, email, external_id, idempotency_key)
+        if key is not None and self.track_once_index.seen(key):
+            return KlaviyoAPIResponse(self.DUPLICATE_STATUS, self.DUPLICATE_DATA, duplicate=True)
 
+        response = self.track(event, email=email, external_id=external_id,
+            properties=self._build_track_once_properties(properties), customer_properties=customer_properties,
+            timestamp=timestamp, ip_address=ip_address, is_test=is_test)
+
+        self._record_track_once(key, response)
+        return response
+
+    def _build_track_once_properties(self, properties):
+        # copied, the caller's dict is never mutated
+        properties = dict(properties or {})
         properties[self.TRACK_ONCE_KEY] = True
+        return properties
 
-        return self.track(event, email=email, external_id=external_id, properties=properties, customer_properties=customer_properties,
-            timestamp=timestamp, ip_address=ip_address, is_test=is_test)
+    def _get_track_once_key(self, event, email, external_id, idempotency_key):
+        """
+        Returns:
+            (str or None): Key of the call in the track_once_index, None without an index.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided.
+        """
+        if self.track_once_index is None:
+            return None
+        self._valid_identifiers(email, external_id)
+        return self.track_once_index.get_key(self.public_token, event, email, external_id, idempotency_key)
+
+    def _record_track_once(self, key, response):
+        """Records an accepted track_once call, rejected ones are sent again."""
+        if key is not None and response.data in self.ACCEPTED_RESPONSES:
+            self.track_once_index.add(key)
 
-    def identify(self, email=None, external_id=None, properties={}, is_test=False, method=KlaviyoAPI.HTTP_GET):
+    def identify(self, email=None, external_id=None, properties=None, is_test=False, method=KlaviyoAPI.HTTP_GET):
         """Makes an identify call to Klaviyo API.
 
         This will create/update a user with its associated customer properties.
@@ -116,24 +140,94 @@ class Public(KlaviyoAPI):
         Returns:
             (str): 1 (pass) or 0 (fail).
         """
+        params = self._build_identify_params(email=email, external_id=external_id, properties=properties)
+
+        return self._track_identify_request(method=method, params=params, resource=self.IDENTIFY, is_test=is_test)
+
+    def _build_track_params(
+        self,
+        event,
+        email=None,
+        external_id=None,
+        properties=None,
+        customer_properties=None,
+        timestamp=None,
+        ip_address=None
+        ):
+        """Builds the payload of a track request.
+
+        Args:
+            event (str): Event name to be tracked.
+            email (str or None): Email address.
+            external_id (str or None): External id for customer.
+            properties (dict): Information about the event.
+            customer_properties (dict): Information about the customer.
+            timestamp (unix timestamp): Time the request is happening.
+            ip_address (str): Ip address of the customer.
+
+        Returns:
+            (dict): Track payload params.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided.
+        """
         self._valid_identifiers(email, external_id)
 
-        if not isinstance(properties, dict):
+        if properties is None:
             properties = {}
 
+        # copied, the caller's dict is never mutated
+        customer_properties = dict(customer_properties or {})
+
+        if email: 
+            customer_properties['email'] = email
+
+        if external_id: 
+            customer_properties['id'] = external_id
+
+        params = {
+            self.TOKEN: self.public_token,
+            'event': event,
+            'properties': properties,
+            'customer_properties': customer_properties,
+            'time': self._normalize_timestamp(timestamp),
+        }
+
+        if ip_address:
+            params['ip'] = ip_address
+
+        return params
+
+    def _build_identify_params(self, email=None, external_id=None, properties=None):
+        """Builds the payload of an identify request.
+
+        Args:
+            email (str or None): Email address.
+            external_id (str or None): External id for customer.
+            properties (dict): Information about the customer.
+
+        Returns:
+            (dict): Identify payload params.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided.
+        """
+        self._valid_identifiers(email, external_id)
+
+        # copied, the caller's dict is never mutated
+        properties = dict(properties) if isinstance(properties, dict) else {}
+
         if email:
             properties['email'] = email
 
         if external_id:
             properties['id'] = external_id
 
-        params = {
+        return {
             self.TOKEN: self.public_token,
             'properties': properties
         }
 
-        return self._track_identify_request(method=method, params=params, resource=self.IDENTIFY, is_test=is_test)
-
     @staticmethod
     def _valid_identifiers(email=None, external_id=None):
         """Checks whether we can identify a profile using an email or external id.
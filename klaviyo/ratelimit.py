@@ -0,0 +1,209 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .exceptions import KlaviyoConfigurationException
+
+
+class TokenBucket(object):
+    """Token bucket refilling at `rate` tokens per second up to `capacity`.
+
+    Reservations may take the bucket below zero; the caller then waits for the debt to refill,
+    which keeps waiting callers in arrival order without polling.
+    """
+
+    def __init__(self, rate, capacity=None, tokens=None, updated_at=None):
+        """
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum burst, defaults to one second worth of tokens.
+            tokens (float): Tokens currently available, defaults to a full bucket.
+            updated_at (float): Unix time `tokens` was computed at, defaults to now.
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity if tokens is None else tokens
+        self.updated_at = time.time() if updated_at is None else updated_at
+
+    def reserve(self, tokens=1, now=None):
+        """Takes tokens from the bucket.
+
+        Args:
+            tokens (float): Tokens to take.
+            now (float): Current unix time.
+
+        Returns:
+            (float): Seconds to wait before the tokens are really available.
+        """
+        now = time.time() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """Client side rate limiting, consulted by KlaviyoAPI._request before each request is sent.
+
+    Requests are grouped by endpoint class: 'public' for track/identify, and '<api version>/<resource>'
+    (e.g. 'v1/metrics', 'v2/list') for private requests. Each class uses the most specific configured bucket,
+    so `{'v2/list': ...}` limits list requests only while `{'v2': ...}` limits every v2 request.
+    Classes with no matching bucket are not limited.
+    """
+    DEFAULT_RATES = {
+        'public': (350.0, 350.0),
+        'v1': (58.0, 350.0),
+        'v2': (58.0, 350.0),
+    }
+
+    def __init__(self, rates=None):
+        """
+        Args:
+            rates (dict): Maps a bucket name to a (requests per second, burst) tuple.
+        """
+        self.rates = dict(self.DEFAULT_RATES if rates is None else rates)
+        self._bucket_names = {}
+
+    def get_bucket_name(self, endpoint_class):
+        """Finds the most specific bucket configured for an endpoint class.
+
+        Args:
+            endpoint_class (str): e.g. 'public', 'v1/metrics'.
+
+        Returns:
+            (str or None): Bucket name, None if the class is not limited.
+        """
+        try:
+            return self._bucket_names[endpoint_class]
+        except KeyError:
+            pass
+
+        name = endpoint_class
+        while name and name not in self.rates:
+            name = name.rpartition('/')[0]
+        bucket_name = self._bucket_names[endpoint_class] = name or None
+        return bucket_name
+
+    def reserve(self, endpoint_class):
+        """Reserves a request slot.
+
+        Args:
+            endpoint_class (str): Endpoint class of the request.
+
+        Returns:
+            (float): Seconds to wait before sending the request.
+        """
+        bucket_name = self.get_bucket_name(endpoint_class)
+        if bucket_name is None:
+            return 0.0
+        return self._reserve(bucket_name)
+
+    def acquire(self, endpoint_class):
+        """Blocks until a request of this endpoint class may be sent.
+
+        Args:
+            endpoint_class (str): Endpoint class of the request.
+        """
+        delay = self.reserve(endpoint_class)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _reserve(self, bucket_name):
+        raise NotImplementedError
+
+
+class InProcessRateLimiter(RateLimiter):
+    """Token buckets shared by every thread of a process."""
+
+    def __init__(self, rates=None):
+        super(InProcessRateLimiter, self).__init__(rates)
+        self._buckets = dict((name, TokenBucket(rate, capacity)) for name, (rate, capacity) in self.rates.items())
+        self._lock = threading.Lock()
+
+    def _reserve(self, bucket_name):
+        with self._lock:
+            return self._buckets[bucket_name].reserve()
+
+
+class FileRateLimiter(RateLimiter):
+    """Token buckets shared by every process on a host through a memory mapped file.
+
+    Every process must be configured with the same rates. The buckets are updated under an exclusive
+    flock, so N workers on one host together stay under the configured rates. POSIX only.
+    """
+    MAGIC = b'KLRL'
+    HEADER = struct.Struct('<4sI')
+    RECORD = struct.Struct('<dd')
+
+    def __init__(self, path, rates=None):
+        """
+        Args:
+            path (str): File holding the shared bucket state, created if missing.
+            rates (dict): Maps a bucket name to a (requests per second, burst) tuple.
+        """
+        if fcntl is None:
+            raise KlaviyoConfigurationException('FileRateLimiter requires fcntl, which is not available on this platform')
+
+        super(FileRateLimiter, self).__init__(rates)
+        self.path = path
+        self._names = sorted(self.rates)
+        self._offsets = dict(
+            (name, self.HEADER.size + index * self.RECORD.size) for index, name in enumerate(self._names)
+        )
+        self._size = self.HEADER.size + len(self._names) * self.RECORD.size
+        self._lock = threading.Lock()
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < self._size:
+                os.ftruncate(self._fd, self._size)
+            self._map = mmap.mmap(self._fd, self._size)
+            magic, count = self.HEADER.unpack_from(self._map, 0)
+            if magic != self.MAGIC or count != len(self._names):
+                self._initialize()
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _initialize(self):
+        now = time.time()
+        self.HEADER.pack_into(self._map, 0, self.MAGIC, len(self._names))
+        for name in self._names:
+            self.RECORD.pack_into(self._map, self._offsets[name], self.rates[name][1], now)
+
+    def _reserve(self, bucket_name):
+        rate, capacity = self.rates[bucket_name]
+        offset = self._offsets[bucket_name]
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                tokens, updated_at = self.RECORD.unpack_from(self._map, offset)
+                bucket = TokenBucket(rate, capacity, tokens, updated_at)
+                delay = bucket.reserve()
+                self.RECORD.pack_into(self._map, offset, bucket.tokens, bucket.updated_at)
+                return delay
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """Unmaps the shared state file."""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                os.close(self._fd)
+                self._map = None
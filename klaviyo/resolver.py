@@ -0,0 +1,175 @@
+import threading
+
+from .bulk import imap_unordered
+from .cache import LRUCache, MISSING
+from .exceptions import KlaviyoAPIException
+
+
+class ResolverStats(object):
+    """Counters of a ProfileIdResolver."""
+
+    def __init__(self):
+        self.hits = 0
+        self.negative_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+class _Lookup(object):
+    """An in-flight lookup other callers of the same email wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.profile_id = None
+        self.exception = None
+
+
+class ProfileIdResolver(object):
+    """Resolves emails to profile ids through Profiles.get_profile_id_by_email, with caching.
+
+    Resolved ids are kept in a bounded LRU for `ttl` seconds and emails with no profile for
+    `negative_ttl` seconds. An optional persistent cache (e.g. SQLiteCache) is consulted on memory misses
+    and survives restarts. Concurrent lookups of the same email share a single request.
+    """
+    DEFAULT_MAXSIZE = 100000
+    DEFAULT_TTL = 24 * 60 * 60
+    DEFAULT_NEGATIVE_TTL = 60 * 60
+    DEFAULT_WORKERS = 8
+
+    ID = 'id'
+    NOT_FOUND = 404
+    KEY_PREFIX = 'profile_id:'
+
+    def __init__(
+        self,
+        profiles,
+        maxsize=DEFAULT_MAXSIZE,
+        ttl=DEFAULT_TTL,
+        negative_ttl=DEFAULT_NEGATIVE_TTL,
+        max_workers=DEFAULT_WORKERS,
+        persistent_cache=None
+        ):
+        """
+        Args:
+            profiles (Profiles): Resource used to search profiles.
+            maxsize (int): Maximum number of emails kept in memory.
+            ttl (float): Seconds a resolved profile id is cached.
+            negative_ttl (float): Seconds an email with no profile is cached.
+            max_workers (int): Maximum concurrent requests of resolve_many.
+            persistent_cache (CacheBackend): Second level cache, e.g. SQLiteCache.
+        """
+        self.profiles = profiles
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+        self.persistent_cache = persistent_cache
+        self.stats = ResolverStats()
+
+        self._cache = LRUCache(maxsize)
+        self._lookups = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(email):
+        return email.strip().lower()
+
+    def _cache_get(self, key, persistent=True):
+        profile_id = self._cache.get(key)
+        if profile_id is not MISSING:
+            if profile_id is None:
+                self.stats.increment('negative_hits')
+            else:
+                self.stats.increment('hits')
+            return profile_id
+
+        if persistent and self.persistent_cache is not None:
+            profile_id = self.persistent_cache.get(self.KEY_PREFIX + key)
+            if profile_id is not MISSING:
+                self.stats.increment('persistent_hits')
+                self._cache.set(key, profile_id, self.ttl if profile_id is not None else self.negative_ttl)
+        return profile_id
+
+    def _cache_set(self, key, profile_id):
+        ttl = self.ttl if profile_id is not None else self.negative_ttl
+        self._cache.set(key, profile_id, ttl)
+        if self.persistent_cache is not None:
+            self.persistent_cache.set(self.KEY_PREFIX + key, profile_id, ttl)
+
+    def _fetch(self, email):
+        try:
+            response = self.profiles.get_profile_id_by_email(email)
+        except KlaviyoAPIException as e:
+            if e.status_code == self.NOT_FOUND:
+                return None
+            raise
+        return (response.data or {}).get(self.ID)
+
+    def resolve(self, email):
+        """Returns the profile id of an email.
+
+        Args:
+            email (str): Email address.
+
+        Returns:
+            (str or None): Profile id, None if no profile has this email.
+        """
+        key = self._normalize(email)
+        profile_id = self._cache_get(key)
+        if profile_id is not MISSING:
+            return profile_id
+
+        with self._lock:
+            # a lookup may have finished since the check above; it stores its result before unregistering
+            profile_id = self._cache_get(key, persistent=False)
+            if profile_id is not MISSING:
+                return profile_id
+            lookup = self._lookups.get(key)
+            owner = lookup is None
+            if owner:
+                lookup = self._lookups[key] = _Lookup()
+                self.stats.increment('misses')
+            else:
+                self.stats.increment('coalesced')
+
+        if not owner:
+            lookup.done.wait()
+            if lookup.exception is not None:
+                raise lookup.exception
+            return lookup.profile_id
+
+        try:
+            lookup.profile_id = self._fetch(email)
+            self._cache_set(key, lookup.profile_id)
+            return lookup.profile_id
+        except Exception as e:
+            lookup.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._lookups[key]
+            lookup.done.set()
+
+    def resolve_many(self, emails):
+        """Resolves many emails concurrently.
+
+        Args:
+            emails (iterable): Email addresses, may be a generator.
+
+        Returns:
+            (tuple): dict of email to profile id (None when no profile has it) and dict of email to
+                the exception raised resolving it.
+        """
+        resolved = {}
+        errors = {}
+        for email, profile_id, exception in imap_unordered(self.resolve, emails, self.max_workers):
+            if exception is None:
+                resolved[email] = profile_id
+            else:
+                errors[email] = exception
+        return resolved, errors
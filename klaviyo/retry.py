@@ -0,0 +1,239 @@
+import email.utils
+import random
+import re
+import threading
+import time
+
+try:
+   from urllib.parse import urlsplit
+except ImportError:
+   from urlparse import urlsplit
+
+from .exceptions import KlaviyoAPIException
+
+
+class RetryBudget(object):
+    """Caps retries to a share of recent traffic so retries cannot amplify an outage.
+
+    Every request deposits `ratio` tokens and tokens also refill at `min_per_second`;
+    every retry withdraws one token and is refused when none are left.
+    """
+    DEFAULT_RATIO = 0.2
+    DEFAULT_MIN_PER_SECOND = 1.0
+    DEFAULT_MAX_TOKENS = 100.0
+
+    def __init__(self, ratio=DEFAULT_RATIO, min_per_second=DEFAULT_MIN_PER_SECOND, max_tokens=DEFAULT_MAX_TOKENS):
+        """
+        Args:
+            ratio (float): Retries allowed per request sent.
+            min_per_second (float): Retries allowed per second regardless of traffic.
+            max_tokens (float): Maximum number of retries that can be saved up.
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+
+        self._tokens = max_tokens
+        self._updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def _refill(self, amount):
+        now = time.time()
+        self._tokens = min(self.max_tokens, self._tokens + amount + (now - self._updated_at) * self.min_per_second)
+        self._updated_at = now
+
+    def deposit(self):
+        """Records a request being sent."""
+        with self._lock:
+            self._refill(self.ratio)
+
+    def withdraw(self):
+        """Takes a token for a retry.
+
+        Returns:
+            (bool): True if the retry is within budget.
+        """
+        with self._lock:
+            self._refill(0)
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class RetryAttempt(object):
+    """Information about a failed attempt that is about to be retried."""
+
+    def __init__(self, method, url, attempt, delay, exception):
+        """
+        Args:
+            method (str): HTTP method.
+            url (str): URL of the request, without the query string.
+            attempt (int): Number of the retry about to happen, starting at 1.
+            delay (float): Seconds slept before the retry.
+            exception (Exception): Error raised by the failed attempt.
+        """
+        self.method = method
+        self.url = url
+        self.attempt = attempt
+        self.delay = delay
+        self.exception = exception
+
+
+class RetryPolicy(object):
+    """Retries rate limited, failed and unreachable requests with exponential backoff and full jitter.
+
+    GET, PUT and DELETE requests are idempotent and retried. POST requests are only retried
+    for endpoints whose path matches one of `safe_post_paths`, because replaying the others
+    (e.g. creating a list) would duplicate data. Track records a new event per request whether it is
+    sent as a GET or a POST, so it is never retried. Identify is retried with either method on purpose:
+    it sets profile properties to the values sent, so a replay writes the same values again.
+    """
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_BACKOFF_FACTOR = 0.5
+    DEFAULT_MAX_BACKOFF = 30.0
+    DEFAULT_MAX_RETRY_AFTER = 60.0
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504, )
+    IDEMPOTENT_METHODS = ('get', 'put', 'delete', )
+    # public endpoints that record data even when called with GET
+    NEVER_RETRIED_PATHS = (
+        r'/track$',
+    )
+    SAFE_POST_PATHS = (
+        r'/v2/list/[^/]+/members$',
+        r'/v2/list/[^/]+/subscribe$',
+        r'/v2/data-privacy/deletion-request$',
+        r'/identify$',
+    )
+
+    RETRY_AFTER = 'Retry-After'
+
+    def __init__(
+        self,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+        retry_statuses=RETRY_STATUSES,
+        safe_post_paths=SAFE_POST_PATHS,
+        budget=None,
+        on_retry=None
+        ):
+        """
+        Args:
+            max_retries (int): Maximum number of retries per request.
+            backoff_factor (float): Base of the exponential backoff in seconds.
+            max_backoff (float): Maximum backoff in seconds.
+            max_retry_after (float): Give up instead of waiting longer than this for a Retry-After header.
+            retry_statuses (tuple): HTTP status codes that are retried.
+            safe_post_paths (tuple): Regexes of endpoint paths where a POST can be replayed.
+            budget (RetryBudget): Retry budget shared by every request using this policy.
+            on_retry (callable): Called with a RetryAttempt before every retry.
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = retry_statuses
+        self.safe_post_paths = [re.compile(path) for path in safe_post_paths]
+        self._never_retried_paths = [re.compile(path) for path in self.NEVER_RETRIED_PATHS]
+        self.budget = budget if budget is not None else RetryBudget()
+        self.on_retry = on_retry
+
+    def is_idempotent(self, method, url):
+        """Checks whether a request can be replayed safely.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL of the request.
+
+        Returns:
+            (bool): True if retrying cannot duplicate data.
+        """
+        path = urlsplit(url).path
+        if any(pattern.search(path) for pattern in self._never_retried_paths):
+            return False
+        if method.lower() in self.IDEMPOTENT_METHODS:
+            return True
+        return any(pattern.search(path) for pattern in self.safe_post_paths)
+
+    def is_retryable_exception(self, exception):
+        """Klaviyo errors are retried by status code, anything else is a transport error and is retried."""
+        if isinstance(exception, KlaviyoAPIException):
+            return exception.status_code in self.retry_statuses
+        return True
+
+    def get_retry_after(self, exception):
+        """Reads the Retry-After header of a failed response.
+
+        Args:
+            exception (Exception): Error raised by the failed attempt.
+
+        Returns:
+            (float or None): Seconds to wait, None if the header is missing or invalid.
+        """
+        headers = getattr(getattr(exception, 'response', None), 'headers', None)
+        if not headers:
+            return None
+
+        value = headers.get(self.RETRY_AFTER)
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.mktime_tz(email.utils.parsedate_tz(value)) - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def get_backoff(self, attempt):
+        """Full jitter exponential backoff.
+
+        Args:
+            attempt (int): Number of retries already made.
+
+        Returns:
+            (float): Seconds to wait.
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def start(self):
+        """Records a new request against the retry budget."""
+        self.budget.deposit()
+
+    def get_delay(self, method, url, attempt, exception):
+        """Decides whether a failed attempt is retried.
+
+        Retries after a Retry-After header still get a jittered backoff added, so clients
+        throttled together don't all come back at the same instant.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL of the request.
+            attempt (int): Number of retries already made.
+            exception (Exception): Error raised by the failed attempt.
+
+        Returns:
+            (float or None): Seconds to wait before retrying, None to give up.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if not self.is_retryable_exception(exception) or not self.is_idempotent(method, url):
+            return None
+
+        delay = self.get_backoff(attempt)
+        retry_after = self.get_retry_after(exception)
+        if retry_after is not None:
+            if retry_after > self.max_retry_after:
+                return None
+            delay += retry_after
+
+        if not self.budget.withdraw():
+            return None
+
+        if self.on_retry is not None:
+            self.on_retry(RetryAttempt(method, url.split('?', 1)[0], attempt + 1, delay, exception))
+        return delay
@@ -0,0 +1,98 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class KlaviyoSession(object):
+    """A thread-safe pool of keep-alive HTTP connections shared by API resources.
+
+    The underlying requests.Session is built lazily on first use, so creating a
+    KlaviyoSession is cheap. urllib3 connection pools are safe to share across threads.
+    """
+    DEFAULT_POOL_CONNECTIONS = 10
+    DEFAULT_POOL_MAXSIZE = 10
+    MOUNT_PREFIXES = ('https://', 'http://', )
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        keep_alive=True
+        ):
+        """
+        Args:
+            pool_connections (int): Number of per-host connection pools to cache.
+            pool_maxsize (int): Maximum number of connections kept open per host.
+            pool_block (bool): Block when the per-host pool is exhausted instead of opening a throwaway connection.
+            keep_alive (bool): Reuse connections between requests.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+
+        self._session = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def session(self):
+        """Returns the pooled requests.Session, building it on first access.
+
+        Returns:
+            (requests.Session): Session with pooled adapters mounted.
+        """
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+                session = self._session
+        return session
+
+    def _build_session(self):
+        """Creates a requests.Session with pooled adapters mounted.
+
+        Returns:
+            (requests.Session): Configured session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        for prefix in self.MOUNT_PREFIXES:
+            session.mount(prefix, adapter)
+
+        if not self.keep_alive:
+            session.headers['Connection'] = 'close'
+
+        return session
+
+    def request(self, method, url, **kwargs):
+        """Sends a request over a pooled connection.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL to make the request to.
+            **kwargs: Passed through to requests.Session.request.
+
+        Returns:
+            (requests.Response): Http response object.
+        """
+        return self.session.request(method, url, **kwargs)
+
+    def close(self):
+        """Closes every pooled connection. The session is rebuilt if used again."""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
@@ -0,0 +1,156 @@
+import csv
+import gzip
+import io
+import os
+
+from .codec import get_default_codec
+
+
+class Sink(object):
+    """Destination for exported records.
+
+    Exporters checkpoint `position()` after each `flush()` and call `truncate(position)` when resuming,
+    so records written after the last checkpoint are discarded instead of duplicated.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def flush(self):
+        """Makes every record written so far durable."""
+
+    def position(self):
+        """Returns an opaque, json serializable position of the flushed output."""
+        return None
+
+    def truncate(self, position):
+        """Discards everything written after `position`."""
+
+    def close(self):
+        pass
+
+
+class FileSink(Sink):
+    """Appends encoded records to a local file, checkpointed by byte offset."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Output file, appended to if it exists.
+        """
+        self.path = path
+        self._file = open(path, 'ab')
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def position(self):
+        return self._file.tell()
+
+    def truncate(self, position):
+        self._file.seek(position)
+        self._file.truncate()
+
+    def close(self):
+        self._file.close()
+
+
+class JSONLSink(FileSink):
+    """Writes one json document per line."""
+
+    def __init__(self, path, codec=None):
+        """
+        Args:
+            path (str): Output file, appended to if it exists.
+            codec (JSONCodec): Encodes records, defaults to orjson when installed.
+        """
+        super(JSONLSink, self).__init__(path)
+        self.codec = codec if codec is not None else get_default_codec()
+
+    def write(self, record):
+        self._file.write(self.codec.encode(record) + b'\n')
+
+
+class GzipJSONLSink(JSONLSink):
+    """Writes gzip compressed json lines.
+
+    Every flush closes a gzip member, so the file can be truncated back to any checkpoint and
+    appended to while staying a valid (multi-member) gzip file.
+    """
+
+    def __init__(self, path, compresslevel=6, codec=None):
+        """
+        Args:
+            path (str): Output file, appended to if it exists.
+            compresslevel (int): Gzip compression level.
+            codec (JSONCodec): Encodes records, defaults to orjson when installed.
+        """
+        super(GzipJSONLSink, self).__init__(path, codec)
+        self.compresslevel = compresslevel
+        self._member = None
+
+    def write(self, record):
+        if self._member is None:
+            self._member = gzip.GzipFile(fileobj=self._file, mode='wb', compresslevel=self.compresslevel)
+        self._member.write(self.codec.encode(record) + b'\n')
+
+    def flush(self):
+        if self._member is not None:
+            self._member.close()
+            self._member = None
+        super(GzipJSONLSink, self).flush()
+
+    def close(self):
+        self.flush()
+        super(GzipJSONLSink, self).close()
+
+
+class CSVSink(FileSink):
+    """Writes records as csv rows over a fixed set of columns, ready for columnar loads into warehouses
+    or dataframes.
+
+    A header row starts the file. Columns a record lacks are left empty and keys outside the columns are dropped.
+    """
+
+    def __init__(self, path, columns):
+        """
+        Args:
+            path (str): Output file, appended to if it exists.
+            columns (list): Keys of the records written as columns, in order.
+        """
+        super(CSVSink, self).__init__(path)
+        self.columns = list(columns)
+        self._row = io.StringIO()
+        self._writer = csv.DictWriter(self._row, self.columns, extrasaction='ignore', lineterminator='\n')
+
+    def write(self, record):
+        if self._file.tell() == 0:
+            self._writer.writeheader()
+        self._writer.writerow(record)
+        self._file.write(self._row.getvalue().encode('utf-8'))
+        self._row.seek(0)
+        self._row.truncate()
+
+
+class CallbackSink(Sink):
+    """Hands every record to a callable.
+
+    A callable can't be rewound, so records delivered after the last checkpoint are delivered again on resume.
+    """
+
+    def __init__(self, callback):
+        """
+        Args:
+            callback (callable): Called with each record.
+        """
+        self.callback = callback
+
+    def write(self, record):
+        self.callback(record)
@@ -0,0 +1,204 @@
+import codecs
+import json
+
+
+class JSONStreamDecoder(object):
+    """Push decoder yielding the items of one array of a json document while its body is still arriving.
+
+    The document is either an array, whose items are yielded, or an object whose `items_key` member is an
+    array whose items are yielded; the object's other members (e.g. 'next', 'marker', 'next_offset') are
+    decoded whole into `fields`. Only the undecoded tail of the body is buffered, so memory stays bounded by
+    the chunk and item sizes rather than the page size.
+    """
+    DEFAULT_ENCODING = 'utf-8'
+    WHITESPACE = ' \t\n\r'
+
+    _NEED_MORE = object()
+
+    def __init__(self, items_key, encoding=DEFAULT_ENCODING):
+        """
+        Args:
+            items_key (str): Member of the top level object holding the items, e.g. 'data' or 'records'.
+            encoding (str): Encoding of the body.
+        """
+        self.items_key = items_key
+        self.fields = {}
+        self.done = False
+
+        self._text_decoder = codecs.getincrementaldecoder(encoding)()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+        self._parser = self._parse()
+
+    def feed(self, chunk):
+        """
+        Args:
+            chunk (bytes): Next part of the body.
+
+        Returns:
+            (list): Items completed by this chunk.
+
+        Raises:
+            (ValueError): The body isn't a valid document.
+        """
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(chunk)
+        self._position = 0
+        return self._drain()
+
+    def close(self):
+        """Signals the end of the body.
+
+        Returns:
+            (list): Items completed by the end of the body.
+
+        Raises:
+            (ValueError): The body was truncated or isn't a valid document.
+        """
+        self._buffer = self._buffer[self._position:] + self._text_decoder.decode(b'', final=True)
+        self._position = 0
+        self._eof = True
+        items = self._drain()
+        if not self.done:
+            raise ValueError('Truncated json document')
+        return items
+
+    def _drain(self):
+        items = []
+        for item in self._parser:
+            if item is self._NEED_MORE:
+                break
+            items.append(item)
+        return items
+
+    def _peek(self):
+        """Skips whitespace and returns the next character, None if more data is needed."""
+        while self._position < len(self._buffer) and self._buffer[self._position] in self.WHITESPACE:
+            self._position += 1
+        if self._position < len(self._buffer):
+            return self._buffer[self._position]
+        if self._eof:
+            raise ValueError('Truncated json document')
+        return None
+
+    def _decode(self):
+        """Decodes the value at the current position, _NEED_MORE if it may not be complete yet."""
+        try:
+            value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+        except ValueError:
+            if self._eof:
+                raise
+            return self._NEED_MORE
+        # a number ending with the buffer may go on in the next chunk
+        if end == len(self._buffer) and not self._eof:
+            return self._NEED_MORE
+        self._position = end
+        return value
+
+    def _expect(self, characters):
+        character = self._peek()
+        while character is None:
+            yield self._NEED_MORE
+            character = self._peek()
+        if character not in characters:
+            raise ValueError('Expected one of {!r} at {!r}'.format(characters, self._buffer[self._position:][:20]))
+        self._position += 1
+        return character
+
+    def _value(self):
+        while self._peek() is None:
+            yield self._NEED_MORE
+        value = self._decode()
+        while value is self._NEED_MORE:
+            yield self._NEED_MORE
+            value = self._decode()
+        return value
+
+    def _items(self):
+        yield from self._expect('[')
+        while self._peek() is None:
+            yield self._NEED_MORE
+        if self._peek() == ']':
+            self._position += 1
+            return
+        while True:
+            yield (yield from self._value())
+            if (yield from self._expect(',]')) == ']':
+                return
+
+    def _parse(self):
+        while self._peek() is None:
+            yield self._NEED_MORE
+
+        if self._peek() == '[':
+            yield from self._items()
+        else:
+            yield from self._expect('{')
+            while True:
+                while self._peek() is None:
+                    yield self._NEED_MORE
+                if self._peek() == '}':
+                    self._position += 1
+                    break
+
+                key = yield from self._value()
+                yield from self._expect(':')
+                while self._peek() is None:
+                    yield self._NEED_MORE
+                if key == self.items_key and self._peek() == '[':
+                    yield from self._items()
+                else:
+                    self.fields[key] = yield from self._value()
+
+                if (yield from self._expect(',}')) == '}':
+                    break
+
+        self.done = True
+
+
+class KlaviyoStreamingResponse(object):
+    """Successful response decoded while it is read: iterating it yields the items of its `items_key` array.
+
+    The response can be iterated once. Pagination fields (e.g. 'next', 'marker', 'next_offset') are in
+    `fields` once the body has been read past them, and always after the iteration ends. The connection is
+    released when the iteration ends or the response is closed.
+    """
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, status_code, response, items_key, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            status_code (int): HTTP status code.
+            response (Response): Streamed requests response.
+            items_key (str): Member of the body holding the items.
+            chunk_size (int): Bytes read at a time.
+        """
+        self.status_code = status_code
+        self.headers = response.headers
+        self.chunk_size = chunk_size
+        self._response = response
+        self._decoder = JSONStreamDecoder(items_key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def fields(self):
+        return self._decoder.fields
+
+    def __iter__(self):
+        try:
+            for chunk in self._response.iter_content(self.chunk_size):
+                for item in self._decoder.feed(chunk):
+                    yield item
+            for item in self._decoder.close():
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._response.close()
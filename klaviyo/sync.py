@@ -0,0 +1,207 @@
+import json
+import sqlite3
+
+from .bulk import chunked
+from .lists import Lists
+
+
+class ListMembershipSync(object):
+    """Mirrors the membership of lists and segments incrementally through a local SQLite snapshot.
+
+    `diff` pages through the current members once and reports only the members added and removed since the
+    previous run, recording the new membership in the snapshot. `push` does the reverse: it compares a
+    desired membership with the snapshot and sends only the missing adds and removes through the bulk
+    methods. The snapshot keeps one row per member (profile id and normalized email) and no other profile data.
+    """
+    ADD = 'add'
+    REMOVE = 'remove'
+
+    ID = 'id'
+    EMAIL = 'email'
+
+    # stays under SQLite's default limit of bound variables per statement
+    MAX_VARIABLES = 500
+
+    def __init__(self, lists, path, prefetch=True):
+        """
+        Args:
+            lists (Lists): Resource used to page through members and send changes.
+            path (str): SQLite database file of the snapshot, created if missing.
+            prefetch (bool): Fetch the next page of members while the current one is compared.
+        """
+        self.lists = lists
+        self.path = path
+        self.prefetch = prefetch
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS members ('
+            'group_id TEXT, profile_id TEXT, email TEXT, generation INTEGER, PRIMARY KEY (group_id, profile_id))'
+        )
+        self._connection.execute('CREATE INDEX IF NOT EXISTS members_email ON members (group_id, email)')
+        self._connection.execute('CREATE TABLE IF NOT EXISTS generations (group_id TEXT PRIMARY KEY, generation INTEGER)')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _normalize(email):
+        return email.strip().lower() if email else None
+
+    def _get_generation(self, group_id):
+        row = self._connection.execute('SELECT generation FROM generations WHERE group_id = ?', (group_id, )).fetchone()
+        return row[0] if row is not None else 0
+
+    def diff(self, group_id):
+        """Pages through the members of a list or segment and yields the changes since the previous diff.
+
+        The first diff of a group reports every member as added. The snapshot is updated in one transaction
+        committed once the changes are exhausted; if the iteration is closed early or fails, the snapshot is
+        left as it was and the next diff reports the same changes again.
+
+        Args:
+            group_id (str): The list id or the segment id.
+
+        Returns:
+            (generator): (action, member) tuples, action being ADD or REMOVE. Added members are the
+                records of get_all_members; removed members are dicts with their 'id' and 'email'.
+        """
+        self._connection.execute('BEGIN')
+        try:
+            generation = self._get_generation(group_id) + 1
+            members = self.lists.iter_all_members(group_id, prefetch=self.prefetch)
+            for page in members.iter_pages():
+                for member in self._mark(group_id, generation, page):
+                    yield self.ADD, member
+            for member in self._sweep(group_id, generation):
+                yield self.REMOVE, member
+            self._connection.execute(
+                'INSERT OR REPLACE INTO generations (group_id, generation) VALUES (?, ?)', (group_id, generation)
+            )
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+
+    def _mark(self, group_id, generation, page):
+        """Records a page of members as seen in this generation.
+
+        Returns:
+            (list): Members of the page missing from the snapshot.
+        """
+        known = set()
+        for ids in chunked([member[self.ID] for member in page], self.MAX_VARIABLES):
+            rows = self._connection.execute(
+                'SELECT profile_id FROM members WHERE group_id = ? AND profile_id IN ({})'.format(', '.join('?' * len(ids))),
+                [group_id] + ids
+            )
+            known.update(row[0] for row in rows)
+
+        added = []
+        for member in page:
+            if member[self.ID] not in known:
+                known.add(member[self.ID])
+                added.append(member)
+
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO members (group_id, profile_id, email, generation) VALUES (?, ?, ?, ?)',
+            [(group_id, member[self.ID], self._normalize(member.get(self.EMAIL)), generation) for member in page]
+        )
+        return added
+
+    def _sweep(self, group_id, generation):
+        """Deletes the members not seen in this generation.
+
+        Returns:
+            (list): Removed members.
+        """
+        removed = [
+            {self.ID: profile_id, self.EMAIL: email}
+            for profile_id, email in self._connection.execute(
+                'SELECT profile_id, email FROM members WHERE group_id = ? AND generation < ?', (group_id, generation)
+            )
+        ]
+        self._connection.execute('DELETE FROM members WHERE group_id = ? AND generation < ?', (group_id, generation))
+        return removed
+
+    def push(
+        self,
+        list_id,
+        profiles,
+        refresh=True,
+        chunk_size=Lists.MAX_BATCH_SIZE,
+        max_workers=Lists.DEFAULT_BULK_WORKERS
+        ):
+        """Makes a list's membership match a desired set of profiles, sending only the differences.
+
+        Profiles missing from the list are added with add_members_to_list_bulk and members missing from
+        `profiles` are removed with remove_members_from_list_bulk, both matched by email. Members without an
+        email (e.g. sms only) are never removed. Successful chunks are recorded in the snapshot, so the
+        next diff doesn't report them.
+
+        Args:
+            list_id (str): The list id.
+            profiles (iterable): Desired members, dicts with at least an 'email', may be a generator.
+            refresh (bool): Diff the list first so the snapshot is current; pushing against a stale snapshot
+                sends adds or removes that are no-ops, or misses changes made since the last diff.
+            chunk_size (int): Maximum profiles or emails per request.
+            max_workers (int): Maximum concurrent requests.
+
+        Returns:
+            (tuple): BulkResult of the adds and BulkResult of the removes.
+        """
+        if refresh:
+            for _ in self.diff(list_id):
+                pass
+
+        self._connection.execute('CREATE TEMP TABLE IF NOT EXISTS desired (email TEXT PRIMARY KEY, profile TEXT)')
+        self._connection.execute('DELETE FROM desired')
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO desired (email, profile) VALUES (?, ?)',
+            ((self._normalize(profile[self.EMAIL]), json.dumps(profile)) for profile in profiles)
+        )
+
+        additions = self._connection.execute(
+            'SELECT profile FROM desired WHERE email NOT IN '
+            '(SELECT email FROM members WHERE group_id = ? AND email IS NOT NULL)', (list_id, )
+        )
+        added = self.lists.add_members_to_list_bulk(
+            list_id, (json.loads(row[0]) for row in additions), chunk_size, max_workers
+        )
+        removals = self._connection.execute(
+            'SELECT email FROM members WHERE group_id = ? AND email IS NOT NULL AND email NOT IN '
+            '(SELECT email FROM desired)', (list_id, )
+        )
+        removed = self.lists.remove_members_from_list_bulk(list_id, (row[0] for row in removals), chunk_size, max_workers)
+
+        self._record_push(list_id, added, removed)
+        self._connection.execute('DELETE FROM desired')
+        return added, removed
+
+    def _record_push(self, list_id, added, removed):
+        generation = self._get_generation(list_id)
+        self._connection.execute('BEGIN')
+        try:
+            for result in added.results:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO members (group_id, profile_id, email, generation) VALUES (?, ?, ?, ?)',
+                    [
+                        (list_id, member[self.ID], self._normalize(member.get(self.EMAIL)), generation)
+                        for member in result.response.data or []
+                    ]
+                )
+            for result in removed.results:
+                for emails in chunked(result.items, self.MAX_VARIABLES):
+                    self._connection.execute(
+                        'DELETE FROM members WHERE group_id = ? AND email IN ({})'.format(', '.join('?' * len(emails))),
+                        [list_id] + emails
+                    )
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,173 @@
+import contextlib
+import functools
+import inspect
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:
+    trace = None
+
+from klaviyo import __version__
+
+
+class Tracer(object):
+    """Opens OpenTelemetry spans around SDK calls.
+
+    Every public resource method gets a span, and every HTTP attempt a child span (so retries and pagination
+    pages show up), with the trace context injected into the outgoing headers. Generators and awaitables
+    returned by resource methods keep their span open until they are exhausted or awaited; paginated
+    iterators trace every page fetch as its own call.
+
+    Exceptions are recorded by type only, since their messages may hold urls with the api key.
+    Without opentelemetry installed, `enabled` is False and resources skip tracing entirely.
+    """
+    INSTRUMENTATION_NAME = 'klaviyo'
+
+    # public methods that aren't api calls
+    UNTRACED = ('close', )
+
+    # span attributes
+    RESOURCE = 'klaviyo.resource'
+    ENDPOINT = 'klaviyo.endpoint'
+    ATTEMPT = 'klaviyo.attempt'
+    METHOD = 'http.method'
+    STATUS_CODE = 'http.status_code'
+    REQUEST_SIZE = 'http.request_content_length'
+    RESPONSE_SIZE = 'http.response_content_length'
+    EXCEPTION_TYPE = 'exception.type'
+
+    _DONE = object()
+
+    def __init__(self, tracer_provider=None):
+        """
+        Args:
+            tracer_provider (TracerProvider): Provider of the tracer, defaults to the global one.
+        """
+        self.enabled = trace is not None
+        self._tracer = None
+        if self.enabled:
+            self._tracer = trace.get_tracer(self.INSTRUMENTATION_NAME, __version__, tracer_provider=tracer_provider)
+
+    def instrument(self, resource):
+        """Replaces every public method of a resource instance by a traced one.
+
+        Args:
+            resource (KlaviyoAPI): Resource to trace.
+        """
+        resource_name = type(resource).__name__
+        for name in dir(type(resource)):
+            if name.startswith('_') or name in self.UNTRACED or not inspect.isfunction(getattr(type(resource), name)):
+                continue
+            setattr(resource, name, self._wrap(resource_name, name, getattr(resource, name)))
+
+    def _wrap(self, resource_name, name, method):
+        span_name = '{}.{}'.format(resource_name, name)
+
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            span = self._tracer.start_span(span_name, attributes={self.RESOURCE: resource_name})
+            try:
+                with self._activate(span):
+                    result = method(*args, **kwargs)
+            except Exception:
+                span.end()
+                raise
+
+            if inspect.isawaitable(result):
+                return self._trace_awaitable(span, result)
+            if inspect.isgenerator(result):
+                return self._trace_generator(span, result)
+            span.end()
+            return result
+        return traced
+
+    @contextlib.contextmanager
+    def _activate(self, span):
+        """Makes a span current, marking it failed if an exception is raised."""
+        try:
+            with trace.use_span(span, record_exception=False, set_status_on_exception=False):
+                yield
+        except Exception as e:
+            self._set_error(span, e)
+            raise
+
+    def _set_error(self, span, exception):
+        span.set_attribute(self.EXCEPTION_TYPE, type(exception).__name__)
+        span.set_status(Status(StatusCode.ERROR, type(exception).__name__))
+
+    async def _trace_awaitable(self, span, awaitable):
+        try:
+            with self._activate(span):
+                return await awaitable
+        finally:
+            span.end()
+
+    def _trace_generator(self, span, generator):
+        try:
+            while True:
+                # the span is only current while the generator runs, never across a yield
+                with self._activate(span):
+                    item = next(generator, self._DONE)
+                if item is self._DONE:
+                    return
+                yield item
+        finally:
+            generator.close()
+            span.end()
+
+    def start_attempt(self, resource_name, endpoint, method, attempt, request_bytes):
+        """Opens the span of one HTTP attempt, as a child of the current span.
+
+        Args:
+            resource_name (str): Name of the resource class making the request.
+            endpoint (str): Path with ids replaced, e.g. 'v2/list/{id}/members'.
+            method (str): HTTP method.
+            attempt (int): Number of retries made before this attempt.
+            request_bytes (int): Size of the request body.
+
+        Returns:
+            (Span): Span to end with end_attempt.
+        """
+        return self._tracer.start_span(
+            '{} {}'.format(method, endpoint),
+            kind=trace.SpanKind.CLIENT,
+            attributes={
+                self.RESOURCE: resource_name,
+                self.ENDPOINT: endpoint,
+                self.METHOD: method,
+                self.ATTEMPT: attempt,
+                self.REQUEST_SIZE: request_bytes,
+            },
+        )
+
+    def inject(self, headers, span):
+        """
+        Args:
+            headers (dict): Headers of the attempt.
+            span (Span): Span of the attempt.
+
+        Returns:
+            (dict): Copy of the headers carrying the trace context.
+        """
+        headers = dict(headers)
+        propagate.inject(headers, context=trace.set_span_in_context(span))
+        return headers
+
+    def end_attempt(self, span, status_code=None, response_bytes=None, exception=None):
+        """Ends the span of one HTTP attempt.
+
+        Args:
+            span (Span): Span returned by start_attempt.
+            status_code (int): HTTP status code, None if no response arrived.
+            response_bytes (int): Size of the response body.
+            exception (Exception): Error raised when no response arrived.
+        """
+        if status_code is not None:
+            span.set_attribute(self.STATUS_CODE, status_code)
+            span.set_attribute(self.RESPONSE_SIZE, response_bytes)
+            if status_code >= 400:
+                span.set_status(Status(StatusCode.ERROR))
+        if exception is not None:
+            self._set_error(span, exception)
+        span.end()
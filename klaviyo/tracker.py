@@ -0,0 +1,286 @@
+import collections
+import copy
+import threading
+import time
+
+from .api_helper import KlaviyoAPI
+from .exceptions import KlaviyoException, KlaviyoQueueFullException
+
+
+class QueuedEvent(object):
+    """A track or identify call waiting to be sent."""
+
+    def __init__(self, resource, params, is_test=False):
+        """
+        Args:
+            resource (str): 'track' or 'identify'.
+            params (dict): Payload params for the request.
+            is_test (bool): Should this be a test request.
+        """
+        self.resource = resource
+        self.params = params
+        self.is_test = is_test
+
+
+class EventTracker(object):
+    """Non-blocking track and identify calls.
+
+    Calls are validated and enqueued on the caller's thread and sent by a pool of background workers.
+    Each worker drains up to max_batch_size events at a time, waiting at most flush_interval seconds
+    for a batch to fill, and sends them over the pooled connections of the Public resource.
+    """
+    OVERFLOW_BLOCK = 'block'
+    OVERFLOW_DROP_OLDEST = 'drop_oldest'
+    OVERFLOW_RAISE = 'raise'
+    OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_RAISE, )
+
+    DEFAULT_MAX_QUEUE_SIZE = 10000
+    DEFAULT_MAX_BATCH_SIZE = 100
+    DEFAULT_FLUSH_INTERVAL = 0.5
+    DEFAULT_WORKERS = 2
+
+    FAILED_RESPONSES = (0, '0', )
+
+    def __init__(
+        self,
+        public,
+        max_queue_size=DEFAULT_MAX_QUEUE_SIZE,
+        max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+        flush_interval=DEFAULT_FLUSH_INTERVAL,
+        workers=DEFAULT_WORKERS,
+        overflow=OVERFLOW_BLOCK,
+        method=KlaviyoAPI.HTTP_POST,
+        on_success=None,
+        on_failure=None
+        ):
+        """
+        Args:
+            public (Public): Resource used to send events.
+            max_queue_size (int): Maximum number of events waiting to be sent.
+            max_batch_size (int): Maximum number of events a worker takes off the queue at once.
+            flush_interval (float): Seconds a worker waits for a batch to fill before sending it.
+            workers (int): Number of background sender threads.
+            overflow (str): What to do when the queue is full: 'block', 'drop_oldest' or 'raise'.
+            method (str): 'post' or 'get' request for track and identify.
+            on_success (callable): Called with (event, response) for every event sent.
+            on_failure (callable): Called with (event, exception) for every event that failed or was dropped.
+        """
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise KlaviyoException('Invalid overflow policy, must be one of: {}'.format(list(self.OVERFLOW_POLICIES)))
+
+        self.public = public
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.method = method
+        self.on_success = on_success
+        self.on_failure = on_failure
+
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._unfinished = 0
+        self._flushing = 0
+        self._closed = False
+
+        self._workers = []
+        for index in range(workers):
+            worker = threading.Thread(target=self._run, name='klaviyo-tracker-{}'.format(index))
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def track(
+        self,
+        event,
+        email=None,
+        external_id=None,
+        properties=None,
+        customer_properties=None,
+        timestamp=None,
+        ip_address=None,
+        is_test=False
+        ):
+        """Enqueues a track call, see Public.track.
+
+        The event is timestamped now if no timestamp is given, so time spent in the queue does not shift it.
+        Properties are copied, so the caller may reuse or change them once this returns.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided or the tracker is closed.
+            (KlaviyoQueueFullException): The queue is full and the overflow policy is 'raise'.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        params = self.public._build_track_params(
+            event,
+            email=email,
+            external_id=external_id,
+            properties=copy.deepcopy(properties),
+            customer_properties=copy.deepcopy(customer_properties),
+            timestamp=timestamp,
+            ip_address=ip_address,
+        )
+        self._enqueue(QueuedEvent(self.public.TRACK, params, is_test))
+
+    def identify(self, email=None, external_id=None, properties=None, is_test=False):
+        """Enqueues an identify call, see Public.identify. Properties are copied, like in track.
+
+        Raises:
+            (KlaviyoException): Identifiers not provided or the tracker is closed.
+            (KlaviyoQueueFullException): The queue is full and the overflow policy is 'raise'.
+        """
+        params = self.public._build_identify_params(
+            email=email, external_id=external_id, properties=copy.deepcopy(properties)
+        )
+        self._enqueue(QueuedEvent(self.public.IDENTIFY, params, is_test))
+
+    def flush(self, timeout=None):
+        """Sends every queued event now and waits for them to finish.
+
+        Args:
+            timeout (float or None): Maximum seconds to wait, None waits forever.
+
+        Returns:
+            (bool): True if the queue was drained in time.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            self._flushing += 1
+            self._not_empty.notify_all()
+            try:
+                while self._unfinished:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._idle.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout=None):
+        """Stops accepting events, drains the queue and stops the workers.
+
+        Args:
+            timeout (float or None): Maximum seconds to wait for the drain, None waits forever.
+
+        Returns:
+            (bool): True if every queued event was handled in time.
+        """
+        with self._lock:
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+        drained = self.flush(timeout)
+        if drained:
+            for worker in self._workers:
+                worker.join()
+        return drained
+
+    @property
+    def pending(self):
+        """Number of events queued or being sent."""
+        with self._lock:
+            return self._unfinished
+
+    def _enqueue(self, queued_event):
+        dropped = None
+        with self._lock:
+            if self._closed:
+                raise KlaviyoException('Tracker is closed')
+
+            while len(self._queue) >= self.max_queue_size:
+                if self.overflow == self.OVERFLOW_RAISE:
+                    raise KlaviyoQueueFullException('Tracker queue is full')
+                elif self.overflow == self.OVERFLOW_DROP_OLDEST:
+                    dropped = self._queue.popleft()
+                    self._unfinished -= 1
+                else:
+                    self._not_full.wait()
+                    if self._closed:
+                        raise KlaviyoException('Tracker is closed')
+
+            self._queue.append(queued_event)
+            self._unfinished += 1
+            self._not_empty.notify()
+
+        if dropped is not None:
+            self._notify(self.on_failure, dropped, KlaviyoQueueFullException('Dropped from a full tracker queue'))
+
+    def _next_batch(self):
+        """Blocks until events are available and takes a batch off the queue.
+
+        Returns:
+            (list or None): Queued events, None once the tracker is closed and drained.
+        """
+        with self._lock:
+            while not self._queue and not self._closed:
+                self._not_empty.wait()
+            if not self._queue:
+                return None
+
+            batch = []
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.max_batch_size:
+                if self._queue:
+                    batch.append(self._queue.popleft())
+                    self._not_full.notify()
+                    continue
+
+                remaining = deadline - time.time()
+                if self._closed or self._flushing or remaining <= 0:
+                    break
+                self._not_empty.wait(remaining)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            for queued_event in batch:
+                self._send(queued_event)
+
+            with self._lock:
+                self._unfinished -= len(batch)
+                if not self._unfinished:
+                    self._idle.notify_all()
+
+    def _send(self, queued_event):
+        try:
+            response = self.public._track_identify_request(
+                method=self.method,
+                params=queued_event.params,
+                resource=queued_event.resource,
+                is_test=queued_event.is_test,
+            )
+        except Exception as e:
+            self._notify(self.on_failure, queued_event, e)
+            return
+
+        if response.data in self.FAILED_RESPONSES:
+            self._notify(self.on_failure, queued_event, KlaviyoException('Klaviyo rejected the event'))
+        else:
+            self._notify(self.on_success, queued_event, response)
+
+    @staticmethod
+    def _notify(callback, queued_event, result):
+        if callback is None:
+            return
+        try:
+            callback(queued_event, result)
+        except Exception:
+            # a broken callback must not kill a worker thread
+            pass
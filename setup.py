@@ -5,10 +5,17 @@ setup(
     name = 'klaviyo',
     version = __version__,
     packages = find_packages(),
+    python_requires='>=3.6',
     install_requires=[
         'requests >= 2.2.1',
         'simplejson >= 3.17.0',
     ],
+    extras_require={
+        'async': ['aiohttp >= 3.6'],
+        'tracing': ['opentelemetry-api >= 1.0'],
+        'orjson': ['orjson >= 3.0'],
+        'brotli': ['brotli >= 1.0'],
+    },
 
     # metadata for upload to PyPI
     author = 'Klaviyo',
@@ -22,4 +29,12 @@ Deprecation Notice: This package is set to be deprecated on 2023-01-01 and will
     license = 'MIT License',
     keywords = 'klaviyo',
     url = 'http://github.com/klaviyo/python-klaviyo',
+    classifiers = [
+        'License :: OSI Approved :: MIT License',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+    ],
 )
@@ -0,0 +1,8 @@
+from klaviyo.api import Klaviyo
+from .api_helper import KlaviyoAPIFixture
+
+
+class KlaviyoFixture(KlaviyoAPIFixture):
+    @property
+    def client(self):
+        return Klaviyo(**self.API_SETTINGS)
@@ -1,6 +1,7 @@
 from mock import MagicMock, patch
 import pytest
 import requests
+import simplejson
 from klaviyo.api_helper import KlaviyoAPI
 
 class KlaviyoAPIFixture:
@@ -70,7 +71,7 @@ class KlaviyoAPIFixture:
 
     @pytest.fixture
     def mock_requests_package(self):
-        with patch.object(requests, requests.get.__name__) as mock_requests_package:
+        with patch.object(requests.Session, requests.Session.request.__name__) as mock_requests_package:
             yield mock_requests_package
 
 
@@ -111,5 +112,6 @@ class KlaviyoAPIFixture:
         mock_response.status_code = status_code
         mock_response.headers = headers
         mock_response.json = MagicMock(return_value=json)
+        mock_response.content = simplejson.dumps(json).encode('utf-8')
 
         return mock_response
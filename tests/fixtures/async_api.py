@@ -0,0 +1,86 @@
+import asyncio
+import json
+try:
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from urlparse import parse_qs, urlsplit
+
+import pytest
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class AsyncKlaviyoFixture(KlaviyoAPIFixture):
+    MEMBERS = [{'id': 'id-{}'.format(index), 'email': 'president{}@mailinator.com'.format(index)} for index in range(5)]
+
+    @staticmethod
+    def get_query(request):
+        return dict((key, values[0]) for key, values in parse_qs(urlsplit(request.path).query).items())
+
+    @pytest.fixture
+    def stub_server(self):
+        def members(request):
+            # pages of two members, the marker being the index of the next page's first member
+            marker = json.loads(request.body).get('marker', 0)
+            page = {'records': self.MEMBERS[marker:marker + 2]}
+            if marker + 2 < len(self.MEMBERS):
+                page['marker'] = marker + 2
+            return 200, {}, page
+
+        def add_members(request):
+            return 200, {}, [{'id': 'id-' + profile['email']} for profile in json.loads(request.body)['profiles']]
+
+        def metric_export(request):
+            query = self.get_query(request)
+            return 200, {}, {'results': [{'segment': 'Placed Order', 'data': [
+                {'date': query['start_date'] + ' 00:00:00', 'values': [1.0]},
+                {'date': query['end_date'] + ' 00:00:00', 'values': [2.0]},
+            ]}]}
+
+        def campaigns(request):
+            page = int(self.get_query(request)['page'])
+            return 200, {}, {'data': [{'id': 'campaign-{}'.format(page)}], 'total': 3}
+
+        def recipients(request):
+            offset = self.get_query(request).get('offset')
+            if not offset:
+                return 200, {}, {'data': [{'email': 'thomas.jefferson@mailinator.com'}], 'next_offset': 'abc'}
+            return 200, {}, {'data': [{'email': 'john.adams@mailinator.com'}]}
+
+        def timeline(request):
+            profile_id = request.path.split('/')[4]
+            if profile_id == 'missing':
+                return 404, {}, {'detail': 'Profile not found'}
+            if self.get_query(request).get('since'):
+                return 200, {}, {'data': [{'id': profile_id + '-2'}], 'next': None}
+            return 200, {}, {'data': [{'id': profile_id + '-1'}], 'next': 'next-page'}
+
+        with StubServer({
+            ('GET', '/api/v2/lists'): (200, {}, [{'list_id': 'abc123', 'list_name': 'Presidents'}]),
+            ('GET', '/api/v2/list/missing'): (404, {}, {'detail': 'List not found'}),
+            ('GET', '/api/v1/metrics'): (429, {'Retry-After': '1'}, {'detail': 'Throttled'}),
+            ('GET', '/api/track'): (200, {'Content-Type': 'text/html'}, '1'),
+            ('GET', '/api/v2/group/abc123/members/all'): members,
+            ('GET', '/api/v2/list/abc123/exclusions/all'): members,
+            ('POST', '/api/v2/list/abc123/members'): add_members,
+            ('POST', '/api/v2/list/abc123/subscribe'): add_members,
+            ('GET', '/api/v1/metric/def456/export'): metric_export,
+            ('GET', '/api/v1/campaigns'): campaigns,
+            ('GET', '/api/v1/campaign/ghi789/recipients'): recipients,
+            ('GET', '/api/v1/person/thomas/metrics/timeline'): timeline,
+            ('GET', '/api/v1/person/john/metrics/timeline'): timeline,
+            ('GET', '/api/v1/person/missing/metrics/timeline'): timeline,
+        }) as server:
+            yield server
+
+    def client(self, server, **kwargs):
+        from klaviyo.async_api import AsyncKlaviyo
+        return AsyncKlaviyo(api_server=server.url, **dict(self.API_SETTINGS, **kwargs))
+
+    @staticmethod
+    def run(coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
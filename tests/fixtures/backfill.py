@@ -0,0 +1,35 @@
+import json
+try:
+    from urllib.parse import parse_qs
+except ImportError:
+    from urlparse import parse_qs
+
+import pytest
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class BackfillFixture(KlaviyoAPIFixture):
+    EVENTS = [
+        {'event': 'Placed Order', 'email': 'president{}@mailinator.com'.format(index), 'timestamp': 1400000000 + index,
+         'properties': {'value': index}}
+        for index in range(20)
+    ]
+
+    @pytest.fixture
+    def stub_server(self):
+        def track(request):
+            data = json.loads(parse_qs(request.body.decode('utf-8'))['data'][0])
+            # orders of no value are rejected
+            return 200, {'Content-Type': 'text/html'}, '0' if data['properties']['value'] == 0 else '1'
+
+        with StubServer({('POST', '/api/track'): track}) as server:
+            yield server
+
+    @pytest.fixture
+    def paths(self, tmpdir):
+        return str(tmpdir.join('events.jsonl')), str(tmpdir.join('dead_letters.jsonl'))
+
+    @staticmethod
+    def sent_events(server):
+        return [json.loads(parse_qs(request.body.decode('utf-8'))['data'][0]) for request in server.requests]
@@ -0,0 +1,41 @@
+from mock import patch
+import pytest
+import requests
+from klaviyo.cache import ResponseCache
+from klaviyo.lists import Lists
+from klaviyo.profiles import Profiles
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class ResponseCacheFixture(KlaviyoAPIFixture):
+    @pytest.fixture
+    def response_cache(self):
+        return ResponseCache()
+
+    def lists(self, response_cache, private_token='pk_flintstones'):
+        return Lists(private_token=private_token, response_cache=response_cache)
+
+    def profiles(self, response_cache):
+        return Profiles(private_token='pk_flintstones', response_cache=response_cache)
+
+    @pytest.fixture
+    def mock_session_request(self):
+        with patch.object(requests.Session, requests.Session.request.__name__) as mock_session_request:
+            mock_session_request.side_effect = lambda *args, **kwargs: self.mock_response(200, json={'id': 'abc123'})
+            yield mock_session_request
+
+    @pytest.fixture
+    def etag_server(self):
+        def get_lists(request):
+            if request.headers.get('If-None-Match') == '"v1"':
+                return 304, {'ETag': '"v1"'}, b''
+            return 200, {'ETag': '"v1"'}, [{'list_id': 'abc123'}]
+
+        with StubServer({('GET', '/api/v2/lists'): get_lists}) as server:
+            yield server
+
+    def stale_lists(self, server):
+        # a ttl of 0 makes every cached response immediately stale
+        response_cache = ResponseCache(ttls=((r'^v2/lists$', 0), ))
+        return Lists(private_token='pk_flintstones', api_server=server.url, response_cache=response_cache)
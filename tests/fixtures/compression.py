@@ -0,0 +1,34 @@
+import gzip
+import json
+
+import pytest
+from klaviyo.compression import Compression
+from klaviyo.lists import Lists
+from klaviyo.public import Public
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class CompressionFixture(KlaviyoAPIFixture):
+    PROFILES = [{'email': 'president{}@mailinator.com'.format(index), 'plan': 'premium'} for index in range(200)]
+    MEMBERS = [{'id': 'abc{}'.format(index), 'email': 'president{}@mailinator.com'.format(index)} for index in range(200)]
+
+    @pytest.fixture
+    def stub_server(self):
+        compressed_members = gzip.compress(json.dumps(self.MEMBERS).encode('utf-8'))
+        with StubServer({
+            ('POST', '/api/v2/list/abc123/members'): (200, {}, [{'id': 'abc123'}]),
+            ('GET', '/api/v2/list/abc123/members'): (200, {'Content-Encoding': 'gzip'}, compressed_members),
+            ('POST', '/api/identify'): (200, {'Content-Type': 'text/html'}, '1'),
+        }) as server:
+            yield server
+
+    @pytest.fixture
+    def compression(self):
+        return Compression(min_size=256)
+
+    def lists(self, server, compression):
+        return Lists(private_token='pk_flintstones', api_server=server.url, compression=compression)
+
+    def public(self, server, compression):
+        return Public(public_token='pk_flintstones', api_server=server.url, compression=compression)
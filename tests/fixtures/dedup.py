@@ -0,0 +1,33 @@
+import base64
+import json
+try:
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from urlparse import parse_qs, urlsplit
+
+import pytest
+from klaviyo import Klaviyo
+from klaviyo.dedup import TrackOnceIndex
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class DedupFixture(KlaviyoAPIFixture):
+    @pytest.fixture
+    def stub_server(self):
+        def track(request):
+            data = json.loads(base64.b64decode(parse_qs(urlsplit(request.path).query)['data'][0]))
+            # events of a profile Klaviyo can't record are rejected
+            rejected = data['customer_properties'].get('email', '').startswith('rejected')
+            return 200, {'Content-Type': 'text/html'}, '0' if rejected else '1'
+
+        with StubServer({('GET', '/api/track'): track}) as server:
+            yield server
+
+    def client(self, server, **kwargs):
+        kwargs.setdefault('track_once_index', TrackOnceIndex())
+        return Klaviyo(api_server=server.url, **dict(self.API_SETTINGS, **kwargs))
+
+    @pytest.fixture
+    def cache_path(self, tmpdir):
+        return str(tmpdir.join('track-once.sqlite'))
@@ -0,0 +1,80 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.campaigns import Campaigns
+from klaviyo.exceptions import KlaviyoServerError
+from klaviyo.metrics import Metrics
+from .api_helper import KlaviyoAPIFixture
+
+
+class ExportFixture(KlaviyoAPIFixture):
+    PAGES = {
+        1400000000: {'data': [{'id': 'e1'}, {'id': 'e2'}], 'next': 'c2'},
+        'c2': {'data': [{'id': 'e3'}, {'id': 'e4'}], 'next': 'c3'},
+        'c3': {'data': [{'id': 'e5'}], 'next': None},
+    }
+
+    @property
+    def api(self):
+        return Metrics(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def paths(self, tmpdir):
+        return str(tmpdir.join('events.jsonl')), str(tmpdir.join('events.checkpoint'))
+
+    @pytest.fixture
+    def mock_timeline(self):
+        pages = dict(self.PAGES)
+
+        def get_page(metric_id, since=None, count=None, sort=None):
+            return KlaviyoAPIResponse(200, pages[since])
+
+        with patch.object(Metrics, Metrics.get_metric_timeline_by_id.__name__, side_effect=get_page) as mock_timeline:
+            mock_timeline.pages = pages
+            yield mock_timeline
+
+
+class CampaignExportFixture(KlaviyoAPIFixture):
+    RECIPIENT_PAGES = {
+        'cmp1': {
+            '': {'data': [{'email': 'a@mailinator.com', 'customer_id': 'p1', 'status': 'Sent'},
+                          {'email': 'b@mailinator.com', 'customer_id': 'p2', 'status': 'Sent'}], 'next_offset': 'o2'},
+            'o2': {'data': [{'email': 'c@mailinator.com', 'customer_id': 'p3', 'status': 'Bounced'}], 'next_offset': 'o3'},
+            'o3': {'data': [{'email': 'd@mailinator.com', 'customer_id': 'p4', 'status': 'Sent'}], 'next_offset': None},
+        },
+        'cmp2': {
+            '': {'data': [{'email': 'e@mailinator.com', 'customer_id': 'p5', 'status': 'Sent'}], 'next_offset': None},
+        },
+    }
+    CAMPAIGN_PAGES = {
+        0: {'data': [{'id': 'cmp1', 'status': 'sent'}, {'id': 'draft1', 'status': 'draft'}], 'total': 3},
+        1: {'data': [{'id': 'cmp2', 'status': 'sent'}], 'total': 3},
+    }
+
+    @property
+    def api(self):
+        return Campaigns(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def mock_recipients(self):
+        fetched = []
+        failing = set()
+
+        def get_page(campaign_id, count=None, offset='', sort=None):
+            fetched.append((campaign_id, offset))
+            if offset in failing:
+                raise KlaviyoServerError('Service unavailable')
+            return KlaviyoAPIResponse(200, self.RECIPIENT_PAGES[campaign_id][offset])
+
+        with patch.object(Campaigns, Campaigns.get_campaign_recipients.__name__, side_effect=get_page) as mock_recipients:
+            mock_recipients.fetched = fetched
+            mock_recipients.failing = failing
+            yield mock_recipients
+
+    @pytest.fixture
+    def mock_campaigns(self):
+        def get_page(page=0, count=50):
+            return KlaviyoAPIResponse(200, self.CAMPAIGN_PAGES[page])
+
+        with patch.object(Campaigns, Campaigns.get_campaigns.__name__, side_effect=get_page) as mock_campaigns:
+            yield mock_campaigns
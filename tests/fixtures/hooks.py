@@ -0,0 +1,35 @@
+import pytest
+from klaviyo.hooks import Hooks
+from klaviyo.lists import Lists
+from klaviyo.retry import RetryPolicy
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class HooksFixture(KlaviyoAPIFixture):
+    @pytest.fixture
+    def stub_server(self):
+        with StubServer({
+            ('GET', '/api/v2/list/abc123/members'): (200, {}, [{'email': 'fred@flintstone.com'}]),
+            ('GET', '/api/v2/lists'): (503, {}, '{"message": "unavailable"}'),
+        }) as server:
+            yield server
+
+    @pytest.fixture
+    def hooks(self):
+        return Hooks()
+
+    @pytest.fixture
+    def events(self, hooks):
+        events = []
+        for event in Hooks.EVENTS:
+            hooks.register(event, lambda request_event, event=event: events.append((event, dict(vars(request_event)))))
+        return events
+
+    def lists(self, server, hooks, max_retries=0):
+        return Lists(
+            private_token='pk_flintstones',
+            api_server=server.url,
+            hooks=hooks,
+            retry_policy=RetryPolicy(max_retries=max_retries, backoff_factor=0),
+        )
@@ -0,0 +1,45 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.exceptions import KlaviyoServerError
+from klaviyo.lists import Lists
+from .api_helper import KlaviyoAPIFixture
+
+
+class ListsFixture(KlaviyoAPIFixture):
+    @property
+    def api(self):
+        return Lists(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def mock_list_id(self):
+        return 'abc123'
+
+    @pytest.fixture
+    def mock_profiles(self):
+        return ({'email': 'president{}@mailinator.com'.format(index)} for index in range(250))
+
+    @pytest.fixture
+    def mock_v2_request(self):
+        def echo(path, method, data=None):
+            items = data.get(Lists.PROFILES) or data.get(Lists.EMAILS)
+            if any(item == 'president13@mailinator.com' for item in items):
+                raise KlaviyoServerError(503, self.mock_response(503))
+            return KlaviyoAPIResponse(200, [{'id': index} for index, _ in enumerate(items)])
+
+        with patch.object(Lists, Lists._v2_request.__name__, side_effect=echo) as mock_v2_request:
+            yield mock_v2_request
+
+    @pytest.fixture
+    def mock_get_all_members(self):
+        pages = {
+            None: {'records': [{'id': 'a'}, {'id': 'b'}], 'marker': 2},
+            2: {'records': [{'id': 'c'}, {'id': 'd'}], 'marker': 4},
+            4: {'records': [{'id': 'e'}]},
+        }
+
+        def get_page(group_id, marker=None):
+            return KlaviyoAPIResponse(200, pages[marker])
+
+        with patch.object(Lists, Lists.get_all_members.__name__, side_effect=get_page) as mock_get_all_members:
+            yield mock_get_all_members
@@ -0,0 +1,31 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.metrics import Metrics
+from .api_helper import KlaviyoAPIFixture
+
+
+class MetricsFixture(KlaviyoAPIFixture):
+    @property
+    def api(self):
+        return Metrics(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def mock_metric_export(self):
+        def export(metric_id, start_date=None, end_date=None, unit=None, **kwargs):
+            return KlaviyoAPIResponse(200, {
+                'metric': {'id': metric_id},
+                'start_date': start_date + ' 00:00:00',
+                'end_date': end_date + ' 00:00:00',
+                'unit': unit,
+                'results': [{
+                    'segment': 'Placed Order',
+                    'data': [
+                        {'date': start_date + ' 00:00:00', 'values': [1.0]},
+                        {'date': end_date + ' 00:00:00', 'values': [2.0]},
+                    ],
+                }],
+            })
+
+        with patch.object(Metrics, Metrics.get_metric_export.__name__, side_effect=export) as mock_metric_export:
+            yield mock_metric_export
@@ -0,0 +1,24 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.outbox import Outbox, OutboxTracker
+from klaviyo.public import Public
+from .public import PublicFixture
+
+
+class OutboxFixture(PublicFixture):
+    @pytest.fixture
+    def directory(self, tmpdir):
+        return str(tmpdir.join('outbox'))
+
+    def outbox(self, directory, **kwargs):
+        return Outbox(directory, **dict({'fsync': Outbox.FSYNC_NEVER}, **kwargs))
+
+    def tracker(self, outbox, **kwargs):
+        return OutboxTracker(self.api, outbox, **dict({'retry_delay': 0.01}, **kwargs))
+
+    @pytest.fixture
+    def mock_track_identify_request(self):
+        with patch.object(Public, Public._track_identify_request.__name__) as mock_request:
+            mock_request.return_value = KlaviyoAPIResponse(200, 1)
+            yield mock_request
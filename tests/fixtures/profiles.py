@@ -0,0 +1,24 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.exceptions import KlaviyoAPIException
+from klaviyo.profiles import Profiles
+from .api_helper import KlaviyoAPIFixture
+
+
+class ProfilesFixture(KlaviyoAPIFixture):
+    @property
+    def api(self):
+        return Profiles(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def mock_profile_timeline(self):
+        def timeline(profile_id, since=None, count=None, sort=None):
+            if profile_id == 'missing':
+                raise KlaviyoAPIException(404, self.mock_response(404))
+            if since is None:
+                return KlaviyoAPIResponse(200, {'data': [{'id': profile_id + '-1'}], 'next': 'page-2'})
+            return KlaviyoAPIResponse(200, {'data': [{'id': profile_id + '-2'}], 'next': None})
+
+        with patch.object(Profiles, Profiles.get_profile_metrics_timeline.__name__, side_effect=timeline) as mock_timeline:
+            yield mock_timeline
@@ -15,3 +15,8 @@ class PublicFixture(KlaviyoAPIFixture):
     @pytest.fixture
     def mock_external_id(self):
         return 123
+
+    @pytest.fixture
+    def mock_track_identify_request(self):
+        with patch.object(Public, Public._track_identify_request.__name__) as mock_track_identify_request:
+            yield mock_track_identify_request
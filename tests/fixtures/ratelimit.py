@@ -0,0 +1,25 @@
+from mock import MagicMock
+import pytest
+from klaviyo.api_helper import KlaviyoAPI
+from klaviyo.ratelimit import RateLimiter
+from .api_helper import KlaviyoAPIFixture
+
+
+class RateLimiterFixture(KlaviyoAPIFixture):
+    RATES = {
+        'public': (10.0, 2.0),
+        'v2': (5.0, 1.0),
+        'v2/list': (1.0, 1.0),
+    }
+
+    @pytest.fixture
+    def mock_rate_limiter(self):
+        return MagicMock(spec=RateLimiter)
+
+    @pytest.fixture
+    def rate_limited_api(self, mock_rate_limiter):
+        return KlaviyoAPI(rate_limiter=mock_rate_limiter, **self.API_SETTINGS)
+
+    @pytest.fixture
+    def state_path(self, tmpdir):
+        return str(tmpdir.join('klaviyo-rate-limit'))
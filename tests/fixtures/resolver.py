@@ -0,0 +1,33 @@
+import threading
+
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.exceptions import KlaviyoAPIException
+from klaviyo.profiles import Profiles
+from klaviyo.resolver import ProfileIdResolver
+from .profiles import ProfilesFixture
+
+
+class ResolverFixture(ProfilesFixture):
+    def resolver(self, **kwargs):
+        return ProfileIdResolver(self.api, **kwargs)
+
+    @pytest.fixture
+    def mock_search(self):
+        release = threading.Event()
+        release.set()
+
+        def search(email):
+            release.wait(5)
+            if email.startswith('nobody'):
+                raise KlaviyoAPIException(404, self.mock_response(404))
+            return KlaviyoAPIResponse(200, {'id': 'id-' + email.split('@')[0]})
+
+        with patch.object(Profiles, Profiles.get_profile_id_by_email.__name__, side_effect=search) as mock_search:
+            mock_search.release = release
+            yield mock_search
+
+    @pytest.fixture
+    def cache_path(self, tmpdir):
+        return str(tmpdir.join('profile-ids.sqlite'))
@@ -0,0 +1,38 @@
+from mock import patch
+import pytest
+import requests
+from klaviyo.api_helper import KlaviyoAPI
+from klaviyo.retry import RetryBudget, RetryPolicy
+from .api_helper import KlaviyoAPIFixture
+
+
+class RetryPolicyFixture(KlaviyoAPIFixture):
+    def retrying_api(self, **kwargs):
+        return KlaviyoAPI(retry_policy=RetryPolicy(backoff_factor=0, **kwargs), **self.API_SETTINGS)
+
+    @pytest.fixture
+    def mock_sleep(self):
+        with patch('klaviyo.api_helper.time.sleep') as mock_sleep:
+            yield mock_sleep
+
+    @pytest.fixture
+    def mock_session_request(self):
+        with patch.object(requests.Session, requests.Session.request.__name__) as mock_session_request:
+            yield mock_session_request
+
+    @pytest.fixture
+    def mock_rate_limited_then_ok(self, mock_session_request):
+        mock_session_request.side_effect = [
+            self.mock_response(429, headers={'Retry-After': '2'}),
+            self.mock_response(200, json={'data': []}),
+        ]
+        return mock_session_request
+
+    @pytest.fixture
+    def mock_always_unavailable(self, mock_session_request):
+        mock_session_request.return_value = self.mock_response(503, headers={})
+        return mock_session_request
+
+    @pytest.fixture
+    def empty_budget(self):
+        return RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
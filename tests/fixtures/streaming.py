@@ -0,0 +1,35 @@
+import json
+
+import pytest
+from klaviyo.campaigns import Campaigns
+from klaviyo.lists import Lists
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class StreamingFixture(KlaviyoAPIFixture):
+    RECIPIENTS = [
+        {'email': 'president{}@mailinator.com'.format(index), 'customer_id': 'abc{}'.format(index), 'status': 'Sent'}
+        for index in range(500)
+    ]
+    RECIPIENTS_PAGE = {'count': 500, 'data': RECIPIENTS, 'next_offset': 'xyz789', 'campaign_id': 'cmp123'}
+    MEMBERS_PAGE = {'records': [{'id': 'abc123', 'email': 'thomas.jefferson@mailinator.com'}], 'marker': 42}
+
+    @pytest.fixture
+    def stub_server(self):
+        with StubServer({
+            ('GET', '/api/v1/campaign/cmp123/recipients'): (200, {}, self.RECIPIENTS_PAGE),
+            ('GET', '/api/v2/group/abc123/members/all'): (200, {}, self.MEMBERS_PAGE),
+            ('GET', '/api/v2/group/missing/members/all'): (404, {}, {'detail': 'List not found'}),
+        }) as server:
+            yield server
+
+    def campaigns(self, server):
+        return Campaigns(private_token='pk_flintstones', api_server=server.url)
+
+    def lists(self, server):
+        return Lists(private_token='pk_flintstones', api_server=server.url)
+
+    @staticmethod
+    def encode(document):
+        return json.dumps(document, indent=1).encode('utf-8')
@@ -0,0 +1,91 @@
+import json
+import threading
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class StubRequest(object):
+    def __init__(self, method, path, headers, body, client_port):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.client_port = client_port
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """Local HTTP server answering requests from a route table, recording everything it receives.
+
+    Routes map (METHOD, path without query string) to (status, headers, body) or to a callable
+    taking the StubRequest and returning that tuple. Unknown routes answer 200 with an empty json object.
+    """
+    daemon_threads = True
+
+    def __init__(self, routes=None):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.routes = routes or {}
+        self.requests = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/api'.format(self.server_address[1])
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, request):
+        with self._lock:
+            self.requests.append(request)
+
+    def respond(self, request):
+        route = self.routes.get((request.method, request.path.split('?', 1)[0]))
+        if route is None:
+            return 200, {}, '{}'
+        if callable(route):
+            return route(request)
+        return route
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = -1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        request = StubRequest(self.command, self.path, dict(self.headers), body, self.client_address[1])
+        self.server.record(request)
+
+        status, headers, payload = self.server.respond(request)
+        if not isinstance(payload, (bytes, str)):
+            payload = json.dumps(payload)
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+
+        self.send_response(status)
+        headers = dict(headers)
+        headers.setdefault('Content-Type', 'application/json')
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
@@ -0,0 +1,48 @@
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.lists import Lists
+from .api_helper import KlaviyoAPIFixture
+
+
+class ListMembershipSyncFixture(KlaviyoAPIFixture):
+    @property
+    def api(self):
+        return Lists(**self.API_SETTINGS)
+
+    @pytest.fixture
+    def snapshot_path(self, tmpdir):
+        return str(tmpdir.join('members.sqlite'))
+
+    @pytest.fixture
+    def remote(self):
+        """Fake list whose members are paged two at a time, recording every add and remove sent."""
+        members = {}
+        calls = []
+
+        def get_all_members(group_id, marker=None):
+            records = sorted(members.values(), key=lambda member: member['id'])
+            start = marker or 0
+            next_marker = start + 2 if start + 2 < len(records) else None
+            return KlaviyoAPIResponse(200, {'records': records[start:start + 2], 'marker': next_marker})
+
+        def add_members_to_list(list_id, profiles):
+            calls.append(('add', [profile['email'] for profile in profiles]))
+            added = []
+            for profile in profiles:
+                member = {'id': 'p_{}'.format(profile['email'].split('@')[0]), 'email': profile['email']}
+                members[member['id']] = member
+                added.append(member)
+            return KlaviyoAPIResponse(200, added)
+
+        def remove_members_from_list(list_id, emails):
+            calls.append(('remove', list(emails)))
+            for member_id, member in list(members.items()):
+                if member['email'] in emails:
+                    del members[member_id]
+            return KlaviyoAPIResponse(200, '')
+
+        with patch.object(Lists, Lists.get_all_members.__name__, side_effect=get_all_members), \
+                patch.object(Lists, Lists.add_members_to_list.__name__, side_effect=add_members_to_list), \
+                patch.object(Lists, Lists.remove_members_from_list.__name__, side_effect=remove_members_from_list):
+            yield members, calls
@@ -0,0 +1,52 @@
+import json
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+import pytest
+from klaviyo.lists import Lists
+from klaviyo.retry import RetryPolicy
+from klaviyo.tracing import Tracer
+from .api_helper import KlaviyoAPIFixture
+from .stub_server import StubServer
+
+
+class TracingFixture(KlaviyoAPIFixture):
+    @pytest.fixture
+    def stub_server(self):
+        def get_all_members(request):
+            if json.loads(request.body).get('marker'):
+                return 200, {}, {'records': [{'id': 'barney'}]}
+            return 200, {}, {'records': [{'id': 'fred'}], 'marker': 2}
+
+        with StubServer({
+            ('GET', '/api/v2/list/abc123/members'): (200, {}, [{'email': 'fred@flintstone.com'}]),
+            ('GET', '/api/v2/lists'): (503, {}, '{"message": "unavailable"}'),
+            ('GET', '/api/v2/group/abc123/members/all'): get_all_members,
+        }) as server:
+            yield server
+
+    @pytest.fixture
+    def exporter(self):
+        return InMemorySpanExporter()
+
+    @pytest.fixture
+    def tracer(self, exporter):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        return Tracer(tracer_provider=provider)
+
+    def lists(self, server, tracer, max_retries=0):
+        return Lists(
+            private_token='pk_flintstones',
+            api_server=server.url,
+            tracer=tracer,
+            retry_policy=RetryPolicy(max_retries=max_retries, backoff_factor=0),
+        )
+
+    @staticmethod
+    def spans_by_name(exporter):
+        spans = {}
+        for span in exporter.get_finished_spans():
+            spans.setdefault(span.name, []).append(span)
+        return spans
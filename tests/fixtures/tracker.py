@@ -0,0 +1,30 @@
+import threading
+
+from mock import patch
+import pytest
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.public import Public
+from klaviyo.tracker import EventTracker
+from .public import PublicFixture
+
+
+class EventTrackerFixture(PublicFixture):
+    def tracker(self, **kwargs):
+        return EventTracker(self.api, **kwargs)
+
+    @pytest.fixture
+    def mock_track_identify_request(self):
+        with patch.object(Public, Public._track_identify_request.__name__) as mock_request:
+            mock_request.return_value = KlaviyoAPIResponse(200, 1)
+            yield mock_request
+
+    @pytest.fixture
+    def mock_blocked_request(self):
+        release = threading.Event()
+
+        def blocked(*args, **kwargs):
+            release.wait(5)
+            return KlaviyoAPIResponse(200, 1)
+
+        with patch.object(Public, Public._track_identify_request.__name__, side_effect=blocked):
+            yield release
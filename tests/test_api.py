@@ -0,0 +1,13 @@
+from .fixtures.api import KlaviyoFixture
+
+
+class TestKlaviyo(KlaviyoFixture):
+    def test_resources_share_session(self):
+        client = self.client
+        assert client.Lists.resource_class.session is client.session
+        assert client.Public.resource_class.session is client.session
+
+    def test_close_releases_session(self):
+        with self.client as client:
+            client.session.session
+        assert client.session._session is None
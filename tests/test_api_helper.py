@@ -46,6 +46,19 @@ class TestKlaviyoAPI(KlaviyoAPIFixture):
         self.api._request(mock_get_method, mock_url)
         mock_requests_package.assert_called_once()
 
+    def test_request_reuses_pooled_session(self, mock_get_method, mock_url, mock_requests_package, mock_handle_response):
+        api = self.api
+        api._request(mock_get_method, mock_url)
+        session = api.session.session
+        api._request(mock_get_method, mock_url)
+        assert api.session.session is session
+        assert mock_requests_package.call_count == 2
+
+    def test_close_releases_owned_session(self, mock_get_method, mock_url, mock_requests_package, mock_handle_response):
+        with self.api as api:
+            api._request(mock_get_method, mock_url)
+        assert api.session._session is None
+
     def test_handle_response_with_auth_error(self, mock_response_auth_error, mock_request_type_private):
         with pytest.raises(KlaviyoAuthenticationError):
             self.api._handle_response(mock_response_auth_error)
@@ -53,3 +66,18 @@ class TestKlaviyoAPI(KlaviyoAPIFixture):
     def test_handle_response_with_rate_limit_error(self, mock_response_rate_limit_error, mock_request_type_private):
         with pytest.raises(KlaviyoRateLimitException):
             self.api._handle_response(mock_response_rate_limit_error)
+
+    def test_requests_never_mutate_inputs(self, mock_lists_path, mock_get_method, mock_params, mock_request):
+        original = dict(mock_params)
+        self.api._v1_request(mock_lists_path, mock_get_method, mock_params)
+        self.api._v2_request(mock_lists_path, mock_get_method, mock_params)
+        assert mock_params == original
+        assert self.api.API_KEY in mock_request.call_args_list[0][0][2]
+
+    def test_request_headers_are_prebuilt(self, mock_get_method, mock_url, mock_requests_package, mock_handle_response):
+        api = self.api
+        api._request(mock_get_method, mock_url)
+        api._request(mock_get_method, mock_url)
+        first, second = [call[1]['headers'] for call in mock_requests_package.call_args_list]
+        assert first is second == api.BASE_HEADERS
+        assert api._get_request_headers(api.POST_HEADERS) is api._get_request_headers(api.POST_HEADERS)
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from .fixtures.async_api import AsyncKlaviyoFixture
+from klaviyo.exceptions import KlaviyoAPIException, KlaviyoRateLimitException
+
+
+class TestAsyncKlaviyo(AsyncKlaviyoFixture):
+    def test_get_lists(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                return await client.Lists.get_lists()
+
+        response = self.run(run())
+        assert response.status_code == 200
+        assert response.data[0]['list_id'] == 'abc123'
+        assert b'pk_flintstones' in stub_server.requests[0].body
+
+    def test_track(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                return await client.Public.track('Elected President', email='thomas.jefferson@mailinator.com')
+
+        assert self.run(run()).data == 1
+
+    def test_track_once_drops_duplicates(self, stub_server):
+        from klaviyo.dedup import TrackOnceIndex
+
+        async def run():
+            async with self.client(stub_server, track_once_index=TrackOnceIndex()) as client:
+                return [await client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com') for _ in range(3)]
+
+        responses = self.run(run())
+        assert [response.duplicate for response in responses] == [False, True, True]
+        assert len(stub_server.requests) == 1
+
+    def test_error_mapping(self, stub_server):
+        async def run(coroutine_factory):
+            async with self.client(stub_server) as client:
+                return await coroutine_factory(client)
+
+        with pytest.raises(KlaviyoRateLimitException):
+            self.run(run(lambda client: client.Metrics.get_metrics()))
+        with pytest.raises(KlaviyoAPIException) as exc_info:
+            self.run(run(lambda client: client.Lists.get_list_by_id('missing')))
+        assert exc_info.value.status_code == 404
+
+    def test_concurrent_requests_share_bounded_pool(self, stub_server):
+        async def run():
+            async with self.client(stub_server, limit=4) as client:
+                return await asyncio.gather(*[client.Lists.get_lists() for _ in range(200)])
+
+        responses = self.run(run())
+        assert len(responses) == 200
+        assert len(set(request.client_port for request in stub_server.requests)) <= 4
+
+    def test_paginators(self, stub_server):
+        async def run(prefetch):
+            async with self.client(stub_server) as client:
+                members = [member async for member in client.Lists.iter_all_members('abc123', prefetch=prefetch)]
+                exclusions = client.Lists.iter_list_exclusions('abc123', marker=2, prefetch=prefetch)
+                pages = [page async for page in exclusions.iter_pages()]
+                recipients = [recipient async for recipient in client.Campaigns.iter_campaign_recipients('ghi789', prefetch=prefetch)]
+                return members, pages, exclusions.pages, recipients
+
+        for prefetch in (False, True):
+            members, pages, page_count, recipients = self.run(run(prefetch))
+            assert members == self.MEMBERS
+            assert pages == [self.MEMBERS[2:4], self.MEMBERS[4:]] and page_count == 2
+            assert [recipient['email'] for recipient in recipients] == ['thomas.jefferson@mailinator.com', 'john.adams@mailinator.com']
+
+    def test_paginator_closed_early_cancels_prefetch(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                pages = client.Lists.iter_all_members('abc123', prefetch=True).iter_pages()
+                first_page = await pages.__anext__()
+                await pages.aclose()
+                await asyncio.sleep(0.05)
+                all_tasks = getattr(asyncio, 'all_tasks', None) or asyncio.Task.all_tasks
+                return first_page, [task for task in all_tasks() if not task.done()]
+
+        first_page, running = self.run(run())
+        assert first_page == self.MEMBERS[:2]
+        # only run() itself is left, the prefetch of the second page was cancelled
+        assert len(running) == 1
+
+    def test_iter_campaigns(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                return [campaign['id'] async for campaign in client.Campaigns.iter_campaigns(count=1)]
+
+        assert self.run(run()) == ['campaign-0', 'campaign-1', 'campaign-2']
+
+    def test_bulk_methods(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                profiles = ({'email': member['email']} for member in self.MEMBERS)
+                added = await client.Lists.add_members_to_list_bulk('abc123', profiles, chunk_size=2, max_workers=2)
+                subscribed = await client.Lists.add_subscribers_to_list_bulk('abc123', [{'email': 'a@mailinator.com'}])
+                checked = await client.Lists.get_members_from_list_bulk('abc123', ['a@mailinator.com'] * 3, chunk_size=2)
+                removed = await client.Lists.remove_members_from_list_bulk('missing', ['a@mailinator.com'])
+                unsubscribed = await client.Lists.delete_subscribers_from_list_bulk('abc123', ['a@mailinator.com'])
+                return added, subscribed, checked, removed, unsubscribed
+
+        added, subscribed, checked, removed, unsubscribed = self.run(run())
+        assert added.succeeded and len(added.results) == 3
+        assert [member['id'] for member in added.data] == ['id-' + member['email'] for member in self.MEMBERS]
+        assert subscribed.data == [{'id': 'id-a@mailinator.com'}]
+        assert len(checked.results) == 2
+        assert unsubscribed.succeeded
+        # no route for the list, the stub answers 200 with an empty body
+        assert removed.succeeded
+
+    def test_get_metric_export_sharded(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                return await client.Metrics.get_metric_export_sharded('def456', '2020-01-01', '2020-01-10', shard_size=5)
+
+        series = self.run(run()).data['results'][0]['data']
+        assert [point['date'][:10] for point in series] == ['2020-01-01', '2020-01-05', '2020-01-06', '2020-01-10']
+        assert len(stub_server.requests) == 2
+
+    def test_iter_profile_timelines(self, stub_server):
+        async def run():
+            async with self.client(stub_server) as client:
+                timelines = client.Profiles.iter_profile_timelines(['thomas', 'john', 'missing'], max_workers=2, requests_per_second=1000)
+                return sorted([(profile_id, event['id']) async for profile_id, event in timelines]), timelines.errors
+
+        events, errors = self.run(run())
+        assert events == [
+            ('john', 'john-1'), ('john', 'john-2'), ('thomas', 'thomas-1'), ('thomas', 'thomas-2'),
+        ]
+        assert list(errors) == ['missing'] and errors['missing'].status_code == 404
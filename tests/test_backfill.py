@@ -0,0 +1,119 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from .fixtures.backfill import BackfillFixture
+from klaviyo import backfill
+from klaviyo.backfill import ERROR_KEY, LINE_KEY, RAW_KEY, TrackBackfill, read_events
+from klaviyo.public import Public
+
+
+class TestTrackBackfill(BackfillFixture):
+    def backfill(self, server, dead_letter_path, **kwargs):
+        return TrackBackfill('pk_flintstones', dead_letter_path, api_server=server.url, processes=2, threads=2, chunk_size=3, **kwargs)
+
+    def test_backfills_jsonl_with_dead_letters(self, stub_server, paths):
+        input_path, dead_letter_path = paths
+        with open(input_path, 'w') as input_file:
+            for event in self.EVENTS + [{'event': 'Placed Order', 'properties': {'value': 1}}]:
+                input_file.write(json.dumps(event) + '\n')
+
+        updates = []
+        progress = self.backfill(stub_server, dead_letter_path, on_progress=lambda progress: updates.append(progress.read)).run(input_path)
+
+        assert (progress.read, progress.sent, progress.rejected) == (21, 19, 2)
+        assert progress.throughput > 0
+        assert len(updates) == 7
+        sent = self.sent_events(stub_server)
+        assert sorted(event['time'] for event in sent) == [1400000000 + index for index in range(20)]
+        assert sent[0]['token'] == 'pk_flintstones'
+
+        dead_letters = [json.loads(line) for line in open(dead_letter_path)]
+        assert sorted(event[LINE_KEY] for event in dead_letters) == [1, 21]
+        assert all(event[ERROR_KEY] for event in dead_letters)
+
+    def test_dead_letters_can_be_backfilled_again(self, stub_server, paths):
+        input_path, dead_letter_path = paths
+        with open(input_path, 'w') as input_file:
+            input_file.write(json.dumps({'event': 'Placed Order', 'properties': {'value': 1}}) + '\n')
+        self.backfill(stub_server, dead_letter_path).run(input_path)
+
+        events = [event for _, event in read_events(dead_letter_path)]
+        assert events[0]['event'] == 'Placed Order'
+
+    def test_backfills_csv_under_rate_budget(self, stub_server, tmpdir):
+        input_path = str(tmpdir.join('events.csv'))
+        with open(input_path, 'w') as input_file:
+            writer = csv.DictWriter(input_file, ['event', 'email', 'timestamp', 'properties'])
+            writer.writeheader()
+            for event in self.EVENTS[1:6]:
+                writer.writerow(dict(event, properties=json.dumps(event['properties'])))
+
+        progress = self.backfill(stub_server, str(tmpdir.join('dead.jsonl')), requests_per_second=1000).run(input_path)
+
+        assert (progress.sent, progress.rejected) == (5, 0)
+        sent = self.sent_events(stub_server)
+        assert sorted(event['properties']['value'] for event in sent) == [1, 2, 3, 4, 5]
+        assert sorted(event['time'] for event in sent) == [1400000001, 1400000002, 1400000003, 1400000004, 1400000005]
+
+    def test_workers_are_closed(self, stub_server, tmpdir):
+        rates = {Public.PUBLIC: (1000, 1000)}
+        worker_args = ('pk_flintstones', stub_server.url, 2, str(tmpdir.join('rate_limiter')), rates)
+        assert backfill._send_chunk(worker_args, [(1, self.EVENTS[1])]) == (1, [])
+        worker = backfill._worker
+
+        backfill._close_worker()
+        assert backfill._worker is None
+        assert worker.rate_limiter._map is None
+        with pytest.raises(RuntimeError):
+            worker.executor.submit(len, [])
+
+    def test_undecodable_lines_are_dead_lettered(self, stub_server, paths):
+        input_path, dead_letter_path = paths
+        with open(input_path, 'w') as input_file:
+            input_file.write(json.dumps(self.EVENTS[1]) + '\n')
+            input_file.write('{"event": "Placed Order", \n')
+            input_file.write('[1, 2]\n')
+            input_file.write(json.dumps(self.EVENTS[2]) + '\n')
+
+        progress = self.backfill(stub_server, dead_letter_path).run(input_path)
+
+        assert (progress.read, progress.sent, progress.rejected) == (4, 2, 2)
+        dead_letters = [json.loads(line) for line in open(dead_letter_path)]
+        assert [(event[LINE_KEY], event[RAW_KEY]) for event in dead_letters] == [(2, '{"event": "Placed Order", '), (3, '[1, 2]')]
+        assert all(event[ERROR_KEY] for event in dead_letters)
+
+    def test_undecodable_csv_rows_are_dead_lettered(self, stub_server, tmpdir):
+        input_path = str(tmpdir.join('events.csv'))
+        dead_letter_path = str(tmpdir.join('dead.jsonl'))
+        with open(input_path, 'w') as input_file:
+            input_file.write('event,email,timestamp,properties\n')
+            input_file.write('Placed Order,john.adams@mailinator.com,yesterday,\n')
+            input_file.write('Placed Order,john.adams@mailinator.com,1400000000,{not json\n')
+            input_file.write('Placed Order,john.adams@mailinator.com,1400000000,"{""value"": 1}"\n')
+
+        progress = self.backfill(stub_server, dead_letter_path).run(input_path)
+
+        assert (progress.read, progress.sent, progress.rejected) == (3, 1, 2)
+        dead_letters = [json.loads(line) for line in open(dead_letter_path)]
+        assert [event[LINE_KEY] for event in dead_letters] == [2, 3]
+        assert dead_letters[1][RAW_KEY]['properties'] == '{not json'
+
+
+class TestReadEvents(BackfillFixture):
+    def test_decode_errors_raise_without_handler(self, paths):
+        input_path, _ = paths
+        with open(input_path, 'w') as input_file:
+            input_file.write('not json\n')
+
+        with pytest.raises(ValueError):
+            list(read_events(input_path))
+
+    def test_reads_gzip(self, tmpdir):
+        input_path = str(tmpdir.join('events.jsonl.gz'))
+        with gzip.open(input_path, 'wt') as input_file:
+            input_file.write(json.dumps(self.EVENTS[0]) + '\n\n' + json.dumps(self.EVENTS[1]) + '\n')
+
+        assert list(read_events(input_path)) == [(1, self.EVENTS[0]), (3, self.EVENTS[1])]
@@ -0,0 +1,79 @@
+from .fixtures.cache import ResponseCacheFixture
+from klaviyo.cache import LRUCache, MISSING
+
+
+class TestLRUCache(object):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is MISSING
+        assert cache.get('a') == 1 and cache.get('c') == 3
+
+    def test_expires_entries(self):
+        cache = LRUCache()
+        cache.set('a', None, ttl=-1)
+        assert cache.get('a') is MISSING
+
+
+class TestResponseCache(ResponseCacheFixture):
+    def test_get_is_cached(self, response_cache, mock_session_request):
+        lists = self.lists(response_cache)
+        first = lists.get_list_by_id('abc123')
+        first.data['id'] = 'mutated'
+        assert lists.get_list_by_id('abc123').data == {'id': 'abc123'}
+        assert mock_session_request.call_count == 1
+
+    def test_key_excludes_api_key(self, response_cache, mock_session_request):
+        self.lists(response_cache).get_lists()
+        self.lists(response_cache, private_token='pk_rubbles').get_lists()
+        assert mock_session_request.call_count == 1
+
+    def test_uncached_endpoints_always_hit_network(self, response_cache, mock_session_request):
+        lists = self.lists(response_cache)
+        lists.get_all_members('abc123')
+        lists.get_all_members('abc123')
+        assert mock_session_request.call_count == 2
+
+    def test_list_mutations_invalidate(self, response_cache, mock_session_request):
+        lists = self.lists(response_cache)
+        lists.get_lists()
+        lists.get_list_by_id('abc123')
+        lists.update_list_name_by_id('abc123', 'Presidents')
+        lists.get_lists()
+        lists.get_list_by_id('abc123')
+        assert mock_session_request.call_count == 5
+
+        lists.delete_list('abc123')
+        lists.get_list_by_id('abc123')
+        assert mock_session_request.call_count == 7
+
+    def test_profile_mutations_invalidate(self, response_cache, mock_session_request):
+        profiles = self.profiles(response_cache)
+        profiles.get_profile('xyz')
+        profiles.get_profile('other')
+        profiles.unset_profile_properties('xyz', ['Plan'])
+        profiles.get_profile('xyz')
+        profiles.get_profile('other')
+        assert mock_session_request.call_count == 4
+
+    def test_stale_response_is_revalidated(self, etag_server):
+        lists = self.stale_lists(etag_server)
+        first = lists.get_lists()
+        second = lists.get_lists()
+
+        assert second.data == first.data == [{'list_id': 'abc123'}]
+        assert second.not_modified
+        assert 'If-None-Match' not in etag_server.requests[0].headers
+        assert etag_server.requests[1].headers['If-None-Match'] == '"v1"'
+
+        stats = lists.response_cache.stats
+        assert (stats.misses, stats.revalidations, stats.not_modified) == (1, 1, 1)
+
+    def test_fresh_response_counts_hit(self, response_cache, mock_session_request):
+        lists = self.lists(response_cache)
+        lists.get_lists()
+        lists.get_lists()
+        assert (response_cache.stats.hits, response_cache.stats.misses) == (1, 1)
@@ -0,0 +1,70 @@
+import pytest
+from .fixtures.api_helper import KlaviyoAPIFixture
+from .fixtures.stub_server import StubServer
+from klaviyo.cache import ResponseCache, SQLiteCache
+from klaviyo.codec import JSONCodec, OrjsonCodec, RawCodec, get_default_codec, orjson
+from klaviyo.dedup import TrackOnceIndex
+from klaviyo.lists import Lists
+from klaviyo.public import Public
+from klaviyo.tracker import EventTracker
+
+requires_orjson = pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+
+
+class TestCodec(KlaviyoAPIFixture):
+    RECORD = {'id': 'abc123', 'properties': {'plan': 'premium', 'orders': [1, 2.5, None]}}
+
+    @pytest.mark.parametrize('codec', [JSONCodec(), get_default_codec()])
+    def test_round_trip(self, codec):
+        assert codec.decode(codec.encode(self.RECORD)) == self.RECORD
+        assert codec.decode(codec.dumps(self.RECORD)) == self.RECORD
+
+    @requires_orjson
+    def test_orjson_falls_back_on_unsupported_types(self):
+        assert JSONCodec().decode(OrjsonCodec().encode({'total': 2 ** 70})) == {'total': 2 ** 70}
+
+    def test_codec_decodes_responses(self):
+        with StubServer({('GET', '/api/v2/lists'): (200, {}, [{'list_id': 'abc123'}])}) as server:
+            lists = Lists(private_token='pk_flintstones', api_server=server.url, codec=JSONCodec())
+            assert lists.get_lists().data == [{'list_id': 'abc123'}]
+
+    def test_raw_codec_skips_decoding(self):
+        with StubServer({('GET', '/api/v2/lists'): (200, {}, b'[{"list_id": "abc123"}]')}) as server:
+            lists = Lists(private_token='pk_flintstones', api_server=server.url, codec=RawCodec())
+            assert lists.get_lists().data == b'[{"list_id": "abc123"}]'
+            assert JSONCodec().decode(server.requests[0].body) == {'api_key': 'pk_flintstones'}
+
+    @pytest.mark.parametrize('body,data', [(b'1', '1'), (b'0', '0')])
+    def test_raw_codec_public_responses_are_text(self, body, data):
+        with StubServer({('GET', '/api/track'): (200, {}, body)}) as server:
+            public = Public(public_token='flintstones', api_server=server.url, codec=RawCodec())
+            assert public.track('Bowling', email='fred@flintstones.com').data == data
+
+    def test_raw_codec_track_once(self):
+        with StubServer({('GET', '/api/track'): (200, {}, b'1')}) as server:
+            public = Public(
+                public_token='flintstones', api_server=server.url, codec=RawCodec(),
+                track_once_index=TrackOnceIndex()
+            )
+            assert not public.track_once('Bowling', email='fred@flintstones.com').duplicate
+            assert public.track_once('Bowling', email='fred@flintstones.com').duplicate
+            assert len(server.requests) == 1
+
+    def test_raw_codec_tracker_failures(self):
+        failures = []
+        with StubServer({('POST', '/api/track'): (200, {}, b'0')}) as server:
+            public = Public(public_token='flintstones', api_server=server.url, codec=RawCodec())
+            tracker = EventTracker(public, on_failure=lambda event, exception: failures.append(event))
+            tracker.track('Bowling', email='fred@flintstones.com')
+            tracker.close(timeout=5)
+        assert len(failures) == 1
+
+    def test_raw_codec_responses_are_cached(self, tmpdir):
+        with StubServer({('GET', '/api/v2/lists'): (200, {}, b'[{"list_id": "abc123"}]')}) as server:
+            lists = Lists(
+                private_token='pk_flintstones', api_server=server.url, codec=RawCodec(),
+                response_cache=ResponseCache(SQLiteCache(str(tmpdir.join('cache.sqlite'))))
+            )
+            assert lists.get_lists().data == b'[{"list_id": "abc123"}]'
+            assert lists.get_lists().data == b'[{"list_id": "abc123"}]'
+            assert len(server.requests) == 1
@@ -0,0 +1,68 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+from .fixtures.compression import CompressionFixture
+from klaviyo.compression import Compression
+
+
+class TestCompression(CompressionFixture):
+    def test_large_bodies_are_gzipped(self, stub_server, compression):
+        self.lists(stub_server, compression).add_members_to_list('abc123', self.PROFILES)
+
+        request = stub_server.requests[0]
+        assert request.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(request.body))['profiles'] == self.PROFILES
+        assert compression.stats.compressed_requests == 1
+        assert compression.stats.request_wire_bytes == len(request.body)
+        assert compression.stats.request_ratio < 0.5
+
+    def test_small_bodies_are_sent_as_is(self, stub_server, compression):
+        self.lists(stub_server, compression).add_members_to_list('abc123', self.PROFILES[:1])
+
+        request = stub_server.requests[0]
+        assert 'Content-Encoding' not in request.headers
+        assert json.loads(request.body)['profiles'] == self.PROFILES[:1]
+        assert compression.stats.compressed_requests == 0
+        assert compression.stats.request_ratio == 1.0
+
+    def test_unsupported_endpoints_are_sent_as_is(self, stub_server, compression):
+        self.public(stub_server, compression).identify(
+            email='thomas.jefferson@mailinator.com',
+            properties=dict(('property{}'.format(index), 'value') for index in range(100)),
+            method='post',
+        )
+
+        assert 'Content-Encoding' not in stub_server.requests[0].headers
+        assert compression.stats.compressed_requests == 0
+
+    def test_compressed_responses_are_decoded_and_counted(self, stub_server, compression):
+        response = self.lists(stub_server, compression).get_members_from_list('abc123', ['fred@flintstone.com'])
+
+        assert response.data == self.MEMBERS
+        assert stub_server.requests[0].headers['Accept-Encoding'] == compression.accept_encoding
+        assert 'Content-Encoding' not in stub_server.requests[0].headers
+        assert compression.stats.response_bytes == len(json.dumps(self.MEMBERS))
+        assert compression.stats.response_wire_bytes < compression.stats.response_bytes
+
+    def test_brotli_only_accepted_when_asked(self):
+        assert Compression(accept_brotli=False).accept_encoding == 'gzip, deflate'
+
+    def test_async_large_bodies_are_gzipped(self, stub_server, compression):
+        pytest.importorskip('aiohttp')
+        from klaviyo.async_api import AsyncKlaviyo
+
+        async def run():
+            async with AsyncKlaviyo(private_token='pk_flintstones', api_server=stub_server.url, compression=compression) as client:
+                await client.Lists.add_members_to_list('abc123', self.PROFILES)
+                return await client.Lists.get_members_from_list('abc123', ['fred@flintstone.com'])
+
+        loop = asyncio.new_event_loop()
+        try:
+            response = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert json.loads(gzip.decompress(stub_server.requests[0].body))['profiles'] == self.PROFILES
+        assert response.data == self.MEMBERS
+        assert compression.stats.response_wire_bytes < compression.stats.response_bytes
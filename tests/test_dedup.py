@@ -0,0 +1,68 @@
+from .fixtures.dedup import DedupFixture
+from klaviyo.cache import SQLiteCache
+from klaviyo.dedup import TrackOnceIndex
+
+
+class TestTrackOnceIndex(DedupFixture):
+    def test_duplicates_are_dropped_without_request(self, stub_server):
+        client = self.client(stub_server)
+        assert client.Public.track_once('Signed Up', email='Thomas.Jefferson@mailinator.com').data == 1
+        response = client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com ', properties={'plan': 'pro'})
+
+        assert response.data == 1 and response.duplicate
+        assert len(stub_server.requests) == 1
+        stats = client.track_once_index.stats
+        assert (stats.hits, stats.misses, stats.hit_ratio) == (1, 1, 0.5)
+
+    def test_keys_are_scoped_by_event_and_profile(self, stub_server):
+        client = self.client(stub_server)
+        client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com')
+        client.Public.track_once('Signed Up', email='john.adams@mailinator.com')
+        client.Public.track_once('Upgraded', email='thomas.jefferson@mailinator.com')
+        client.Public.track_once('Upgraded', external_id=123)
+
+        assert len(stub_server.requests) == 4
+        assert client.track_once_index.stats.hits == 0
+
+    def test_idempotency_key(self, stub_server):
+        client = self.client(stub_server)
+        client.Public.track_once('Placed Order', email='thomas.jefferson@mailinator.com', idempotency_key='order-1')
+        client.Public.track_once('Placed Order', email='thomas.jefferson@mailinator.com', idempotency_key='order-2')
+        assert client.Public.track_once('Placed Order', email='thomas.jefferson@mailinator.com', idempotency_key='order-1').duplicate
+        assert len(stub_server.requests) == 2
+
+    def test_rejected_events_are_sent_again(self, stub_server):
+        client = self.client(stub_server)
+        assert client.Public.track_once('Signed Up', email='rejected@mailinator.com').data == 0
+        assert client.Public.track_once('Signed Up', email='rejected@mailinator.com').data == 0
+        assert len(stub_server.requests) == 2
+        assert client.track_once_index.stats.misses == 2
+
+    def test_expired_keys_are_sent_again(self, stub_server):
+        client = self.client(stub_server, track_once_index=TrackOnceIndex(ttl=0))
+        client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com')
+        client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com')
+        assert len(stub_server.requests) == 2
+
+    def test_without_index_every_call_is_sent(self, stub_server):
+        client = self.client(stub_server, track_once_index=None)
+        client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com')
+        client.Public.track_once('Signed Up', email='thomas.jefferson@mailinator.com')
+        assert len(stub_server.requests) == 2
+
+    def test_persistent_cache_survives_restart(self, stub_server, cache_path):
+        with SQLiteCache(cache_path) as cache:
+            self.client(stub_server, track_once_index=TrackOnceIndex(persistent_cache=cache)).Public.track_once(
+                'Signed Up', email='thomas.jefferson@mailinator.com'
+            )
+        with SQLiteCache(cache_path) as cache:
+            index = TrackOnceIndex(persistent_cache=cache)
+            assert self.client(stub_server, track_once_index=index).Public.track_once(
+                'Signed Up', email='thomas.jefferson@mailinator.com'
+            ).duplicate
+            assert (index.stats.hits, index.stats.persistent_hits) == (1, 1)
+
+            key = index.get_key(self.API_SETTINGS['public_token'], 'Signed Up', 'thomas.jefferson@mailinator.com')
+            index.discard(key)
+            assert not index.seen(key)
+        assert len(stub_server.requests) == 1
@@ -0,0 +1,106 @@
+import gzip
+import json
+import os
+
+from .fixtures.export import CampaignExportFixture, ExportFixture
+from klaviyo.export import CampaignRecipientExporter, MetricTimelineExporter
+from klaviyo.sinks import CallbackSink, CSVSink, GzipJSONLSink, JSONLSink
+
+
+class TestMetricTimelineExporter(ExportFixture):
+    def exporter(self, sink, checkpoint_path):
+        return MetricTimelineExporter(self.api, sink, checkpoint_path, metric_id='abc', since=1400000000)
+
+    def read_ids(self, path, opener=open):
+        with opener(path, 'rb') as output:
+            return [json.loads(line)['id'] for line in output.read().splitlines()]
+
+    def test_exports_every_page(self, paths, mock_timeline):
+        output_path, checkpoint_path = paths
+        with JSONLSink(output_path) as sink:
+            assert self.exporter(sink, checkpoint_path).run() == 5
+        assert self.read_ids(output_path) == ['e1', 'e2', 'e3', 'e4', 'e5']
+
+    def test_resume_after_crash_has_no_duplicates(self, paths, mock_timeline):
+        output_path, checkpoint_path = paths
+        with JSONLSink(output_path) as sink:
+            self.exporter(sink, checkpoint_path).run(max_pages=1)
+            # simulate a crash after writing part of the next page but before checkpointing it
+            sink.write({'id': 'e3'})
+            sink.flush()
+
+        with JSONLSink(output_path) as sink:
+            self.exporter(sink, checkpoint_path).run()
+        assert self.read_ids(output_path) == ['e1', 'e2', 'e3', 'e4', 'e5']
+
+    def test_caught_up_run_exports_only_new_events(self, paths, mock_timeline):
+        output_path, checkpoint_path = paths
+        with JSONLSink(output_path) as sink:
+            self.exporter(sink, checkpoint_path).run()
+
+        mock_timeline.pages['c3'] = {'data': [{'id': 'e5'}, {'id': 'e6'}], 'next': None}
+        with JSONLSink(output_path) as sink:
+            assert self.exporter(sink, checkpoint_path).run() == 6
+        assert self.read_ids(output_path) == ['e1', 'e2', 'e3', 'e4', 'e5', 'e6']
+
+    def test_gzip_sink_resume(self, paths, mock_timeline):
+        output_path, checkpoint_path = paths
+        output_path += '.gz'
+        with GzipJSONLSink(output_path) as sink:
+            self.exporter(sink, checkpoint_path).run(max_pages=2)
+        with GzipJSONLSink(output_path) as sink:
+            self.exporter(sink, checkpoint_path).run()
+        assert self.read_ids(output_path, gzip.open) == ['e1', 'e2', 'e3', 'e4', 'e5']
+
+    def test_callback_sink(self, paths, mock_timeline):
+        events = []
+        self.exporter(CallbackSink(events.append), paths[1]).run()
+        assert [event['id'] for event in events] == ['e1', 'e2', 'e3', 'e4', 'e5']
+
+
+class TestCampaignRecipientExporter(CampaignExportFixture):
+    def exporter(self, directory, **kwargs):
+        return CampaignRecipientExporter(self.api, str(directory), **kwargs)
+
+    def read_emails(self, directory, campaign_id):
+        with open(os.path.join(str(directory), '{}.jsonl'.format(campaign_id)), 'rb') as output:
+            return [json.loads(line)['email'] for line in output.read().splitlines()]
+
+    def test_exports_sent_campaigns(self, tmpdir, mock_recipients, mock_campaigns):
+        exported, errors = self.exporter(tmpdir).run()
+
+        assert exported == {'cmp1': 4, 'cmp2': 1}
+        assert errors == {}
+        assert self.read_emails(tmpdir, 'cmp1') == ['a@mailinator.com', 'b@mailinator.com', 'c@mailinator.com', 'd@mailinator.com']
+        assert self.read_emails(tmpdir, 'cmp2') == ['e@mailinator.com']
+
+    def test_resume_skips_fetched_pages(self, tmpdir, mock_recipients):
+        mock_recipients.failing.add('o3')
+        exported, errors = self.exporter(tmpdir).run(['cmp1'])
+        assert 'cmp1' in errors
+        assert self.read_emails(tmpdir, 'cmp1') == ['a@mailinator.com', 'b@mailinator.com', 'c@mailinator.com']
+
+        mock_recipients.failing.clear()
+        del mock_recipients.fetched[:]
+        exported, errors = self.exporter(tmpdir).run(['cmp1'])
+        assert exported == {'cmp1': 4}
+        assert mock_recipients.fetched == [('cmp1', 'o3')]
+        assert self.read_emails(tmpdir, 'cmp1') == ['a@mailinator.com', 'b@mailinator.com', 'c@mailinator.com', 'd@mailinator.com']
+
+    def test_finished_campaigns_are_skipped(self, tmpdir, mock_recipients):
+        self.exporter(tmpdir).run(['cmp2'])
+        del mock_recipients.fetched[:]
+
+        assert self.exporter(tmpdir).run(['cmp2']) == ({'cmp2': 1}, {})
+        assert mock_recipients.fetched == []
+
+    def test_csv_output(self, tmpdir, mock_recipients):
+        exporter = self.exporter(
+            tmpdir,
+            sink_factory=lambda path: CSVSink(path, CampaignRecipientExporter.RECIPIENT_COLUMNS),
+            filename='{campaign_id}.csv',
+        )
+        exporter.run(['cmp2'])
+
+        with open(str(tmpdir.join('cmp2.csv'))) as output:
+            assert output.read() == 'email,customer_id,status\ne@mailinator.com,p5,Sent\n'
@@ -0,0 +1,56 @@
+import pytest
+from .fixtures.hooks import HooksFixture
+from klaviyo.exceptions import KlaviyoServerError
+from klaviyo.hooks import Hooks, RequestMetrics
+
+
+class TestHooks(HooksFixture):
+    def test_events_of_successful_request(self, stub_server, hooks, events):
+        self.lists(stub_server, hooks).get_members_from_list('abc123', ['fred@flintstone.com'])
+
+        assert [event for event, _ in events] == [Hooks.PRE_REQUEST, Hooks.POST_RESPONSE]
+        response = events[1][1]
+        assert response['endpoint'] == 'v2/list/{id}/members'
+        assert response['resource'] == 'Lists'
+        assert response['method'] == 'GET'
+        assert response['status_code'] == 200
+        assert response['request_bytes'] > 0 and response['response_bytes'] > 0
+        assert response['latency'] >= 0
+
+    def test_events_of_retried_failure(self, stub_server, hooks, events):
+        with pytest.raises(KlaviyoServerError):
+            self.lists(stub_server, hooks, max_retries=1).get_lists()
+
+        assert [event for event, _ in events] == [
+            Hooks.PRE_REQUEST, Hooks.POST_RESPONSE, Hooks.RETRY,
+            Hooks.PRE_REQUEST, Hooks.POST_RESPONSE, Hooks.ERROR,
+        ]
+        assert events[-1][1]['exception_type'] == 'KlaviyoServerError'
+        assert events[-1][1]['attempt'] == 1
+
+    def test_events_never_hold_the_api_key(self, stub_server, hooks, events):
+        with pytest.raises(KlaviyoServerError):
+            self.lists(stub_server, hooks).get_lists()
+        assert 'pk_flintstones' not in repr(events)
+
+    def test_unknown_event(self, hooks):
+        with pytest.raises(ValueError):
+            hooks.register('post_request', print)
+
+
+class TestRequestMetrics(HooksFixture):
+    def test_aggregates_per_endpoint(self, stub_server, hooks):
+        metrics = RequestMetrics(hooks)
+        lists = self.lists(stub_server, hooks)
+        for _ in range(3):
+            lists.get_members_from_list('abc123', ['fred@flintstone.com'])
+        with pytest.raises(KlaviyoServerError):
+            lists.get_lists()
+
+        snapshot = metrics.snapshot()
+        members = snapshot[('GET', 'v2/list/{id}/members')]
+        assert members['count'] == 3 and members['errors'] == 0
+        assert members['p50'] <= members['p95'] <= members['p99']
+
+        failed = snapshot[('GET', 'v2/lists')]
+        assert failed['count'] == 1 and failed['errors'] == 1
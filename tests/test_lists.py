@@ -0,0 +1,40 @@
+from .fixtures.lists import ListsFixture
+from klaviyo.exceptions import KlaviyoServerError
+
+
+class TestLists(ListsFixture):
+    def test_add_members_to_list_bulk_chunks_generator(self, mock_list_id, mock_profiles, mock_v2_request):
+        result = self.api.add_members_to_list_bulk(mock_list_id, mock_profiles, max_workers=3)
+
+        assert mock_v2_request.call_count == 3
+        assert result.succeeded
+        assert len(result.data) == 250
+        assert sorted(len(chunk.items) for chunk in result.results) == [50, 100, 100]
+
+    def test_bulk_failures_keep_their_chunk(self, mock_list_id, mock_v2_request):
+        emails = ['president{}@mailinator.com'.format(index) for index in range(30)]
+        result = self.api.remove_members_from_list_bulk(mock_list_id, emails, chunk_size=10)
+
+        assert not result.succeeded
+        assert len(result.failures) == 1
+        assert result.failures[0].index == 1
+        assert 'president13@mailinator.com' in result.failures[0].items
+        assert isinstance(result.failures[0].exception, KlaviyoServerError)
+        assert len(result.data) == 20
+
+    def test_iter_all_members_follows_markers(self, mock_list_id, mock_get_all_members):
+        members = self.api.iter_all_members(mock_list_id)
+        assert [member['id'] for member in members] == ['a', 'b', 'c', 'd', 'e']
+        assert members.exhausted and members.pages == 3
+
+    def test_iter_all_members_prefetch(self, mock_list_id, mock_get_all_members):
+        members = self.api.iter_all_members(mock_list_id, prefetch=True)
+        assert [member['id'] for member in members] == ['a', 'b', 'c', 'd', 'e']
+
+    def test_iter_all_members_resumes_from_cursor(self, mock_list_id, mock_get_all_members):
+        members = self.api.iter_all_members(mock_list_id)
+        iterator = iter(members)
+        next(iterator), next(iterator), next(iterator)
+
+        resumed = self.api.iter_all_members(mock_list_id, marker=members.cursor)
+        assert [member['id'] for member in resumed] == ['c', 'd', 'e']
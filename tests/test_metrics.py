@@ -0,0 +1,53 @@
+import datetime
+
+import pytest
+from .fixtures.metrics import MetricsFixture
+from klaviyo.exceptions import KlaviyoException
+
+
+class TestMetrics(MetricsFixture):
+    def test_split_export_range_by_week_aligns_on_monday(self):
+        shards = self.api._split_export_range(datetime.date(2020, 1, 1), datetime.date(2020, 1, 20), 'week', 1)
+        assert [(start.isoformat(), end.isoformat()) for start, end in shards] == [
+            ('2020-01-01', '2020-01-05'),
+            ('2020-01-06', '2020-01-12'),
+            ('2020-01-13', '2020-01-19'),
+            ('2020-01-20', '2020-01-20'),
+        ]
+
+    def test_split_export_range_by_month(self):
+        shards = self.api._split_export_range(datetime.date(2019, 11, 15), datetime.date(2020, 2, 1), 'month', 2)
+        assert [(start.isoformat(), end.isoformat()) for start, end in shards] == [
+            ('2019-11-15', '2019-12-31'),
+            ('2020-01-01', '2020-02-01'),
+        ]
+
+    def test_get_metric_export_sharded_merges_series(self, mock_metric_export):
+        response = self.api.get_metric_export_sharded('abc', '2020-01-01', '2020-01-10', unit='day', shard_size=5)
+
+        assert mock_metric_export.call_count == 2
+        assert response.data['start_date'] == '2020-01-01 00:00:00'
+        assert response.data['end_date'] == '2020-01-10 00:00:00'
+        series = response.data['results'][0]['data']
+        assert [point['date'][:10] for point in series] == ['2020-01-01', '2020-01-05', '2020-01-06', '2020-01-10']
+
+    def test_get_metric_export_sharded_rejects_empty_range(self, mock_metric_export):
+        with pytest.raises(KlaviyoException):
+            self.api.get_metric_export_sharded('abc', '2020-01-10', '2020-01-01')
+        assert mock_metric_export.call_count == 0
+
+    def test_get_metric_export_sharded_rejects_invalid_unit_and_shard_size(self, mock_metric_export):
+        with pytest.raises(KlaviyoException):
+            self.api.get_metric_export_sharded('abc', '2020-01-01', '2020-01-10', unit='year')
+        with pytest.raises(KlaviyoException):
+            self.api.get_metric_export_sharded('abc', '2020-01-01', '2020-01-10', shard_size=0)
+        assert mock_metric_export.call_count == 0
+
+    def test_get_metric_export_sharded_single_day(self, mock_metric_export):
+        self.api.get_metric_export_sharded('abc', '2020-01-01', '2020-01-01')
+        assert mock_metric_export.call_count == 1
+
+    def test_merge_exports_sums_shared_dates(self):
+        point = {'segment': 'Placed Order', 'data': [{'date': '2020-01-06 00:00:00', 'values': [1.0, 2.0]}]}
+        merged = self.api._merge_exports([{'results': [point]}, {'results': [point]}])
+        assert merged['results'][0]['data'][0]['values'] == [2.0, 4.0]
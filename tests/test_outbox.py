@@ -0,0 +1,131 @@
+import os
+
+import mock
+import pytest
+import requests
+from .fixtures.outbox import OutboxFixture
+from klaviyo.api_helper import KlaviyoAPIResponse
+from klaviyo.exceptions import KlaviyoException, KlaviyoQueueFullException
+from klaviyo.outbox import Outbox
+
+
+class TestOutbox(OutboxFixture):
+    PARAMS = {'event': 'Elected President', 'customer_properties': {'$email': 'thomas.jefferson@mailinator.com'}}
+
+    def test_records_are_read_in_order(self, directory):
+        with self.outbox(directory) as outbox:
+            seqs = [outbox.append('track', dict(self.PARAMS, index=index)) for index in range(5)]
+            records = outbox.read(3) + outbox.read(3)
+
+        assert seqs == [1, 2, 3, 4, 5]
+        assert [record.seq for record in records] == seqs
+        assert [record.params['index'] for record in records] == list(range(5))
+        assert records[0].resource == 'track'
+
+    def test_unacknowledged_records_are_replayed(self, directory):
+        with self.outbox(directory) as outbox:
+            for _ in range(4):
+                outbox.append('track', self.PARAMS)
+            outbox.ack([record.seq for record in outbox.read(2)])
+            outbox.read(2)
+
+        with self.outbox(directory) as outbox:
+            assert [record.seq for record in outbox.read(10, timeout=0)] == [3, 4]
+            assert outbox.append('identify', self.PARAMS) == 5
+
+    def test_out_of_order_acks_checkpoint_the_contiguous_prefix(self, directory):
+        with self.outbox(directory) as outbox:
+            for _ in range(3):
+                outbox.append('track', self.PARAMS)
+            outbox.read(3)
+            outbox.ack([2, 3])
+            assert outbox.pending == 1
+
+        with self.outbox(directory) as outbox:
+            assert [record.seq for record in outbox.read(10, timeout=0)] == [1, 2, 3]
+
+    def test_torn_record_is_truncated(self, directory):
+        with self.outbox(directory) as outbox:
+            outbox.append('track', self.PARAMS)
+            outbox.append('track', self.PARAMS)
+        segment = os.path.join(directory, Outbox.SEGMENT_NAME.format(1))
+        with open(segment, 'r+b') as segment_file:
+            segment_file.truncate(os.path.getsize(segment) - 3)
+
+        with self.outbox(directory) as outbox:
+            assert [record.seq for record in outbox.read(10, timeout=0)] == [1]
+            assert outbox.append('track', self.PARAMS) == 2
+            assert [record.seq for record in outbox.read(10, timeout=0)] == [2]
+
+    def test_segments_rotate_and_compact(self, directory):
+        with self.outbox(directory, segment_size=256) as outbox:
+            for _ in range(20):
+                outbox.append('track', self.PARAMS)
+            segments = [name for name in os.listdir(directory) if name.endswith(Outbox.SEGMENT_SUFFIX)]
+            assert len(segments) > 2
+
+            size = outbox.size
+            outbox.ack([record.seq for record in outbox.read(20)])
+            assert outbox.pending == 0
+            assert outbox.size < size
+            assert len([name for name in os.listdir(directory) if name.endswith(Outbox.SEGMENT_SUFFIX)]) == 1
+
+    def test_full_outbox_raises(self, directory):
+        with self.outbox(directory, segment_size=256, max_bytes=512) as outbox:
+            with pytest.raises(KlaviyoQueueFullException):
+                for _ in range(20):
+                    outbox.append('track', self.PARAMS)
+
+    def test_invalid_fsync_policy(self, directory):
+        with pytest.raises(KlaviyoException):
+            self.outbox(directory, fsync='sometimes')
+
+    @pytest.mark.parametrize('fsync', [Outbox.FSYNC_ALWAYS, Outbox.FSYNC_INTERVAL])
+    def test_fsync_policies(self, directory, fsync):
+        with self.outbox(directory, fsync=fsync, fsync_interval=0) as outbox:
+            with mock.patch('os.fsync') as mock_fsync:
+                outbox.append('track', self.PARAMS)
+            assert mock_fsync.called
+
+
+class TestOutboxTracker(OutboxFixture):
+    def test_events_are_delivered_and_acknowledged(self, directory, mock_email, mock_track_identify_request):
+        successes = []
+        with self.outbox(directory) as outbox:
+            tracker = self.tracker(outbox, on_success=lambda record, response: successes.append(record.resource))
+            tracker.track('Elected President', email=mock_email)
+            tracker.identify(email=mock_email)
+            assert tracker.close(timeout=5)
+
+        assert sorted(successes) == ['identify', 'track']
+        with self.outbox(directory) as outbox:
+            assert outbox.read(10, timeout=0) == []
+
+    def test_server_errors_are_retried(self, directory, mock_email, mock_track_identify_request):
+        mock_track_identify_request.side_effect = [requests.ConnectionError(), KlaviyoAPIResponse(200, 1)]
+        with self.outbox(directory) as outbox:
+            tracker = self.tracker(outbox, workers=1)
+            tracker.track('Elected President', email=mock_email)
+            assert tracker.close(timeout=5)
+        assert mock_track_identify_request.call_count == 2
+
+    def test_rejected_events_are_not_retried(self, directory, mock_email, mock_track_identify_request):
+        failures = []
+        mock_track_identify_request.return_value = KlaviyoAPIResponse(200, 0)
+        with self.outbox(directory) as outbox:
+            tracker = self.tracker(outbox, on_failure=lambda record, error: failures.append(record.seq))
+            tracker.track('Elected President', email=mock_email)
+            assert tracker.close(timeout=5)
+        assert failures == [1]
+
+    def test_undelivered_events_are_replayed_after_restart(self, directory, mock_email, mock_track_identify_request):
+        mock_track_identify_request.side_effect = requests.ConnectionError()
+        with self.outbox(directory) as outbox:
+            tracker = self.tracker(outbox, workers=1)
+            tracker.track('Elected President', email=mock_email)
+            assert not tracker.close(timeout=0.1)
+
+        mock_track_identify_request.side_effect = None
+        with self.outbox(directory) as outbox:
+            assert self.tracker(outbox).close(timeout=5)
+        assert mock_track_identify_request.call_args[1]['params']['event'] == 'Elected President'
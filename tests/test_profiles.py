@@ -0,0 +1,25 @@
+from .fixtures.profiles import ProfilesFixture
+from klaviyo.exceptions import KlaviyoAPIException
+
+
+class TestProfiles(ProfilesFixture):
+    def test_iter_profile_timelines(self, mock_profile_timeline):
+        profile_ids = ('profile{}'.format(index) for index in range(20))
+        fan_out = self.api.iter_profile_timelines(profile_ids, max_workers=4)
+        events = list(fan_out)
+
+        assert len(events) == 40
+        assert ('profile7', {'id': 'profile7-2'}) in events
+        assert mock_profile_timeline.call_count == 40
+        assert not fan_out.errors
+
+    def test_iter_profile_timelines_collects_errors(self, mock_profile_timeline):
+        fan_out = self.api.iter_profile_timelines(['profile1', 'missing', 'profile2'], max_workers=2, requests_per_second=1000)
+        events = list(fan_out)
+
+        assert len(events) == 4
+        assert isinstance(fan_out.errors['missing'], KlaviyoAPIException)
+
+    def test_iter_profile_timelines_stops_early(self, mock_profile_timeline):
+        for profile_id, event in self.api.iter_profile_timelines(['profile{}'.format(index) for index in range(100)]):
+            break
@@ -14,6 +14,13 @@ class TestPublicApi(PublicFixture):
         self.api.identify(mock_email)
         mock_request.assert_called_once()
 
+    def test_identify_does_not_leak_into_defaults(self, mock_email, mock_track_identify_request):
+        properties = {'plan': 'premium'}
+        self.api.identify(mock_email, properties=properties)
+        self.api.identify(external_id='other')
+        assert properties == {'plan': 'premium'}
+        assert 'email' not in mock_track_identify_request.call_args_list[1][1]['params']['properties']
+
     def test_identify_without_identification(self):
         with pytest.raises(KlaviyoException):
             self.api.identify()
@@ -0,0 +1,38 @@
+from .fixtures.ratelimit import RateLimiterFixture
+from klaviyo.ratelimit import FileRateLimiter, InProcessRateLimiter, TokenBucket
+
+
+class TestRateLimiter(RateLimiterFixture):
+    def test_token_bucket_reserve(self):
+        bucket = TokenBucket(rate=2.0, capacity=1.0, updated_at=100.0)
+        assert bucket.reserve(now=100.0) == 0.0
+        assert bucket.reserve(now=100.0) == 0.5
+        assert bucket.reserve(now=100.0) == 1.0
+        assert bucket.reserve(now=102.0) == 0.0
+
+    def test_most_specific_bucket(self):
+        limiter = InProcessRateLimiter(self.RATES)
+        assert limiter.get_bucket_name('v2/list') == 'v2/list'
+        assert limiter.get_bucket_name('v2/lists') == 'v2'
+        assert limiter.get_bucket_name('v1/metrics') is None
+
+    def test_in_process_buckets_are_independent(self):
+        limiter = InProcessRateLimiter(self.RATES)
+        assert limiter.reserve('v2/list') == 0.0
+        assert limiter.reserve('v2/list') > 0.0
+        assert limiter.reserve('public') == 0.0
+        assert limiter.reserve('v1/metrics') == 0.0
+
+    def test_file_limiter_is_shared_between_instances(self, state_path):
+        with FileRateLimiter(state_path, self.RATES) as first, FileRateLimiter(state_path, self.RATES) as second:
+            assert first.reserve('v2/list') == 0.0
+            assert second.reserve('v2/list') > 0.0
+
+    def test_request_consults_limiter(self, rate_limited_api, mock_rate_limiter, mock_requests_package, mock_handle_response):
+        rate_limited_api._v1_request('metrics/timeline', 'get', {})
+        mock_rate_limiter.acquire.assert_called_once_with('v1/metrics')
+
+    def test_endpoint_class(self):
+        api = self.api
+        assert api._get_endpoint_class('https://a.klaviyo.com/api/v2/list/abc/members') == 'v2/list'
+        assert api._get_endpoint_class('https://a.klaviyo.com/api/track?data=abc', api.PUBLIC) == 'public'
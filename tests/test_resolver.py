@@ -0,0 +1,93 @@
+import threading
+import time
+
+from .fixtures.resolver import ResolverFixture
+from klaviyo.cache import MISSING, SQLiteCache
+
+
+class TestProfileIdResolver(ResolverFixture):
+    def test_resolve_is_cached(self, mock_search):
+        resolver = self.resolver()
+        assert resolver.resolve('Thomas@mailinator.com') == 'id-Thomas'
+        assert resolver.resolve('thomas@mailinator.com ') == 'id-Thomas'
+        assert mock_search.call_count == 1
+        assert resolver.stats.hits == 1 and resolver.stats.misses == 1
+
+    def test_misses_are_negatively_cached(self, mock_search):
+        resolver = self.resolver()
+        assert resolver.resolve('nobody@mailinator.com') is None
+        assert resolver.resolve('nobody@mailinator.com') is None
+        assert mock_search.call_count == 1
+        assert resolver.stats.negative_hits == 1
+
+    def test_concurrent_lookups_are_coalesced(self, mock_search):
+        resolver = self.resolver()
+        mock_search.release.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(resolver.resolve('thomas@mailinator.com'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while resolver.stats.misses + resolver.stats.coalesced < 5:
+            time.sleep(0.001)
+        mock_search.release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['id-thomas'] * 5
+        assert mock_search.call_count == 1
+
+    def test_lookup_finishing_before_registration_is_reused(self, mock_search):
+        resolver = self.resolver()
+        mock_search.release.clear()
+        first = threading.Thread(target=resolver.resolve, args=('thomas@mailinator.com', ))
+        first.start()
+        while resolver.stats.misses < 1:
+            time.sleep(0.001)
+
+        cache_get = resolver._cache_get
+        stale = [True]
+
+        def racing_cache_get(key, **kwargs):
+            # the second resolve misses the cache, then the first lookup finishes before it takes the lock
+            if stale:
+                stale.pop()
+                mock_search.release.set()
+                first.join()
+                return MISSING
+            return cache_get(key, **kwargs)
+        resolver._cache_get = racing_cache_get
+
+        assert resolver.resolve('thomas@mailinator.com') == 'id-thomas'
+        assert mock_search.call_count == 1
+        assert resolver.stats.misses == 1 and resolver.stats.hits == 1
+
+    def test_concurrent_hits_are_counted(self, mock_search):
+        resolver = self.resolver()
+        resolver.resolve('thomas@mailinator.com')
+
+        def resolve():
+            for _ in range(1000):
+                resolver.resolve('thomas@mailinator.com')
+        threads = [threading.Thread(target=resolve) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert resolver.stats.hits == 8000 and resolver.stats.misses == 1
+
+    def test_resolve_many(self, mock_search):
+        emails = ['president{}@mailinator.com'.format(index) for index in range(50)] + ['nobody@mailinator.com']
+        resolved, errors = self.resolver(max_workers=4).resolve_many(emails)
+        assert len(resolved) == 51 and not errors
+        assert resolved['president7@mailinator.com'] == 'id-president7'
+        assert resolved['nobody@mailinator.com'] is None
+
+    def test_persistent_cache_survives_restart(self, mock_search, cache_path):
+        with SQLiteCache(cache_path) as cache:
+            self.resolver(persistent_cache=cache).resolve('thomas@mailinator.com')
+        with SQLiteCache(cache_path) as cache:
+            resolver = self.resolver(persistent_cache=cache)
+            assert resolver.resolve('thomas@mailinator.com') == 'id-thomas'
+            assert resolver.stats.persistent_hits == 1
+        assert mock_search.call_count == 1
@@ -0,0 +1,53 @@
+import pytest
+from .fixtures.retry import RetryPolicyFixture
+from klaviyo.exceptions import KlaviyoRateLimitException, KlaviyoServerError
+from klaviyo.public import Public
+from klaviyo.retry import RetryPolicy
+
+
+class TestRetryPolicy(RetryPolicyFixture):
+    def test_idempotency_rules(self):
+        policy = RetryPolicy()
+        assert policy.is_idempotent('get', 'https://a.klaviyo.com/api/v2/lists')
+        assert policy.is_idempotent('delete', 'https://a.klaviyo.com/api/v2/list/abc')
+        assert policy.is_idempotent('post', 'https://a.klaviyo.com/api/v2/list/abc/members')
+        assert not policy.is_idempotent('post', 'https://a.klaviyo.com/api/track')
+        assert not policy.is_idempotent('get', 'https://a.klaviyo.com/api/track?data=e30=')
+        assert policy.is_idempotent('get', 'https://a.klaviyo.com/api/identify?data=e30=')
+        assert policy.is_idempotent('post', 'https://a.klaviyo.com/api/identify')
+        assert not policy.is_idempotent('post', 'https://a.klaviyo.com/api/v2/lists')
+
+    def test_retries_rate_limit_honoring_retry_after(self, mock_rate_limited_then_ok, mock_sleep):
+        attempts = []
+        response = self.retrying_api(on_retry=attempts.append)._v2_request('lists', 'get')
+
+        assert response.status_code == 200
+        assert mock_rate_limited_then_ok.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
+        assert attempts[0].attempt == 1 and isinstance(attempts[0].exception, KlaviyoRateLimitException)
+
+    def test_gives_up_after_max_retries(self, mock_always_unavailable, mock_sleep):
+        with pytest.raises(KlaviyoServerError):
+            self.retrying_api(max_retries=2)._v1_request('metrics', 'get', {})
+        assert mock_always_unavailable.call_count == 3
+
+    def test_unsafe_post_is_not_retried(self, mock_always_unavailable, mock_sleep):
+        with pytest.raises(KlaviyoServerError):
+            self.retrying_api()._v2_request('lists', 'post', {'list_name': 'Presidents'})
+        assert mock_always_unavailable.call_count == 1
+
+    def test_get_track_is_not_retried(self, mock_always_unavailable, mock_sleep):
+        public = Public(retry_policy=RetryPolicy(), **self.API_SETTINGS)
+        with pytest.raises(KlaviyoServerError):
+            public.track('Elected President', email='thomas@mailinator.com')
+        assert mock_always_unavailable.call_count == 1
+
+    def test_empty_budget_stops_retries(self, mock_always_unavailable, mock_sleep, empty_budget):
+        with pytest.raises(KlaviyoServerError):
+            self.retrying_api(budget=empty_budget)._v2_request('lists', 'get')
+        assert mock_always_unavailable.call_count == 1
+
+    def test_no_policy_never_retries(self, mock_always_unavailable, mock_sleep):
+        with pytest.raises(KlaviyoServerError):
+            self.api._v2_request('lists', 'get')
+        assert mock_always_unavailable.call_count == 1
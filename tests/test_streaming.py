@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from .fixtures.streaming import StreamingFixture
+from klaviyo.exceptions import KlaviyoAPIException
+from klaviyo.streaming import JSONStreamDecoder, KlaviyoStreamingResponse
+
+
+class TestJSONStreamDecoder(StreamingFixture):
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 100000])
+    def test_decodes_across_chunk_boundaries(self, chunk_size):
+        body = self.encode(self.RECIPIENTS_PAGE)
+        decoder = JSONStreamDecoder('data')
+        items = []
+        for start in range(0, len(body), chunk_size):
+            items.extend(decoder.feed(body[start:start + chunk_size]))
+        items.extend(decoder.close())
+
+        assert items == self.RECIPIENTS
+        assert decoder.fields == {'count': 500, 'next_offset': 'xyz789', 'campaign_id': 'cmp123'}
+
+    def test_yields_items_before_the_body_ends(self):
+        body = self.encode(self.RECIPIENTS_PAGE)
+        decoder = JSONStreamDecoder('data')
+        assert len(decoder.feed(body[:len(body) // 2])) > 0
+
+    def test_decodes_top_level_arrays(self):
+        decoder = JSONStreamDecoder('records')
+        assert decoder.feed(b'[1, 2.5, "three", {"four": [4]}]') == [1, 2.5, 'three', {'four': [4]}]
+        assert decoder.close() == []
+
+    def test_decodes_numbers_split_across_chunks(self):
+        decoder = JSONStreamDecoder('records')
+        assert decoder.feed(b'[12') == []
+        assert decoder.feed(b'34]') == [1234]
+
+    def test_decodes_empty_arrays(self):
+        decoder = JSONStreamDecoder('records')
+        assert decoder.feed(b'{"records": [], "marker": null}') == []
+        assert decoder.close() == []
+        assert decoder.fields == {'marker': None}
+
+    def test_truncated_document_raises(self):
+        decoder = JSONStreamDecoder('data')
+        decoder.feed(self.encode(self.RECIPIENTS_PAGE)[:-10])
+        with pytest.raises(ValueError):
+            decoder.close()
+
+
+class TestStreamingResponses(StreamingFixture):
+    def test_stream_campaign_recipients(self, stub_server):
+        response = self.campaigns(stub_server).get_campaign_recipients('cmp123', stream=True)
+
+        assert isinstance(response, KlaviyoStreamingResponse)
+        assert response.status_code == 200
+        assert list(response) == self.RECIPIENTS
+        assert response.fields['next_offset'] == 'xyz789'
+
+    def test_stream_list_members(self, stub_server):
+        with self.lists(stub_server).get_all_members('abc123', stream=True) as response:
+            assert list(response) == self.MEMBERS_PAGE['records']
+        assert response.fields == {'marker': 42}
+
+    def test_stream_errors_raise(self, stub_server):
+        with pytest.raises(KlaviyoAPIException) as exc_info:
+            self.lists(stub_server).get_all_members('missing', stream=True)
+        assert exc_info.value.status_code == 404
+
+    def test_not_streamed_by_default(self, stub_server):
+        response = self.campaigns(stub_server).get_campaign_recipients('cmp123')
+        assert response.data == self.RECIPIENTS_PAGE
+
+    def test_stream_async(self, stub_server):
+        pytest.importorskip('aiohttp')
+        from klaviyo.async_api import AsyncKlaviyo
+
+        async def run():
+            async with AsyncKlaviyo(private_token='pk_flintstones', api_server=stub_server.url) as client:
+                response = await client.Campaigns.get_campaign_recipients('cmp123', stream=True)
+                return [item async for item in response], response.fields
+
+        loop = asyncio.new_event_loop()
+        try:
+            items, fields = loop.run_until_complete(run())
+        finally:
+            loop.close()
+        assert items == self.RECIPIENTS
+        assert fields['next_offset'] == 'xyz789'
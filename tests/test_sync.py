@@ -0,0 +1,71 @@
+import pytest
+from .fixtures.sync import ListMembershipSyncFixture
+from klaviyo.sync import ListMembershipSync
+
+
+class TestListMembershipSync(ListMembershipSyncFixture):
+    def member(self, name):
+        return {'id': 'p_{}'.format(name), 'email': '{}@mailinator.com'.format(name)}
+
+    def set_members(self, members, names):
+        members.clear()
+        for name in names:
+            members['p_{}'.format(name)] = self.member(name)
+
+    def test_first_diff_adds_every_member(self, snapshot_path, remote):
+        members, _ = remote
+        self.set_members(members, ['adams', 'jefferson', 'madison'])
+
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            changes = list(sync.diff('abc123'))
+        assert changes == [(ListMembershipSync.ADD, self.member(name)) for name in ['adams', 'jefferson', 'madison']]
+
+    def test_diff_reports_only_changes(self, snapshot_path, remote):
+        members, _ = remote
+        self.set_members(members, ['adams', 'jefferson', 'madison'])
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            list(sync.diff('abc123'))
+
+        self.set_members(members, ['jefferson', 'madison', 'monroe'])
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            assert list(sync.diff('abc123')) == [
+                (ListMembershipSync.ADD, self.member('monroe')),
+                (ListMembershipSync.REMOVE, self.member('adams')),
+            ]
+            assert list(sync.diff('abc123')) == []
+
+    def test_interrupted_diff_is_reported_again(self, snapshot_path, remote):
+        members, _ = remote
+        self.set_members(members, ['adams', 'jefferson', 'madison'])
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            changes = sync.diff('abc123')
+            next(changes)
+            changes.close()
+
+            assert len(list(sync.diff('abc123'))) == 3
+
+    def test_push_sends_only_deltas(self, snapshot_path, remote):
+        members, calls = remote
+        self.set_members(members, ['adams', 'jefferson', 'madison'])
+        desired = [{'email': 'Jefferson@mailinator.com'}, {'email': 'madison@mailinator.com'}, {'email': 'monroe@mailinator.com'}]
+
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            added, removed = sync.push('abc123', iter(desired))
+
+            assert added.succeeded and removed.succeeded
+            assert calls == [('add', ['monroe@mailinator.com']), ('remove', ['adams@mailinator.com'])]
+            assert sorted(members) == ['p_jefferson', 'p_madison', 'p_monroe']
+            # the pushed changes are in the snapshot already
+            assert list(sync.diff('abc123')) == []
+
+            del calls[:]
+            sync.push('abc123', desired)
+            assert calls == []
+
+    @pytest.mark.parametrize('group_ids', [('abc123', 'def456')])
+    def test_groups_are_independent(self, snapshot_path, remote, group_ids):
+        members, _ = remote
+        self.set_members(members, ['adams'])
+        with ListMembershipSync(self.api, snapshot_path) as sync:
+            for group_id in group_ids:
+                assert list(sync.diff(group_id)) == [(ListMembershipSync.ADD, self.member('adams'))]
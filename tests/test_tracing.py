@@ -0,0 +1,46 @@
+import mock
+import pytest
+from .fixtures.tracing import TracingFixture
+from klaviyo.exceptions import KlaviyoServerError
+from klaviyo.lists import Lists
+from klaviyo.tracing import Tracer
+
+
+class TestTracer(TracingFixture):
+    def test_method_span_with_attempt_child(self, stub_server, tracer, exporter):
+        self.lists(stub_server, tracer).get_members_from_list('abc123', ['fred@flintstone.com'])
+
+        spans = self.spans_by_name(exporter)
+        method_span = spans['Lists.get_members_from_list'][0]
+        attempt_span = spans['GET v2/list/{id}/members'][0]
+        assert attempt_span.parent.span_id == method_span.context.span_id
+        assert attempt_span.attributes['klaviyo.resource'] == 'Lists'
+        assert attempt_span.attributes['http.status_code'] == 200
+        assert attempt_span.attributes['http.request_content_length'] > 0
+        assert attempt_span.attributes['http.response_content_length'] > 0
+
+        traceparent = stub_server.requests[0].headers['traceparent']
+        assert format(attempt_span.context.span_id, '016x') in traceparent
+
+    def test_span_per_retry(self, stub_server, tracer, exporter):
+        with pytest.raises(KlaviyoServerError):
+            self.lists(stub_server, tracer, max_retries=2).get_lists()
+
+        spans = self.spans_by_name(exporter)
+        assert [span.attributes['klaviyo.attempt'] for span in spans['GET v2/lists']] == [0, 1, 2]
+        assert not spans['Lists.get_lists'][0].status.is_ok
+        assert 'pk_flintstones' not in str([span.to_json() for span in exporter.get_finished_spans()])
+
+    def test_span_per_page(self, stub_server, tracer, exporter):
+        members = list(self.lists(stub_server, tracer).iter_all_members('abc123'))
+
+        assert [member['id'] for member in members] == ['fred', 'barney']
+        assert len(self.spans_by_name(exporter)['Lists.get_all_members']) == 2
+
+    def test_no_op_without_opentelemetry(self, stub_server):
+        with mock.patch('klaviyo.tracing.trace', None):
+            tracer = Tracer()
+        lists = Lists(private_token='pk_flintstones', api_server=stub_server.url, tracer=tracer)
+
+        assert not tracer.enabled and lists.tracer is None
+        assert 'get_lists' not in vars(lists)
@@ -0,0 +1,92 @@
+import pytest
+from .fixtures.tracker import EventTrackerFixture
+from klaviyo.exceptions import KlaviyoException, KlaviyoQueueFullException
+from klaviyo.public import Public
+
+
+class TestEventTracker(EventTrackerFixture):
+    def test_track_and_identify_are_sent_in_background(self, mock_email, mock_track_identify_request):
+        successes = []
+        tracker = self.tracker(on_success=lambda event, response: successes.append(event.resource))
+        tracker.track('Elected President', email=mock_email)
+        tracker.identify(email=mock_email)
+
+        assert tracker.close(timeout=5)
+        assert sorted(successes) == ['identify', 'track']
+        assert mock_track_identify_request.call_count == 2
+
+    def test_track_stamps_enqueue_time(self, mock_email, mock_track_identify_request):
+        tracker = self.tracker()
+        tracker.track('Elected President', email=mock_email)
+        tracker.close(timeout=5)
+        assert mock_track_identify_request.call_args[1]['params']['time'] is not None
+
+    def test_queued_properties_are_copied(self, mock_email, mock_blocked_request):
+        tracker = self.tracker()
+        properties = {'value': 1, 'items': ['White House']}
+        customer_properties = {'party': 'Democratic'}
+        tracker.track('Elected President', email=mock_email, properties=properties, customer_properties=customer_properties)
+        tracker.identify(email=mock_email, properties=customer_properties)
+        properties['value'] = 2
+        properties['items'].append('Camp David')
+        customer_properties['party'] = 'Republican'
+        mock_blocked_request.set()
+        tracker.close(timeout=5)
+
+        calls = [call[1]['params'] for call in Public._track_identify_request.call_args_list]
+        track_params, identify_params = sorted(calls, key=lambda params: 'event' not in params)
+        assert track_params['properties'] == {'value': 1, 'items': ['White House']}
+        assert track_params['customer_properties']['party'] == 'Democratic'
+        assert identify_params['properties']['party'] == 'Democratic'
+
+    def test_flush_sends_partial_batch_immediately(self, mock_email, mock_track_identify_request):
+        tracker = self.tracker(flush_interval=60)
+        tracker.track('Elected President', email=mock_email)
+        assert tracker.flush(timeout=5)
+        assert tracker.pending == 0
+        tracker.close()
+
+    def test_failure_callback(self, mock_email, mock_track_identify_request):
+        failures = []
+        mock_track_identify_request.side_effect = KlaviyoException('boom')
+        tracker = self.tracker(on_failure=lambda event, error: failures.append(error))
+        tracker.track('Elected President', email=mock_email)
+        tracker.close(timeout=5)
+        assert len(failures) == 1
+
+    def test_overflow_raise(self, mock_email, mock_blocked_request):
+        tracker = self.tracker(workers=1, max_queue_size=1, max_batch_size=1, overflow='raise')
+        try:
+            with pytest.raises(KlaviyoQueueFullException):
+                for _ in range(3):
+                    tracker.track('Elected President', email=mock_email)
+        finally:
+            mock_blocked_request.set()
+            tracker.close(timeout=5)
+
+    def test_overflow_drop_oldest(self, mock_email, mock_blocked_request):
+        dropped = []
+        tracker = self.tracker(
+            workers=1,
+            max_queue_size=1,
+            max_batch_size=1,
+            overflow='drop_oldest',
+            on_failure=lambda event, error: dropped.append(event),
+        )
+        try:
+            for _ in range(4):
+                tracker.track('Elected President', email=mock_email)
+        finally:
+            mock_blocked_request.set()
+            tracker.close(timeout=5)
+        assert len(dropped) >= 2
+
+    def test_closed_tracker_rejects_events(self, mock_email, mock_track_identify_request):
+        tracker = self.tracker()
+        tracker.close()
+        with pytest.raises(KlaviyoException):
+            tracker.track('Elected President', email=mock_email)
+
+    def test_invalid_overflow_policy(self):
+        with pytest.raises(KlaviyoException):
+            self.tracker(overflow='pizza')